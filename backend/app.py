@@ -1,28 +1,58 @@
+import os
 from flask import Flask, jsonify, request
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 # 移除JWT相关导入
 # from flask_jwt_extended import JWTManager
 from datetime import datetime, timedelta
 
 from config import config
 from models import init_db
+from models.user_model import User
 from routes.auth import auth
 from routes.user import user
 from routes.book import book
+from routes.borrow import borrow
 from routes.category import category
 from routes.dashboard import dashboard
+from routes.health import health
+from services.search_service import SearchService
+from services.book_service import BookService
+from services.stats_service import StatsService
+from services.popularity_service import PopularityService
+from services.category_service import CategoryService
+from services.job_service import scheduler
+from utils.compression import init_compression
+from utils.error_handler import register_error_handlers
+from utils.password_util import check_hash_method
 
-def create_app():
+def create_app(config_name=None):
     """
     创建Flask应用
     
+    Args:
+        config_name (str): 配置名称，见 config.config，默认读取 FLASK_ENV 环境变量
+    
     Returns:
         Flask: Flask应用实例
+        
+    Raises:
+        ValueError: 如果配置名称不存在
     """
     app = Flask(__name__)
     
-    # 加载配置
-    app.config.from_object(config['development'])
+    # 加载配置，名称写错时直接报错，避免生产入口静默使用开发配置
+    config_name = config_name or os.environ.get('FLASK_ENV', 'default')
+    if config_name not in config:
+        raise ValueError(f"未知的配置名称 {config_name}，可选值: {', '.join(config)}")
+    app.config.from_object(config[config_name])
+    
+    # 密码哈希需要能写入 users.password 列，算法配置不合适时启动即报错
+    check_hash_method(app.config['PASSWORD_HASH_METHOD'], User.__table__.c.password.type.length)
+    
+    # 部署在反向代理后面时，request.remote_addr 取 X-Forwarded-For 中的客户端IP
+    if app.config['PROXY_FIX_X_FOR'] > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
     
     # 配置CORS，允许跨域请求
     CORS(app, 
@@ -40,6 +70,9 @@ def create_app():
             response = app.make_default_options_response()
         return response
     
+    # 按 Accept-Encoding 压缩响应
+    init_compression(app)
+    
     # 移除JWT配置
     # jwt = JWTManager(app)
     
@@ -68,16 +101,38 @@ def create_app():
     # 初始化数据库
     init_db(app)
     
+    # 首次启动时为已有图书建立全文索引和副本，并初始化统计计数器
+    with app.app_context():
+        SearchService.ensure_index()
+        BookService.ensure_items()
+        StatsService.ensure_counters()
+        PopularityService.ensure_counts()
+        CategoryService.ensure_closure()
+    
+    # 注册定时任务，调度线程由启动入口决定是否启动
+    scheduler.init_app(app)
+    
     # 注册所有的蓝图
     app.register_blueprint(auth, url_prefix='/api/auth')
     app.register_blueprint(user, url_prefix='/api/users')
     app.register_blueprint(book, url_prefix='/api/books')
+    app.register_blueprint(borrow, url_prefix='/api/borrows')
     app.register_blueprint(category, url_prefix='/api/categories')
     app.register_blueprint(dashboard, url_prefix='/api/dashboard')
+    app.register_blueprint(health, url_prefix='/api/health')
+    
+    # 控制器通过 abort 返回的错误统一转换为JSON响应
+    register_error_handlers(app)
     
     return app
 
 if __name__ == '__main__':
-    app = create_app()
+    # 开发服务器，生产环境使用 gunicorn -c gunicorn.conf.py wsgi:app
+    app = create_app('development')
+    
+    # 调试模式下只在重载器启动的子进程中运行调度器
+    if app.config['SCHEDULER_ENABLED'] and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        scheduler.start()
+    
     # 启用调试模式，方便开发
     app.run(host='0.0.0.0', port=5000, debug=True) 
\ No newline at end of file
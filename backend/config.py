@@ -11,11 +11,58 @@ class Config:
     SECRET_KEY = 'dev'
     DEBUG = False
     
-    # 数据库配置
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///library.db'
+    # 数据库配置：引擎参数按数据库类型自动选择，见 utils/db_engine.py
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI', 'sqlite:///library.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_POOL_SIZE = 10
-    SQLALCHEMY_POOL_TIMEOUT = 30
+    
+    # 连接池配置：每个工作进程一个连接池，pool_size 应不小于每个进程的线程数
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))  # 连接池满时允许临时新建的连接数
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # 等待空闲连接的最长时间（秒）
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # 连接最长使用时间（秒），需小于 MySQL wait_timeout
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'  # 取出连接时检测是否已断开
+    
+    # 从库配置：多个地址用逗号分隔，只读方法的查询分发到延迟在允许范围内的从库
+    DATABASE_REPLICA_URIS = [uri.strip() for uri in os.environ.get('DATABASE_REPLICA_URIS', '').split(',') if uri.strip()]
+    REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 5))  # 允许的最大复制延迟（秒）
+    REPLICA_LAG_CHECK_INTERVAL = 10  # 每个进程检查从库延迟的间隔（秒）
+    READ_YOUR_WRITES_SECONDS = 10  # 写入后该客户端读主库的时间（秒），应大于 REPLICA_MAX_LAG
+    
+    # SQLite 配置：每个新连接执行的 PRAGMA
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')  # WAL 模式下 NORMAL 不会损坏数据库
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))  # 数据库被锁定时的等待时间（毫秒）
+    
+    # 密码哈希配置：算法参数可用 scripts/calibrate_password_hash.py 按耗时预算校准
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+    PASSWORD_POOL_WORKERS = int(os.environ.get('PASSWORD_POOL_WORKERS', min(4, os.cpu_count() or 1)))  # 0 表示在请求线程中计算
+    PASSWORD_POOL_MAX_PENDING = int(os.environ.get('PASSWORD_POOL_MAX_PENDING', 32))  # 排队上限，超过时返回503
+    PASSWORD_POOL_TIMEOUT = 10  # 等待哈希结果的最长时间（秒）
+    
+    # 图书导入配置：接口只处理小文件，大批量导入使用 scripts/import_books.py，避免请求超过 gunicorn timeout
+    IMPORT_MAX_UPLOAD_SIZE = int(os.environ.get('IMPORT_MAX_UPLOAD_SIZE', 2 * 1024 * 1024))  # 上传文件最大字节数
+    IMPORT_MAX_ROWS = int(os.environ.get('IMPORT_MAX_ROWS', 5000))  # 单次上传最多导入的行数
+    
+    # 登录限流配置：令牌桶 (容量, 每秒补充的令牌数)
+    RATE_LIMIT_STORAGE_URI = os.environ.get('RATE_LIMIT_STORAGE_URI', 'memory://')  # 多进程部署时使用 redis:// 共享计数
+    LOGIN_RATE_LIMIT_IP = (20, 20 / 60)  # 每个IP每分钟20次
+    LOGIN_RATE_LIMIT_USER = (5, 5 / 60)  # 每个用户名每分钟5次
+    LOGIN_MAX_FAILURES = 10  # 连续失败次数达到上限后锁定账号
+    LOGIN_FAILURE_WINDOW = 15 * 60  # 连续失败次数的统计窗口（秒）
+    
+    # 反向代理配置：信任的代理层数，大于0时从 X-Forwarded-For 中取客户端IP，用于按IP限流
+    # 只应设置为实际部署的代理层数，直接对外暴露时保持0，否则客户端可以伪造IP
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    
+    # 响应压缩配置：安装 brotli 后优先使用 br，否则使用 gzip
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = 1024  # 小于该字节数的响应不压缩
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 4  # 动态响应使用较低的质量，压缩耗时与 gzip 相当
+    
+    # 定时任务配置：是否在应用进程中运行调度器
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() == 'true'
     
     # JWT配置
     JWT_SECRET_KEY = 'jwt-secret-key'  # JWT密钥
@@ -49,13 +96,15 @@ class ProductionConfig(Config):
     DEBUG = False
     
     # 生产环境应该使用更安全的密钥
-    SECRET_KEY = 'production-secret-key'
-    JWT_SECRET_KEY = 'production-jwt-secret-key'
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'production-secret-key')
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'production-jwt-secret-key')
 
 
 # 配置映射
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'dev': DevelopmentConfig,
+    'prod': ProductionConfig,
     'default': DevelopmentConfig
 } 
\ No newline at end of file
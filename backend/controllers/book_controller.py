@@ -1,8 +1,14 @@
-from flask import request
+from itertools import islice
+from flask import current_app, request
 from marshmallow import Schema, fields, validate, ValidationError
 
 from services.book_service import BookService
+from services.import_service import BookImportService
 from utils.response_util import ResponseUtil
+from utils.pagination import COUNT_MODES
+from utils.export_util import EXPORT_FORMATS, export_response
+from utils.db_routing import read_only
+from utils.http_cache import versioned_collection, is_not_modified, not_modified, with_etag
 
 class BookSchema(Schema):
     """图书数据验证模式"""
@@ -14,10 +20,25 @@ class BookSchema(Schema):
     price = fields.Decimal(places=2, allow_none=True)
     description = fields.String()
     cover_url = fields.String(validate=validate.Length(max=255))
+    # 图书状态由副本汇总，保留该字段兼容旧客户端，写入时忽略
     status = fields.String(validate=validate.OneOf(['available', 'borrowed', 'reserved', 'lost']))
     category_id = fields.Integer(allow_none=True)
     location = fields.String(validate=validate.Length(max=50))
 
+class BookCreateSchema(BookSchema):
+    """创建图书数据验证模式，可同时指定副本数量"""
+    copies = fields.Integer(validate=validate.Range(min=0, max=100))
+
+class BookItemsSchema(Schema):
+    """新增副本数据验证模式"""
+    copies = fields.Integer(required=True, validate=validate.Range(min=1, max=100))
+    location = fields.String(validate=validate.Length(max=50))
+
+class BookItemSchema(Schema):
+    """副本数据验证模式，借出状态只能通过借阅操作设置"""
+    status = fields.String(validate=validate.OneOf(['available', 'reserved', 'lost']))
+    location = fields.String(validate=validate.Length(max=50), allow_none=True)
+
 class BookController:
     """
     图书控制器
@@ -25,6 +46,8 @@ class BookController:
     """
     
     @staticmethod
+    @read_only
+    @versioned_collection('books', 'categories')
     def get_books():
         """
         获取图书列表
@@ -37,21 +60,94 @@ class BookController:
         per_page = request.args.get('per_page', 10, type=int)
         search = request.args.get('search')
         category_id = request.args.get('category_id', type=int)
+        include_children = request.args.get('include_children', 'true').lower() != 'false'
         status = request.args.get('status')
+        cursor = request.args.get('cursor')
+        count_mode = request.args.get('count', 'exact')
         
-        # 获取图书列表
-        books, total = BookService.get_books(page, per_page, search, category_id, status)
+        if count_mode not in COUNT_MODES:
+            return ResponseUtil.params_error("count参数无效")
         
-        # 转换为字典
-        book_list = [book.to_dict() for book in books]
+        # 获取图书列表
+        books, total, next_cursor = BookService.get_books(
+            page, per_page, search, category_id, status,
+            cursor=cursor,
+            count_mode=count_mode,
+            serializer=BookService.ROW_SERIALIZER,
+            include_children=include_children
+        )
         
-        # 返回响应
-        return ResponseUtil.success({
+        # 批量序列化并返回响应
+        return ResponseUtil.success_rows({
             'total': total,
             'page': page,
             'per_page': per_page,
-            'books': book_list
-        })
+            'next_cursor': next_cursor
+        }, 'books', BookService.ROW_SERIALIZER, books)
+    
+    @staticmethod
+    def export_books():
+        """
+        导出图书
+        
+        Returns:
+            Response: NDJSON或CSV格式的流式响应
+        """
+        # 获取查询参数
+        export_format = request.args.get('format', 'ndjson')
+        search = request.args.get('search')
+        category_id = request.args.get('category_id', type=int)
+        include_children = request.args.get('include_children', 'true').lower() != 'false'
+        status = request.args.get('status')
+        
+        if export_format not in EXPORT_FORMATS:
+            return ResponseUtil.params_error("format参数只支持ndjson或csv")
+        
+        # 流式读取图书
+        rows = BookService.export_books(
+            BookService.ROW_SERIALIZER, search, category_id, status, include_children=include_children
+        )
+        
+        # 返回响应
+        return export_response(BookService.ROW_SERIALIZER, rows, export_format, 'books')
+    
+    @staticmethod
+    def import_books():
+        """
+        批量导入图书
+        
+        Returns:
+            Response: 包含导入报告的响应
+        """
+        # 接口只处理小文件，大批量导入使用 scripts/import_books.py，避免请求超过工作进程的超时时间
+        max_size = current_app.config['IMPORT_MAX_UPLOAD_SIZE']
+        if request.content_length and request.content_length > max_size:
+            return ResponseUtil.error(413, f"导入文件不能超过 {max_size // 1024} KB，大文件请使用 scripts/import_books.py 导入")
+        
+        # 获取上传文件
+        file = request.files.get('file')
+        if not file:
+            return ResponseUtil.params_error("请上传导入文件")
+        
+        # 未指定格式时根据文件扩展名判断
+        file_format = request.form.get('format')
+        if not file_format:
+            extension = (file.filename or '').rsplit('.', 1)[-1].lower()
+            file_format = 'ndjson' if extension in ('ndjson', 'jsonl') else 'csv'
+        
+        if file_format not in BookImportService.FORMATS:
+            return ResponseUtil.params_error("format参数只支持csv或ndjson")
+        
+        # 先读取并检查行数，超过上限时整个文件都不导入
+        max_rows = current_app.config['IMPORT_MAX_ROWS']
+        records = list(islice(BookImportService.parse(file.stream, file_format), max_rows + 1))
+        if len(records) > max_rows:
+            return ResponseUtil.error(413, f"单次最多导入 {max_rows} 行，大文件请使用 scripts/import_books.py 导入")
+        
+        report = BookImportService.import_books(records)
+        
+        # 返回响应
+        return ResponseUtil.success(report, f"导入完成，成功 {report['imported']} 条")
     
     @staticmethod
     def check_isbn_exists():
@@ -86,11 +182,16 @@ class BookController:
         Returns:
             Response: 包含图书详情的响应
         """
+        # 图书未变更时客户端直接使用缓存，图书不存在时由 get_book_by_id 返回404
+        etag = BookService.get_book_etag(book_id)
+        if etag and is_not_modified(etag):
+            return not_modified(etag)
+        
         # 获取图书
         book = BookService.get_book_by_id(book_id)
         
         # 返回响应
-        return ResponseUtil.success(book.to_dict())
+        return with_etag(ResponseUtil.success(book.to_dict()), etag)
     
     @staticmethod
     def create_book():
@@ -105,12 +206,13 @@ class BookController:
         
         # 验证数据
         try:
-            book_data = BookSchema().load(data)
+            book_data = BookCreateSchema().load(data)
         except ValidationError as e:
             return ResponseUtil.params_error(str(e))
         
-        # 创建图书
-        book = BookService.create_book(book_data)
+        # 创建图书及其副本
+        copies = book_data.pop('copies', 1)
+        book = BookService.create_book(book_data, copies)
         
         # 返回响应
         return ResponseUtil.success(book.to_dict(), "图书创建成功")
@@ -156,4 +258,73 @@ class BookController:
         BookService.delete_book(book_id)
         
         # 返回响应
-        return ResponseUtil.success(None, "图书删除成功") 
\ No newline at end of file
+        return ResponseUtil.success(None, "图书删除成功")
+    
+    @staticmethod
+    def get_book_items(book_id):
+        """
+        获取图书的副本列表
+        
+        Args:
+            book_id (int): 图书ID
+            
+        Returns:
+            Response: 包含副本列表的响应
+        """
+        # 获取副本
+        items = BookService.get_book_items(book_id)
+        
+        # 返回响应
+        return ResponseUtil.success([item.to_dict() for item in items])
+    
+    @staticmethod
+    def add_book_items(book_id):
+        """
+        为图书新增副本
+        
+        Args:
+            book_id (int): 图书ID
+            
+        Returns:
+            Response: 包含新增副本的响应
+        """
+        # 获取请求数据
+        data = request.get_json()
+        
+        # 验证数据
+        try:
+            item_data = BookItemsSchema().load(data)
+        except ValidationError as e:
+            return ResponseUtil.params_error(str(e))
+        
+        # 新增副本
+        items = BookService.add_book_items(book_id, item_data['copies'], item_data.get('location'))
+        
+        # 返回响应
+        return ResponseUtil.success([item.to_dict() for item in items], "副本添加成功")
+    
+    @staticmethod
+    def update_book_item(item_id):
+        """
+        更新副本状态或馆藏位置
+        
+        Args:
+            item_id (int): 副本ID
+            
+        Returns:
+            Response: 包含更新结果的响应
+        """
+        # 获取请求数据
+        data = request.get_json()
+        
+        # 验证数据
+        try:
+            item_data = BookItemSchema().load(data)
+        except ValidationError as e:
+            return ResponseUtil.params_error(str(e))
+        
+        # 更新副本
+        item = BookService.update_book_item(item_id, item_data)
+        
+        # 返回响应
+        return ResponseUtil.success(item.to_dict(), "副本更新成功") 
\ No newline at end of file
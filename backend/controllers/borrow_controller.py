@@ -5,10 +5,15 @@ from marshmallow import Schema, fields, validate, ValidationError
 from services.borrow_service import BorrowService
 from services.user_service import UserService
 from utils.response_util import ResponseUtil
+from utils.pagination import COUNT_MODES
+from utils.export_util import EXPORT_FORMATS, export_response
+from utils.db_routing import read_only
+from utils.http_cache import versioned_collection, is_not_modified, not_modified, with_etag
 
 class BorrowSchema(Schema):
     """借阅数据验证模式"""
     book_id = fields.Integer(required=True)
+    item_id = fields.Integer()
     user_id = fields.Integer()
     borrow_days = fields.Integer(validate=validate.Range(min=1, max=30))
     remarks = fields.String(validate=validate.Length(max=200))
@@ -17,6 +22,19 @@ class ReturnSchema(Schema):
     """归还数据验证模式"""
     is_lost = fields.Boolean(default=False)
 
+class BatchBorrowSchema(Schema):
+    """批量借阅数据验证模式"""
+    user_id = fields.Integer(required=True)
+    book_ids = fields.List(fields.Integer(), required=True,
+                           validate=validate.Length(min=1, max=BorrowService.BATCH_MAX_ITEMS))
+    borrow_days = fields.Integer(validate=validate.Range(min=1, max=30))
+    remarks = fields.String(validate=validate.Length(max=200))
+
+class BatchReturnSchema(Schema):
+    """批量归还数据验证模式"""
+    borrow_ids = fields.List(fields.Integer(), required=True,
+                             validate=validate.Length(min=1, max=BorrowService.BATCH_MAX_ITEMS))
+
 class FineSchema(Schema):
     """罚款数据验证模式"""
     borrow_id = fields.Integer(required=True)
@@ -29,6 +47,8 @@ class BorrowController:
     
     @staticmethod
     # @jwt_required()  # 注释掉JWT装饰器
+    @read_only
+    @versioned_collection('borrows', 'books', 'users')
     def get_borrows():
         """
         获取借阅记录列表
@@ -44,28 +64,65 @@ class BorrowController:
         book_title = request.args.get('book_title')
         user_name = request.args.get('user_name')
         status = request.args.get('status')
+        cursor = request.args.get('cursor')
+        count_mode = request.args.get('count', 'exact')
+        
+        if count_mode not in COUNT_MODES:
+            return ResponseUtil.params_error("count参数无效")
         
         # 获取借阅记录列表
-        borrows, total = BorrowService.get_borrows(
+        borrows, total, next_cursor = BorrowService.get_borrows(
             page, 
             per_page, 
             user_id, 
             book_id, 
             status,
             book_title,
-            user_name
+            user_name,
+            cursor=cursor,
+            count_mode=count_mode,
+            serializer=BorrowService.ROW_SERIALIZER
         )
         
-        # 转换为字典
-        borrow_list = [borrow.to_dict() for borrow in borrows]
-        
-        # 返回响应
-        return ResponseUtil.success({
+        # 批量序列化并返回响应
+        return ResponseUtil.success_rows({
             'total': total,
             'page': page,
             'per_page': per_page,
-            'borrows': borrow_list
-        })
+            'next_cursor': next_cursor
+        }, 'borrows', BorrowService.ROW_SERIALIZER, borrows)
+    
+    @staticmethod
+    def export_borrows():
+        """
+        导出借阅记录
+        
+        Returns:
+            Response: NDJSON或CSV格式的流式响应
+        """
+        # 获取查询参数
+        export_format = request.args.get('format', 'ndjson')
+        user_id = request.args.get('user_id', type=int)
+        book_id = request.args.get('book_id', type=int)
+        book_title = request.args.get('book_title')
+        user_name = request.args.get('user_name')
+        status = request.args.get('status')
+        
+        if export_format not in EXPORT_FORMATS:
+            return ResponseUtil.params_error("format参数只支持ndjson或csv")
+        
+        # 流式读取借阅记录
+        rows = BorrowService.export_borrows(
+            BorrowService.ROW_SERIALIZER,
+            user_id,
+            book_id,
+            status,
+            book_title,
+            user_name
+        )
+        
+        # 返回响应
+        return export_response(BorrowService.ROW_SERIALIZER, rows, export_format, 'borrows')
     
     @staticmethod
     # @jwt_required()  # 注释掉JWT装饰器
@@ -79,11 +136,16 @@ class BorrowController:
         Returns:
             Response: 包含借阅记录详情的响应
         """
+        # 借阅记录未变更时客户端直接使用缓存，记录不存在时由 get_borrow_by_id 返回404
+        etag = BorrowService.get_borrow_etag(borrow_id)
+        if etag and is_not_modified(etag):
+            return not_modified(etag)
+        
         # 获取借阅记录
         borrow = BorrowService.get_borrow_by_id(borrow_id)
         
         # 返回响应
-        return ResponseUtil.success(borrow.to_dict())
+        return with_etag(ResponseUtil.success(borrow.to_dict()), etag)
     
     @staticmethod
     # @jwt_required()  # 注释掉JWT装饰器
@@ -131,7 +193,8 @@ class BorrowController:
             borrow_data['user_id'],
             borrow_data['book_id'],
             borrow_data.get('borrow_days', 14),
-            borrow_data.get('remarks')
+            borrow_data.get('remarks'),
+            borrow_data.get('item_id')
         )
         
         # 返回响应
@@ -170,6 +233,61 @@ class BorrowController:
         
         return ResponseUtil.success(borrow.to_dict(), message)
     
+    @staticmethod
+    def batch_borrow():
+        """
+        批量借阅图书，返回每本图书的借阅结果
+        
+        Returns:
+            Response: 包含逐项结果的响应
+        """
+        # 验证数据
+        try:
+            batch_data = BatchBorrowSchema().load(request.get_json() or {})
+        except ValidationError as e:
+            return ResponseUtil.params_error(str(e))
+        
+        # 批量借阅
+        results = BorrowService.batch_borrow(
+            batch_data['user_id'],
+            batch_data['book_ids'],
+            batch_data.get('borrow_days', 14),
+            batch_data.get('remarks')
+        )
+        
+        # 返回响应
+        succeeded = sum(1 for result in results if result['success'])
+        return ResponseUtil.success({
+            'items': results,
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded
+        }, f"成功借阅 {succeeded} 本图书")
+    
+    @staticmethod
+    def batch_return():
+        """
+        批量归还图书，返回每条借阅记录的归还结果
+        
+        Returns:
+            Response: 包含逐项结果的响应
+        """
+        # 验证数据
+        try:
+            batch_data = BatchReturnSchema().load(request.get_json() or {})
+        except ValidationError as e:
+            return ResponseUtil.params_error(str(e))
+        
+        # 批量归还
+        results = BorrowService.batch_return(batch_data['borrow_ids'])
+        
+        # 返回响应
+        succeeded = sum(1 for result in results if result['success'])
+        return ResponseUtil.success({
+            'items': results,
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded
+        }, f"成功归还 {succeeded} 本图书")
+    
     @staticmethod
     # @jwt_required()  # 注释掉JWT装饰器
     def pay_fine():
@@ -201,19 +319,13 @@ class BorrowController:
         检查逾期借阅
         
         Returns:
-            Response: 包含逾期借阅列表的响应
+            Response: 包含逾期检查汇总的响应
         """
-        # 检查逾期借阅
-        overdue_borrows = BorrowService.check_overdue_borrows()
-        
-        # 转换为字典
-        overdue_list = [borrow.to_dict() for borrow in overdue_borrows]
+        # 检查逾期借阅，只返回汇总结果
+        summary = BorrowService.check_overdue_borrows()
         
         # 返回响应
-        return ResponseUtil.success({
-            'total': len(overdue_list),
-            'overdue_borrows': overdue_list
-        }, "逾期检查完成")
+        return ResponseUtil.success(summary, "逾期检查完成")
     
     @staticmethod
     # @jwt_required()  # 注释掉JWT装饰器
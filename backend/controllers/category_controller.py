@@ -3,6 +3,7 @@ from marshmallow import Schema, fields, validate, ValidationError
 
 from services.category_service import CategoryService
 from utils.response_util import ResponseUtil
+from utils.http_cache import make_etag, is_not_modified, not_modified, json_bytes_response
 
 class CategorySchema(Schema):
     """分类数据验证模式"""
@@ -30,11 +31,17 @@ class CategoryController:
             # 获取查询参数
             tree = request.args.get('tree', 'false').lower() == 'true'
             
-            # 获取分类列表
-            categories = CategoryService.get_categories(include_tree=tree)
+            # 分类未变更时客户端直接使用缓存
+            version = CategoryService.get_version()
+            etag = make_etag('categories', 'tree' if tree else 'list', version)
+            if is_not_modified(etag):
+                return not_modified(etag)
+            
+            # 获取按版本缓存的分类列表
+            body = CategoryService.get_categories_json(include_tree=tree, version=version)
             
             # 返回响应
-            return ResponseUtil.success(categories)
+            return json_bytes_response(body, etag)
         except Exception as e:
             return ResponseUtil.server_error(str(e))
     
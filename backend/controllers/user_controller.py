@@ -4,6 +4,8 @@ from marshmallow import Schema, fields, validate, ValidationError
 
 from services.user_service import UserService
 from utils.response_util import ResponseUtil
+from utils.pagination import COUNT_MODES
+from utils.export_util import EXPORT_FORMATS, export_response
 
 class UserSchema(Schema):
     """用户数据验证模式"""
@@ -44,36 +46,66 @@ class UserController:
         name = request.args.get('name')
         role = request.args.get('role')
         status = request.args.get('status')
+        cursor = request.args.get('cursor')
+        count_mode = request.args.get('count', 'exact')
+        
+        if count_mode not in COUNT_MODES:
+            return ResponseUtil.params_error("count参数无效")
         
         # 打印请求参数，便于调试
         print(f"查询参数: page={page}, per_page={per_page}, search={search}, username={username}, name={name}, role={role}, status={status}")
         
         try:
             # 从数据库获取用户列表
-            users, total = UserService.get_users(
+            users, total, next_cursor = UserService.get_users(
                 page=page, 
                 per_page=per_page, 
                 search=search,
                 username=username,
                 name=name, 
                 role=role, 
-                status=status
+                status=status,
+                cursor=cursor,
+                count_mode=count_mode,
+                serializer=UserService.ROW_SERIALIZER
             )
             
-            # 转换为字典列表
-            user_list = [user.to_dict() for user in users]
-            
-            # 返回响应
-            return ResponseUtil.success({
+            # 批量序列化并返回响应
+            return ResponseUtil.success_rows({
                 'total': total,
                 'page': page,
                 'per_page': per_page,
-                'users': user_list
-            })
+                'next_cursor': next_cursor
+            }, 'users', UserService.ROW_SERIALIZER, users)
         except Exception as e:
             print(f"获取用户列表出错: {str(e)}")
             return ResponseUtil.server_error(str(e))
     
+    @staticmethod
+    def export_users():
+        """
+        导出用户
+        
+        Returns:
+            Response: NDJSON或CSV格式的流式响应
+        """
+        # 获取查询参数
+        export_format = request.args.get('format', 'ndjson')
+        search = request.args.get('search')
+        username = request.args.get('username')
+        name = request.args.get('name')
+        role = request.args.get('role')
+        status = request.args.get('status')
+        
+        if export_format not in EXPORT_FORMATS:
+            return ResponseUtil.params_error("format参数只支持ndjson或csv")
+        
+        # 流式读取用户
+        rows = UserService.export_users(UserService.ROW_SERIALIZER, search, username, name, role, status)
+        
+        # 返回响应
+        return export_response(UserService.ROW_SERIALIZER, rows, export_format, 'users')
+    
     @staticmethod
     # @jwt_required()  # 注释掉JWT装饰器
     def get_user(user_id):
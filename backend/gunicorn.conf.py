@@ -0,0 +1,73 @@
+"""
+gunicorn 配置，所有参数都可以通过环境变量覆盖
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+平滑重启：kill -HUP <master pid> 会按新配置逐个替换工作进程；开启 preload_app 时
+应用代码在主进程中加载，更新代码后需要 kill -USR2 启动新的主进程，再向旧主进程发送 TERM。
+"""
+import multiprocessing
+import os
+
+# 监听地址
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# 工作进程：同步请求主要耗时在数据库IO，每个进程再开少量线程
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# 在主进程中导入应用后再 fork，模型和路由只加载一次，工作进程共享只读内存
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# 超时：timeout 为单个请求的最长处理时间，graceful_timeout 为重启时等待进行中请求的时间
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# keep-alive：前端有反向代理时保持与代理的长连接，取值应小于代理的空闲超时
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# 处理一定数量的请求后重启工作进程，避免内存缓慢增长，加随机抖动防止同时重启
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+# 日志输出到标准输出，由进程管理器收集
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def _get_app(server):
+    from wsgi import app
+    return app
+
+
+def post_fork(server, worker):
+    """
+    工作进程启动后：丢弃从主进程继承的数据库连接，并启动定时任务调度器
+    """
+    from models import db
+    from services.job_service import scheduler
+    from utils.db_routing import replica_keys
+
+    app = _get_app(server)
+
+    # 主进程加载应用时建立的连接不能在多个进程间共享，close=False 只丢弃连接池而不关闭继承的连接，
+    # 避免子进程关闭主进程仍在使用的套接字
+    with app.app_context():
+        db.engine.dispose(close=False)
+        for key in replica_keys(app):
+            db.get_engine(app, key).dispose(close=False)
+
+    # 线程不会随 fork 复制，调度器需要在每个工作进程中启动，任务锁保证同一任务只执行一次
+    if app.config['SCHEDULER_ENABLED']:
+        scheduler.start()
+
+
+def worker_exit(server, worker):
+    """
+    工作进程退出前停止调度器，等待正在执行的任务结束
+    """
+    from services.job_service import scheduler
+
+    scheduler.stop(timeout=graceful_timeout)
@@ -2,6 +2,7 @@ from flask import Flask
 from models import init_db, db
 from models.user_model import User
 from models.category_model import Category
+from services.category_service import CategoryService
 from models.book_model import Book
 from models.borrow_model import Borrow
 from config import config
@@ -50,6 +51,7 @@ def init_database():
         # 提交更改
         try:
             db.session.commit()
+            CategoryService.rebuild_closure()
             print('数据库初始化成功！')
             print('默认管理员账号：admin')
             print('默认管理员密码：admin123')
@@ -1,16 +1,23 @@
+import os
+
 from flask import Flask
 from flask_migrate import Migrate
 from models import db
 from config import config
 
+# 导入所有模型，供迁移比对表结构
+from models.book_model import Book
+from models.book_item_model import BookItem
+from models.category_model import Category, CategoryClosure
+from models.user_model import User
+from models.borrow_model import Borrow
+from models.search_model import BookSearchTerm
+from models.stats_model import StatCounter
+from models.popularity_model import BookBorrowDaily, BookBorrowTotal
+from models.job_model import JobRun, JobLock
+
 app = Flask(__name__)
-app.config.from_object(config)
+app.config.from_object(config[os.environ.get('FLASK_ENV', 'default')])
 
 db.init_app(app)
-migrate = Migrate(app, db)
-
-if __name__ == '__main__':
-    from models.book_model import Book
-    from models.category_model import Category
-    from models.user_model import User
-    from models.borrow_model import Borrow 
\ No newline at end of file
+migrate = Migrate(app, db)
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""图书副本、统计计数器、定时任务等新增表，以及图书、借阅、用户表的新增列和索引
+
+已通过旧版本启动时自动补建了部分表、列或索引的数据库，对应步骤会跳过
+
+Revision ID: 5d2689d2be61
+Revises: 
+Create Date: 2026-10-18 18:20:33.650955
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2689d2be61'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def _has_table(name):
+    return name in _inspector().get_table_names()
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in _inspector().get_columns(table)}
+
+
+def _has_index(table, name):
+    return name in {i['name'] for i in _inspector().get_indexes(table)}
+
+
+def _create_index(name, table, columns):
+    if not _has_index(table, name):
+        op.create_index(name, table, columns, unique=False)
+
+
+def _add_column(table, column):
+    if not _has_column(table, column.name):
+        op.add_column(table, column)
+
+
+def upgrade():
+    if not _has_table('job_locks'):
+        op.create_table('job_locks',
+        sa.Column('name', sa.String(length=50), nullable=False, comment='任务名称'),
+        sa.Column('owner', sa.String(length=100), nullable=True, comment='持有锁的进程'),
+        sa.Column('locked_until', sa.DateTime(), nullable=True, comment='锁过期时间'),
+        sa.Column('last_scheduled_at', sa.DateTime(), nullable=True, comment='最近一次被执行的计划时间'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新时间'),
+        sa.PrimaryKeyConstraint('name')
+        )
+    if not _has_table('job_runs'):
+        op.create_table('job_runs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('job_name', sa.String(length=50), nullable=False, comment='任务名称'),
+        sa.Column('scheduled_at', sa.DateTime(), nullable=True, comment='计划执行时间'),
+        sa.Column('started_at', sa.DateTime(), nullable=False, comment='开始时间'),
+        sa.Column('finished_at', sa.DateTime(), nullable=True, comment='结束时间'),
+        sa.Column('duration_ms', sa.Integer(), nullable=True, comment='执行耗时（毫秒）'),
+        sa.Column('status', sa.Enum('running', 'success', 'failed'), nullable=False, comment='状态: 执行中/成功/失败'),
+        sa.Column('result', sa.Text(), nullable=True, comment='执行结果（JSON）'),
+        sa.Column('error', sa.Text(), nullable=True, comment='错误信息'),
+        sa.Column('worker', sa.String(length=100), nullable=True, comment='执行进程'),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _create_index('ix_job_runs_job_name_started_at', 'job_runs', ['job_name', 'started_at'])
+    if not _has_table('stat_counters'):
+        op.create_table('stat_counters',
+        sa.Column('name', sa.String(length=50), nullable=False, comment='计数器名称'),
+        sa.Column('value', sa.BigInteger(), nullable=False, comment='计数值'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新时间'),
+        sa.PrimaryKeyConstraint('name')
+        )
+    if not _has_table('category_closure'):
+        op.create_table('category_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False, comment='祖先分类ID'),
+        sa.Column('descendant_id', sa.Integer(), nullable=False, comment='后代分类ID'),
+        sa.Column('depth', sa.Integer(), nullable=False, comment='层级距离，自身为0'),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['categories.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['categories.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+        )
+    _create_index('ix_category_closure_descendant_depth', 'category_closure', ['descendant_id', 'depth'])
+    if not _has_table('book_borrow_daily'):
+        op.create_table('book_borrow_daily',
+        sa.Column('book_id', sa.Integer(), nullable=False, comment='图书ID'),
+        sa.Column('day', sa.Date(), nullable=False, comment='借阅日期'),
+        sa.Column('count', sa.Integer(), nullable=False, comment='借阅次数'),
+        sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('book_id', 'day')
+        )
+    _create_index('ix_book_borrow_daily_day', 'book_borrow_daily', ['day'])
+    if not _has_table('book_borrow_totals'):
+        op.create_table('book_borrow_totals',
+        sa.Column('book_id', sa.Integer(), nullable=False, comment='图书ID'),
+        sa.Column('count', sa.Integer(), nullable=False, comment='借阅次数'),
+        sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('book_id')
+        )
+    _create_index('ix_book_borrow_totals_count', 'book_borrow_totals', ['count'])
+    if not _has_table('book_items'):
+        op.create_table('book_items',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('book_id', sa.Integer(), nullable=False, comment='图书ID'),
+        sa.Column('barcode', sa.String(length=32), nullable=False, comment='条码'),
+        sa.Column('status', sa.Enum('available', 'borrowed', 'reserved', 'lost'), nullable=False, comment='副本状态: 可借阅/已借出/已预约/丢失'),
+        sa.Column('location', sa.String(length=50), nullable=True, comment='馆藏位置'),
+        sa.Column('created_at', sa.DateTime(), nullable=True, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新时间'),
+        sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('barcode')
+        )
+    _create_index('ix_book_items_book_id_status', 'book_items', ['book_id', 'status'])
+    if not _has_table('book_search_terms'):
+        op.create_table('book_search_terms',
+        sa.Column('term', sa.String(length=32), nullable=False, comment='词项'),
+        sa.Column('book_id', sa.Integer(), nullable=False, comment='图书ID'),
+        sa.Column('weight', sa.Integer(), nullable=False, comment='词项权重'),
+        sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('term', 'book_id')
+        )
+    _create_index('ix_book_search_terms_book_id', 'book_search_terms', ['book_id'])
+    _add_column('books', sa.Column('total_copies', sa.Integer(), server_default='0', nullable=False, comment='未丢失的副本数'))
+    _add_column('books', sa.Column('available_copies', sa.Integer(), server_default='0', nullable=False, comment='可借副本数'))
+    _create_index('ix_books_created_at_id', 'books', ['created_at', 'id'])
+    _add_column('borrows', sa.Column('item_id', sa.Integer(), nullable=True, comment='借出的副本ID'))
+    _create_index('ix_borrows_created_at_id', 'borrows', ['created_at', 'id'])
+    _create_index('ix_borrows_item_id', 'borrows', ['item_id'])
+    # SQLite 不支持为已有的表添加外键约束，只在其他数据库上创建
+    foreign_keys = {fk['name'] for fk in _inspector().get_foreign_keys('borrows')}
+    if op.get_bind().dialect.name != 'sqlite' and 'fk_borrows_item_id_book_items' not in foreign_keys:
+        op.create_foreign_key('fk_borrows_item_id_book_items', 'borrows', 'book_items', ['item_id'], ['id'])
+    _add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False, comment='令牌版本，修改密码后递增使之前签发的令牌失效'))
+    _create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_column('users', 'token_version')
+    if op.get_bind().dialect.name != 'sqlite':
+        op.drop_constraint('fk_borrows_item_id_book_items', 'borrows', type_='foreignkey')
+    op.drop_index(op.f('ix_borrows_item_id'), table_name='borrows')
+    op.drop_index('ix_borrows_created_at_id', table_name='borrows')
+    op.drop_column('borrows', 'item_id')
+    op.drop_index('ix_books_created_at_id', table_name='books')
+    op.drop_column('books', 'available_copies')
+    op.drop_column('books', 'total_copies')
+    op.drop_index(op.f('ix_book_search_terms_book_id'), table_name='book_search_terms')
+    op.drop_table('book_search_terms')
+    op.drop_index('ix_book_items_book_id_status', table_name='book_items')
+    op.drop_table('book_items')
+    op.drop_index(op.f('ix_book_borrow_totals_count'), table_name='book_borrow_totals')
+    op.drop_table('book_borrow_totals')
+    op.drop_index(op.f('ix_book_borrow_daily_day'), table_name='book_borrow_daily')
+    op.drop_table('book_borrow_daily')
+    op.drop_index('ix_category_closure_descendant_depth', table_name='category_closure')
+    op.drop_table('category_closure')
+    op.drop_table('stat_counters')
+    op.drop_index('ix_job_runs_job_name_started_at', table_name='job_runs')
+    op.drop_table('job_runs')
+    op.drop_table('job_locks')
@@ -1,8 +1,9 @@
-from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 
-# 创建SQLAlchemy实例
-db = SQLAlchemy()
+from utils.db_routing import RoutingSQLAlchemy
+
+# 创建SQLAlchemy实例，会话支持读写分离
+db = RoutingSQLAlchemy()
 migrate = Migrate()
 
 def init_db(app):
@@ -12,15 +13,47 @@ def init_db(app):
     Args:
         app: Flask应用实例
     """
+    from utils.db_engine import engine_options, configure_engine
+    from utils.db_routing import REPLICA_BIND_PREFIX, init_routing, replica_keys
+    
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if not uri:
+        raise ValueError("未配置 SQLALCHEMY_DATABASE_URI，请使用 config.py 中的配置类加载配置")
+    
+    # 按数据库类型生成引擎参数，应用配置中显式指定的参数优先
+    options = engine_options(uri, app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    
+    # 从库注册为 SQLALCHEMY_BINDS，由读写分离会话按需选择
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for i, uri in enumerate(app.config.get('DATABASE_REPLICA_URIS') or []):
+        binds[f'{REPLICA_BIND_PREFIX}{i}'] = uri
+    app.config['SQLALCHEMY_BINDS'] = binds
+    
     db.init_app(app)
     migrate.init_app(app, db)
+    init_routing(app, db)
     
     # 导入所有模型以确保它们被注册
     from .book_model import Book
-    from .category_model import Category
+    from .book_item_model import BookItem
+    from .category_model import Category, CategoryClosure
     from .user_model import User
     from .borrow_model import Borrow
+    from .search_model import BookSearchTerm
+    from .stats_model import StatCounter
+    from .popularity_model import BookBorrowDaily, BookBorrowTotal
+    from .job_model import JobRun, JobLock
     
     # 创建所有表
     with app.app_context():
-        db.create_all() 
\ No newline at end of file
+        configure_engine(db.engine, app.config)
+        for key in replica_keys(app):
+            configure_engine(db.get_engine(app, key), app.config)
+        # create_all 只创建缺少的表，已有数据库的列和索引变更通过迁移完成（flask db upgrade）
+        db.create_all()
+        
+        # 创建数据版本号记录，供条件请求使用
+        from utils.version_util import ensure_versions
+        ensure_versions() 
\ No newline at end of file
@@ -0,0 +1,92 @@
+from datetime import datetime
+from . import db
+
+class BookItem(db.Model):
+    """
+    图书副本模型
+    
+    books 表保存书目信息，每一本实体书是一条副本记录，借阅以副本为单位
+    """
+    __tablename__ = 'book_items'
+    __table_args__ = (
+        # 借阅时按图书查找可借的副本
+        db.Index('ix_book_items_book_id_status', 'book_id', 'status'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id', ondelete='CASCADE'), nullable=False, comment='图书ID')
+    barcode = db.Column(db.String(32), unique=True, nullable=False, comment='条码')
+    status = db.Column(
+        db.Enum('available', 'borrowed', 'reserved', 'lost'),
+        default='available',
+        nullable=False,
+        comment='副本状态: 可借阅/已借出/已预约/丢失'
+    )
+    location = db.Column(db.String(50), comment='馆藏位置')
+    created_at = db.Column(db.DateTime, default=datetime.now, comment='创建时间')
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+    
+    def __repr__(self):
+        return f'<BookItem {self.barcode}>'
+    
+    @staticmethod
+    def barcode_prefix(book_id):
+        """
+        默认条码的前缀：B + 8位图书ID
+        
+        Args:
+            book_id (int): 图书ID
+            
+        Returns:
+            str: 条码前缀
+        """
+        return f'B{book_id:08d}'
+    
+    @staticmethod
+    def make_barcode(book_id, copy_number):
+        """
+        生成默认条码：B + 8位图书ID + 副本序号（至少5位，超过时按实际位数）
+        
+        Args:
+            book_id (int): 图书ID
+            copy_number (int): 副本序号，从1开始
+            
+        Returns:
+            str: 条码
+        """
+        return f'{BookItem.barcode_prefix(book_id)}{copy_number:05d}'
+    
+    @staticmethod
+    def parse_copy_number(barcode, book_id):
+        """
+        从默认条码中解析副本序号，图书ID超过8位时前缀随之变长
+        
+        Args:
+            barcode (str): 条码
+            book_id (int): 条码所属图书的ID
+            
+        Returns:
+            int: 副本序号，不是该图书默认格式的条码返回None
+        """
+        prefix = BookItem.barcode_prefix(book_id)
+        if not barcode.startswith(prefix):
+            return None
+        suffix = barcode[len(prefix):]
+        return int(suffix) if suffix.isdigit() else None
+    
+    def to_dict(self):
+        """
+        将模型转换为字典
+        
+        Returns:
+            dict: 副本信息字典
+        """
+        return {
+            'id': self.id,
+            'book_id': self.book_id,
+            'barcode': self.barcode,
+            'status': self.status,
+            'location': self.location,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S')
+        }
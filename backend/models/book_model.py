@@ -6,6 +6,10 @@ class Book(db.Model):
     图书模型
     """
     __tablename__ = 'books'
+    __table_args__ = (
+        # 游标分页按 (created_at, id) 倒序扫描
+        db.Index('ix_books_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     isbn = db.Column(db.String(20), unique=True, index=True, comment='ISBN编号')
@@ -16,6 +20,7 @@ class Book(db.Model):
     price = db.Column(db.Numeric(10, 2), comment='价格')
     description = db.Column(db.Text, comment='图书描述')
     cover_url = db.Column(db.String(255), comment='封面图片URL')
+    # 图书状态由副本汇总：有可借副本时为可借阅，副本全部丢失时为丢失，否则为已借出
     status = db.Column(
         db.Enum('available', 'borrowed', 'reserved', 'lost'), 
         default='available',
@@ -23,16 +28,38 @@ class Book(db.Model):
     )
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), comment='分类ID')
     location = db.Column(db.String(50), comment='馆藏位置')
+    total_copies = db.Column(db.Integer, nullable=False, default=0, server_default='0', comment='未丢失的副本数')
+    available_copies = db.Column(db.Integer, nullable=False, default=0, server_default='0', comment='可借副本数')
     created_at = db.Column(db.DateTime, default=datetime.now, comment='创建时间')
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
     
     # 关系
     category = db.relationship('Category', backref=db.backref('books', lazy='dynamic'))
     borrows = db.relationship('Borrow', backref='book', lazy='dynamic', cascade='all, delete-orphan')
+    items = db.relationship('BookItem', backref='book', lazy='dynamic', cascade='all, delete-orphan')
+    
+    # to_dict 需要访问的关系，列表查询据此批量预加载，避免逐行懒加载
+    SERIALIZE_RELATIONS = ('category',)
     
     def __repr__(self):
         return f'<Book {self.title}>'
     
+    @staticmethod
+    def summarize_status(available_copies, total_copies):
+        """
+        根据副本数计算图书状态
+        
+        Args:
+            available_copies (int): 可借副本数
+            total_copies (int): 未丢失的副本数
+            
+        Returns:
+            str: 图书状态
+        """
+        if available_copies > 0:
+            return 'available'
+        return 'borrowed' if total_copies > 0 else 'lost'
+    
     def to_dict(self):
         """
         将模型转换为字典
@@ -54,6 +81,8 @@ class Book(db.Model):
             'category_id': self.category_id,
             'category_name': self.category.name if self.category else None,
             'location': self.location,
+            'total_copies': self.total_copies,
+            'available_copies': self.available_copies,
             'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
             'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S')
         } 
\ No newline at end of file
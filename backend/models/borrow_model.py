@@ -6,9 +6,14 @@ class Borrow(db.Model):
     借阅记录模型
     """
     __tablename__ = 'borrows'
+    __table_args__ = (
+        # 游标分页按 (created_at, id) 倒序扫描
+        db.Index('ix_borrows_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     book_id = db.Column(db.Integer, db.ForeignKey('books.id'), nullable=False, index=True, comment='图书ID')
+    item_id = db.Column(db.Integer, db.ForeignKey('book_items.id'), index=True, comment='借出的副本ID')
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True, comment='用户ID')
     borrow_date = db.Column(db.DateTime, default=datetime.now, nullable=False, comment='借阅日期')
     due_date = db.Column(db.DateTime, nullable=False, comment='应还日期')
@@ -24,6 +29,12 @@ class Borrow(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.now, comment='创建时间')
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
     
+    # to_dict 需要访问的关系，列表查询据此批量预加载，避免逐行懒加载
+    SERIALIZE_RELATIONS = ('book', 'user')
+    
+    # 逾期每天的罚款金额（元）
+    DAILY_FINE_RATE = 0.5
+    
     def __repr__(self):
         return f'<Borrow {self.id}>'
     
@@ -38,6 +49,7 @@ class Borrow(db.Model):
             'id': self.id,
             'book_id': self.book_id,
             'book_title': self.book.title if self.book else None,
+            'item_id': self.item_id,
             'user_id': self.user_id,
             'username': self.user.username if self.user else None,
             'borrow_date': self.borrow_date.strftime('%Y-%m-%d %H:%M:%S'),
@@ -68,7 +80,7 @@ class Borrow(db.Model):
         return borrow_date + timedelta(days=days)
     
     @staticmethod
-    def calculate_fine(due_date, return_date=None, daily_rate=0.5):
+    def calculate_fine(due_date, return_date=None, daily_rate=DAILY_FINE_RATE):
         """
         计算罚款金额
         
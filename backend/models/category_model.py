@@ -47,11 +47,55 @@ class Category(db.Model):
         """
         将模型转换为树形结构的字典
         
+        通过闭包表一次查询出整棵子树，在内存中组装
+        
         Returns:
             dict: 包含子分类的分类信息字典
         """
-        result = self.to_dict()
-        children = self.children.order_by(Category.sort_order).all()
-        if children:
-            result['children'] = [child.to_tree_dict() for child in children]
-        return result 
\ No newline at end of file
+        subtree = Category.query.join(
+            CategoryClosure, CategoryClosure.descendant_id == Category.id
+        ).filter(CategoryClosure.ancestor_id == self.id).all()
+        return Category.build_tree(subtree, root_id=self.id)[0]
+    
+    @staticmethod
+    def build_tree(categories, root_id=None):
+        """
+        将分类列表组装为树形结构，时间复杂度 O(n)
+        
+        Args:
+            categories (list): 分类对象列表，需包含所有需要组装的节点
+            root_id (int): 根节点ID，默认以所有顶级分类为根
+            
+        Returns:
+            list: 树形结构的分类信息字典列表，同级按 sort_order 排序
+        """
+        categories = sorted(categories, key=lambda category: (category.sort_order or 0, category.id))
+        nodes = {category.id: category.to_dict() for category in categories}
+        
+        roots = []
+        for category in categories:
+            node = nodes[category.id]
+            if category.id == root_id or (root_id is None and category.parent_id is None):
+                roots.append(node)
+            elif category.parent_id in nodes:
+                nodes[category.parent_id].setdefault('children', []).append(node)
+        return roots
+
+
+class CategoryClosure(db.Model):
+    """
+    分类闭包表
+    保存每个分类与其所有祖先（包括自身）的关系，子树查询和整体移动都可以用一条集合语句完成
+    """
+    __tablename__ = 'category_closure'
+    __table_args__ = (
+        # 查询某个分类的所有祖先
+        db.Index('ix_category_closure_descendant_depth', 'descendant_id', 'depth'),
+    )
+    
+    ancestor_id = db.Column(db.Integer, db.ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True, comment='祖先分类ID')
+    descendant_id = db.Column(db.Integer, db.ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True, comment='后代分类ID')
+    depth = db.Column(db.Integer, nullable=False, comment='层级距离，自身为0')
+    
+    def __repr__(self):
+        return f'<CategoryClosure {self.ancestor_id}->{self.descendant_id}>'
\ No newline at end of file
@@ -0,0 +1,68 @@
+from datetime import datetime
+from . import db
+
+class JobRun(db.Model):
+    """
+    定时任务执行记录
+    """
+    __tablename__ = 'job_runs'
+    __table_args__ = (
+        # 按任务查询最近的执行记录
+        db.Index('ix_job_runs_job_name_started_at', 'job_name', 'started_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    job_name = db.Column(db.String(50), nullable=False, comment='任务名称')
+    scheduled_at = db.Column(db.DateTime, comment='计划执行时间')
+    started_at = db.Column(db.DateTime, default=datetime.now, nullable=False, comment='开始时间')
+    finished_at = db.Column(db.DateTime, comment='结束时间')
+    duration_ms = db.Column(db.Integer, comment='执行耗时（毫秒）')
+    status = db.Column(
+        db.Enum('running', 'success', 'failed'),
+        default='running',
+        nullable=False,
+        comment='状态: 执行中/成功/失败'
+    )
+    result = db.Column(db.Text, comment='执行结果（JSON）')
+    error = db.Column(db.Text, comment='错误信息')
+    worker = db.Column(db.String(100), comment='执行进程')
+    
+    def __repr__(self):
+        return f'<JobRun {self.job_name} {self.status}>'
+    
+    def to_dict(self):
+        """
+        将模型转换为字典
+        
+        Returns:
+            dict: 执行记录字典
+        """
+        return {
+            'id': self.id,
+            'job_name': self.job_name,
+            'scheduled_at': self.scheduled_at.strftime('%Y-%m-%d %H:%M:%S') if self.scheduled_at else None,
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'finished_at': self.finished_at.strftime('%Y-%m-%d %H:%M:%S') if self.finished_at else None,
+            'duration_ms': self.duration_ms,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'worker': self.worker
+        }
+
+
+class JobLock(db.Model):
+    """
+    定时任务锁
+    多个进程同时运行调度器时，通过条件更新抢占锁，保证每次计划执行只有一个进程执行
+    """
+    __tablename__ = 'job_locks'
+    
+    name = db.Column(db.String(50), primary_key=True, comment='任务名称')
+    owner = db.Column(db.String(100), comment='持有锁的进程')
+    locked_until = db.Column(db.DateTime, comment='锁过期时间')
+    last_scheduled_at = db.Column(db.DateTime, comment='最近一次被执行的计划时间')
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+    
+    def __repr__(self):
+        return f'<JobLock {self.name} {self.owner}>'
\ No newline at end of file
@@ -0,0 +1,28 @@
+from . import db
+
+class BookBorrowDaily(db.Model):
+    """
+    图书每日借阅次数
+    按天分桶，用于统计最近一天/一周/一个月的热门图书
+    """
+    __tablename__ = 'book_borrow_daily'
+    
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id', ondelete='CASCADE'), primary_key=True, comment='图书ID')
+    day = db.Column(db.Date, primary_key=True, index=True, comment='借阅日期')
+    count = db.Column(db.Integer, nullable=False, default=0, comment='借阅次数')
+    
+    def __repr__(self):
+        return f'<BookBorrowDaily {self.book_id}@{self.day}={self.count}>'
+
+
+class BookBorrowTotal(db.Model):
+    """
+    图书累计借阅次数
+    """
+    __tablename__ = 'book_borrow_totals'
+    
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id', ondelete='CASCADE'), primary_key=True, comment='图书ID')
+    count = db.Column(db.Integer, nullable=False, default=0, index=True, comment='借阅次数')
+    
+    def __repr__(self):
+        return f'<BookBorrowTotal {self.book_id}={self.count}>'
\ No newline at end of file
@@ -0,0 +1,21 @@
+from . import db
+
+class BookSearchTerm(db.Model):
+    """
+    图书全文检索倒排索引
+    每一行表示一个词项出现在某本图书中，weight 为该词项在各字段中的权重之和
+    """
+    __tablename__ = 'book_search_terms'
+
+    term = db.Column(db.String(32), primary_key=True, comment='词项')
+    book_id = db.Column(
+        db.Integer,
+        db.ForeignKey('books.id', ondelete='CASCADE'),
+        primary_key=True,
+        index=True,
+        comment='图书ID'
+    )
+    weight = db.Column(db.Integer, nullable=False, default=1, comment='词项权重')
+
+    def __repr__(self):
+        return f'<BookSearchTerm {self.term}:{self.book_id}>'
\ No newline at end of file
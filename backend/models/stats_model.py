@@ -0,0 +1,61 @@
+import random
+from datetime import datetime
+from . import db
+
+class StatCounter(db.Model):
+    """
+    统计计数器模型
+    保存仪表盘等处使用的聚合数据，由业务操作增量维护
+    """
+    __tablename__ = 'stat_counters'
+    
+    # 每个计数器分散到多行：写入时随机选择一行，读取时求和，
+    # 借还等并发事务不再争用同一行的行锁。第0行沿用计数器名称，其余行名称为 name#序号
+    SHARDS = 16
+    
+    name = db.Column(db.String(50), primary_key=True, comment='计数器名称')
+    value = db.Column(db.BigInteger, nullable=False, default=0, comment='计数值')
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+    
+    def __repr__(self):
+        return f'<StatCounter {self.name}={self.value}>'
+    
+    @staticmethod
+    def shard_names(name):
+        """
+        计数器所有分片行的名称
+        
+        Args:
+            name (str): 计数器名称
+            
+        Returns:
+            list: 分片行名称，第一个为计数器名称本身
+        """
+        return [name] + [f'{name}#{shard}' for shard in range(1, StatCounter.SHARDS)]
+    
+    @staticmethod
+    def random_shard(name):
+        """
+        随机选择一个分片行，用于写入
+        
+        Args:
+            name (str): 计数器名称
+            
+        Returns:
+            str: 分片行名称
+        """
+        shard = random.randrange(StatCounter.SHARDS)
+        return f'{name}#{shard}' if shard else name
+    
+    @staticmethod
+    def counter_name(shard_name):
+        """
+        分片行名称对应的计数器名称
+        
+        Args:
+            shard_name (str): 分片行名称
+            
+        Returns:
+            str: 计数器名称
+        """
+        return shard_name.split('#', 1)[0]
\ No newline at end of file
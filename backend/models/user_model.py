@@ -1,5 +1,6 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import selectinload
+from utils.password_util import hash_password, verify_password, needs_rehash
 from . import db
 
 class User(db.Model):
@@ -7,6 +8,10 @@ class User(db.Model):
     用户模型
     """
     __tablename__ = 'users'
+    __table_args__ = (
+        # 游标分页按 (created_at, id) 倒序扫描
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     username = db.Column(db.String(50), unique=True, nullable=False, index=True, comment='用户名')
@@ -26,6 +31,7 @@ class User(db.Model):
     )
     avatar_url = db.Column(db.String(255), comment='头像URL')
     last_login = db.Column(db.DateTime, comment='最后登录时间')
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0', comment='令牌版本，修改密码后递增使之前签发的令牌失效')
     created_at = db.Column(db.DateTime, default=datetime.now, comment='创建时间')
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
     
@@ -42,12 +48,12 @@ class User(db.Model):
     @password.setter
     def password(self, password):
         """
-        设置密码，自动进行哈希处理
+        设置密码，自动进行哈希处理，哈希在密码进程池中计算
         
         Args:
             password (str): 原始密码
         """
-        self._password = generate_password_hash(password)
+        self._password = hash_password(password)
     
     def check_password(self, password):
         """
@@ -59,7 +65,16 @@ class User(db.Model):
         Returns:
             bool: 密码是否正确
         """
-        return check_password_hash(self._password, password)
+        return verify_password(self._password, password)
+    
+    def password_needs_rehash(self):
+        """
+        判断密码哈希是否使用了旧的算法参数，登录成功后据此升级哈希
+        
+        Returns:
+            bool: 是否需要重新计算哈希
+        """
+        return needs_rehash(self._password)
     
     def update_last_login(self):
         """
@@ -96,6 +111,9 @@ class User(db.Model):
         }
         
         if with_borrows:
-            result['borrows'] = [borrow.to_dict() for borrow in self.borrows]
+            from .borrow_model import Borrow
+            # 借阅记录的用户即当前用户，只需预加载图书
+            borrows = self.borrows.options(selectinload(Borrow.book)).all()
+            result['borrows'] = [borrow.to_dict() for borrow in borrows]
             
         return result 
\ No newline at end of file
@@ -1,8 +1,15 @@
 from flask import Blueprint, request, jsonify, current_app, session
 from models.user_model import User
 from models import db
+from services.stats_service import StatsService
+from services.user_service import UserService
+from utils.token_cache import token_hash, get_cached_token, cache_token, revoke_token, is_token_revoked
+from utils.principal_cache import get_principal
+from utils.password_util import PasswordPoolBusy
+from utils.rate_limit import check_login_rate, record_login_failure, reset_login_failures
 from datetime import datetime, timedelta
 import logging
+import math
 import secrets
 import jwt
 
@@ -11,23 +18,46 @@ auth = Blueprint('auth', __name__)
 # JWT密钥
 JWT_SECRET = 'your-secret-key'  # 在实际应用中应该使用环境变量
 
-def generate_token(user_id):
+def generate_token(user_id, token_version=0):
     """生成JWT token"""
     payload = {
         'user_id': user_id,
+        'ver': token_version,  # 用户的令牌版本，修改密码后版本递增，之前签发的token失效
         'exp': datetime.utcnow() + timedelta(days=1)  # token有效期1天
     }
     return jwt.encode(payload, JWT_SECRET, algorithm='HS256')
 
 def verify_token(token):
-    """验证JWT token"""
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-        return payload['user_id']
-    except jwt.ExpiredSignatureError:
+    """
+    验证JWT token
+    
+    验证通过的token按哈希缓存到过期为止，同一个token再次请求时跳过签名校验。
+    每次都检查退出登录的吊销记录，并将令牌版本与用户快照比较，修改密码或删除用户后旧token失效。
+    """
+    key = token_hash(token)
+    cached = get_cached_token(key)
+    if cached is None:
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            return None
+        except jwt.InvalidTokenError:
+            return None
+        
+        cached = (payload['user_id'], payload.get('ver', 0))
+        cache_token(key, cached[0], payload['exp'], cached[1])
+    
+    user_id, version = cached
+    
+    # 已退出登录的token
+    if is_token_revoked(key):
         return None
-    except jwt.InvalidTokenError:
+    
+    # 用户已删除或修改过密码
+    principal = get_principal(user_id)
+    if principal is None or principal.token_version != version:
         return None
+    return user_id
 
 @auth.route('/login', methods=['POST'])
 def login():
@@ -42,17 +72,49 @@ def login():
                 'code': 400,
                 'message': '用户名和密码不能为空'
             }), 400
+        
+        if not isinstance(username, str) or not isinstance(password, str):
+            return jsonify({
+                'code': 400,
+                'message': '用户名和密码必须是字符串'
+            }), 400
+        
+        # 先按IP和用户名限流，超过频率的请求不查询数据库也不计算密码哈希
+        wait = check_login_rate(request.remote_addr, username)
+        if wait:
+            return jsonify({
+                'code': 429,
+                'message': '登录尝试过于频繁，请稍后重试'
+            }), 429, {'Retry-After': str(math.ceil(wait))}
             
         user = User.query.filter_by(username=username).first()
         
+        if user and user.status == 'locked':
+            return jsonify({
+                'code': 403,
+                'message': '账号已被锁定，请联系管理员'
+            }), 403
+        
         if not user or not user.check_password(password):
+            # 连续失败次数达到上限时锁定账号
+            failures = record_login_failure(username)
+            if user and failures >= current_app.config['LOGIN_MAX_FAILURES']:
+                UserService.update_user_status(user.id, 'locked')
+                current_app.logger.warning(f"用户 {username} 连续 {failures} 次登录失败，账号已锁定")
             return jsonify({
                 'code': 401,
                 'message': '用户名或密码错误'
             }), 401
+        
+        reset_login_failures(username)
+        
+        # 哈希算法参数已调整时，使用明文密码透明升级哈希
+        if user.password_needs_rehash():
+            user.password = password
+            db.session.commit()
             
         # 生成token
-        access_token = generate_token(user.id)
+        access_token = generate_token(user.id, user.token_version)
             
         return jsonify({
             'code': 200,
@@ -69,6 +131,12 @@ def login():
                 }
             }
         })
+    except PasswordPoolBusy as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 503,
+            'message': e.description
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         current_app.logger.error(f"登录失败: {str(e)}")
         return jsonify({
@@ -76,6 +144,24 @@ def login():
             'message': str(e)
         }), 500
 
+@auth.route('/logout', methods=['POST'])
+def logout():
+    """退出登录，吊销当前token"""
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split(' ')[1]
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+            revoke_token(token_hash(token), payload['exp'])
+        except jwt.InvalidTokenError:
+            # 已过期或无效的token无需吊销
+            pass
+    
+    return jsonify({
+        'code': 200,
+        'message': '退出成功'
+    })
+
 @auth.route('/register', methods=['POST'])
 def register():
     """
@@ -113,6 +199,7 @@ def register():
         )
         user.password = password
         db.session.add(user)
+        StatsService.incr(StatsService.TOTAL_USERS)
         db.session.commit()
         
         # 生成简单的访问令牌，不使用JWT
@@ -136,6 +223,12 @@ def register():
             }
         })
         
+    except PasswordPoolBusy as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 503,
+            'message': e.description
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({
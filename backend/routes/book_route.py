@@ -6,11 +6,16 @@ book_bp = Blueprint('book', __name__, url_prefix='/api/books')
 
 # 注册路由
 book_bp.route('/', methods=['GET'])(BookController.get_books)
+book_bp.route('/export', methods=['GET'])(BookController.export_books)
 book_bp.route('/<int:book_id>', methods=['GET'])(BookController.get_book)
 book_bp.route('/', methods=['POST'])(BookController.create_book)
+book_bp.route('/import', methods=['POST'])(BookController.import_books)
 book_bp.route('/<int:book_id>', methods=['PUT'])(BookController.update_book)
 book_bp.route('/<int:book_id>', methods=['DELETE'])(BookController.delete_book)
 book_bp.route('/check-isbn', methods=['GET'])(BookController.check_isbn_exists)
+book_bp.route('/<int:book_id>/items', methods=['GET'])(BookController.get_book_items)
+book_bp.route('/<int:book_id>/items', methods=['POST'])(BookController.add_book_items)
+book_bp.route('/items/<int:item_id>', methods=['PUT'])(BookController.update_book_item)
 
 def register_book_routes(app):
     """
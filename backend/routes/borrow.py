@@ -0,0 +1,85 @@
+from flask import Blueprint, request, jsonify
+from controllers.borrow_controller import BorrowController
+from utils.auth_utils import login_required
+
+borrow = Blueprint('borrow', __name__)
+
+@borrow.route('', methods=['GET', 'OPTIONS'])
+@login_required
+def get_borrows():
+    """获取借阅记录列表"""
+    if request.method == 'OPTIONS':
+        return jsonify({'code': 200, 'message': 'OK'})
+    return BorrowController.get_borrows()
+
+@borrow.route('/export', methods=['GET', 'OPTIONS'])
+@login_required
+def export_borrows():
+    """流式导出借阅记录"""
+    if request.method == 'OPTIONS':
+        return jsonify({'code': 200, 'message': 'OK'})
+    return BorrowController.export_borrows()
+
+@borrow.route('/<int:borrow_id>', methods=['GET', 'OPTIONS'])
+@login_required
+def get_borrow(borrow_id):
+    """获取借阅记录详情"""
+    if request.method == 'OPTIONS':
+        return jsonify({'code': 200, 'message': 'OK'})
+    return BorrowController.get_borrow(borrow_id)
+
+@borrow.route('', methods=['POST', 'OPTIONS'])
+@login_required
+def borrow_book():
+    """借阅图书"""
+    if request.method == 'OPTIONS':
+        return jsonify({'code': 200, 'message': 'OK'})
+    return BorrowController.borrow_book()
+
+@borrow.route('/<int:borrow_id>/return', methods=['POST', 'OPTIONS'])
+@login_required
+def return_book(borrow_id):
+    """归还图书"""
+    if request.method == 'OPTIONS':
+        return jsonify({'code': 200, 'message': 'OK'})
+    return BorrowController.return_book(borrow_id)
+
+@borrow.route('/batch', methods=['POST', 'OPTIONS'])
+@login_required
+def batch_borrow():
+    """批量借阅图书"""
+    if request.method == 'OPTIONS':
+        return jsonify({'code': 200, 'message': 'OK'})
+    return BorrowController.batch_borrow()
+
+@borrow.route('/batch-return', methods=['POST', 'OPTIONS'])
+@login_required
+def batch_return():
+    """批量归还图书"""
+    if request.method == 'OPTIONS':
+        return jsonify({'code': 200, 'message': 'OK'})
+    return BorrowController.batch_return()
+
+@borrow.route('/pay-fine', methods=['POST', 'OPTIONS'])
+@login_required
+def pay_fine():
+    """支付罚款"""
+    if request.method == 'OPTIONS':
+        return jsonify({'code': 200, 'message': 'OK'})
+    return BorrowController.pay_fine()
+
+@borrow.route('/check-overdue', methods=['POST', 'OPTIONS'])
+@login_required
+def check_overdue():
+    """立即检查逾期借阅"""
+    if request.method == 'OPTIONS':
+        return jsonify({'code': 200, 'message': 'OK'})
+    return BorrowController.check_overdue()
+
+@borrow.route('/<int:borrow_id>', methods=['DELETE', 'OPTIONS'])
+@login_required
+def delete_borrow(borrow_id):
+    """删除借阅记录"""
+    if request.method == 'OPTIONS':
+        return jsonify({'code': 200, 'message': 'OK'})
+    return BorrowController.delete_borrow(borrow_id)  
\ No newline at end of file
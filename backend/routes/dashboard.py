@@ -1,32 +1,44 @@
-from flask import Blueprint, jsonify
+import os
+from flask import Blueprint, current_app, jsonify, request
 from datetime import datetime, timedelta
 from models.book_model import Book
 from models.user_model import User
 from models.borrow_model import Borrow
 from models import db
-from sqlalchemy import func
+from services.stats_service import StatsService
+from services.popularity_service import PopularityService
+from services.job_service import JobService
+from utils.compression import EncodedCache, encoded_response
+from utils.db_engine import pool_metrics
+from utils.db_routing import read_only, replica_keys
+from utils.auth_utils import login_required, roles_required
+from utils.serializer_util import dumps
 
 dashboard = Blueprint('dashboard', __name__)
 
+# 编码和压缩后的统计数据响应，计数器未变化时直接复用
+_statistics_cache = EncodedCache()
+
 @dashboard.route('/statistics', methods=['GET'])
+@read_only
 def get_statistics():
     """获取统计数据"""
     try:
-        total_books = Book.query.count()
-        total_users = User.query.count()
-        total_borrows = Borrow.query.count()
-        active_borrows = Borrow.query.filter_by(return_date=None).count()
+        # 读取增量维护的计数器，不再对全表计数
+        stats = StatsService.get_statistics()
+        data = {
+            'totalBooks': stats[StatsService.TOTAL_BOOKS],
+            'totalUsers': stats[StatsService.TOTAL_USERS],
+            'totalBorrows': stats[StatsService.TOTAL_BORROWS],
+            'activeBorrows': stats[StatsService.ACTIVE_BORROWS]
+        }
         
-        return jsonify({
+        body = _statistics_cache.get('statistics', tuple(data.values()), lambda: dumps({
             'code': 0,
             'message': 'success',
-            'data': {
-                'totalBooks': total_books,
-                'totalUsers': total_users,
-                'totalBorrows': total_borrows,
-                'activeBorrows': active_borrows
-            }
-        })
+            'data': data
+        }))
+        return encoded_response(body)
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -35,6 +47,7 @@ def get_statistics():
         }), 500
 
 @dashboard.route('/recent-borrows', methods=['GET'])
+@read_only
 def get_recent_borrows():
     """获取最近借阅记录"""
     try:
@@ -69,20 +82,21 @@ def get_recent_borrows():
         }), 500
 
 @dashboard.route('/popular-books', methods=['GET'])
+@read_only
 def get_popular_books():
     """获取热门图书"""
     try:
-        # 使用子查询获取每本书的借阅次数
-        popular_books = db.session.query(
-            Book,
-            func.count(Borrow.id).label('borrow_count')
-        ).join(
-            Borrow, Book.id == Borrow.book_id
-        ).group_by(
-            Book.id
-        ).order_by(
-            func.count(Borrow.id).desc()
-        ).limit(10).all()
+        window = request.args.get('window', 'all')
+        if window not in PopularityService.WINDOWS:
+            return jsonify({
+                'code': 400,
+                'message': f"window 只能是 {', '.join(PopularityService.WINDOWS)}"
+            }), 400
+        category_id = request.args.get('category_id', type=int)
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        
+        # 读取按天分桶维护的借阅次数，不再对借阅表全量聚合
+        popular_books = PopularityService.top_books(window, category_id, limit)
         
         return jsonify({
             'code': 0,
@@ -99,4 +113,48 @@ def get_popular_books():
         return jsonify({
             'code': 500,
             'message': f'获取热门图书失败：{str(e)}'
-        }), 500 
\ No newline at end of file
+        }), 500
+
+@dashboard.route('/jobs', methods=['GET'])
+@login_required
+@roles_required('admin')
+def get_job_metrics():
+    """获取定时任务执行情况，仅管理员可用"""
+    try:
+        days = min(max(request.args.get('days', 7, type=int), 1), 90)
+        
+        return jsonify({
+            'code': 0,
+            'message': 'success',
+            'data': JobService.get_metrics(days)
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 500,
+            'message': f'获取定时任务执行情况失败：{str(e)}'
+        }), 500
+
+@dashboard.route('/db-pool', methods=['GET'])
+@login_required
+@roles_required('admin')
+def get_db_pool_metrics():
+    """获取当前工作进程的数据库连接池状态，仅管理员可用"""
+    try:
+        pools = {'default': pool_metrics(db.engine)}
+        for key in replica_keys(current_app):
+            pools[key] = pool_metrics(db.get_engine(current_app, key))
+        
+        return jsonify({
+            'code': 0,
+            'message': 'success',
+            'data': {
+                'pid': os.getpid(),
+                **pools
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'code': 500,
+            'message': f'获取连接池状态失败：{str(e)}'
+        }), 500
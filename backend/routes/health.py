@@ -0,0 +1,23 @@
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+from models import db
+
+health = Blueprint('health', __name__)
+
+@health.route('', methods=['GET'])
+def check_health():
+    """健康检查，供负载均衡和进程管理器探测，不需要登录"""
+    try:
+        db.session.execute(text('SELECT 1'))
+        return jsonify({
+            'code': 0,
+            'message': 'success',
+            'data': {'status': 'ok', 'database': 'ok'}
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 503,
+            'message': f'数据库不可用：{str(e)}',
+            'data': {'status': 'error', 'database': 'error'}
+        }), 503
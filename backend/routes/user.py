@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify, g
 from models.user_model import User
-from utils.auth_utils import login_required
+from utils.auth_utils import login_required, roles_required
+from utils.principal_cache import invalidate_principal
+from controllers.user_controller import UserController
 
 user = Blueprint('user', __name__)
 
@@ -9,7 +11,13 @@ user = Blueprint('user', __name__)
 def get_current_user():
     """获取当前用户信息"""
     try:
-        current_user = g.current_user
+        # g.current_user 只是用户快照，资料字段需要查询完整的用户信息
+        current_user = User.query.get(g.current_user.id)
+        if not current_user:
+            return jsonify({
+                'code': 404,
+                'message': '用户不存在'
+            }), 404
         return jsonify({
             'code': 0,
             'message': '获取成功',
@@ -28,6 +36,13 @@ def get_current_user():
             'message': str(e)
         }), 500
 
+@user.route('/export', methods=['GET'])
+@login_required
+@roles_required('admin')
+def export_users():
+    """流式导出用户，仅管理员可用"""
+    return UserController.export_users()
+
 @user.route('/<int:user_id>', methods=['PUT'])
 @login_required
 def update_user(user_id):
@@ -62,6 +77,7 @@ def update_user(user_id):
             user.avatar = data['avatar']
             
         user.save()
+        invalidate_principal(user.id)
         
         return jsonify({
             'code': 0,
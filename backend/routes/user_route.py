@@ -7,6 +7,7 @@ auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 # 用户路由
 user_bp.route('/', methods=['GET'])(UserController.get_users)
+user_bp.route('/export', methods=['GET'])(UserController.export_users)
 user_bp.route('/<int:user_id>', methods=['GET'])(UserController.get_user)
 user_bp.route('/', methods=['POST'])(UserController.create_user)
 user_bp.route('/<int:user_id>', methods=['PUT'])(UserController.update_user)
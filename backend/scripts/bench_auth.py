@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import init_db, db
+from models.user_model import User
+from config import config
+from routes.auth import auth, generate_token, verify_token
+from routes.book import book
+from utils.principal_cache import clear_principals
+from utils.token_cache import clear_tokens
+
+def create_app():
+    """创建使用内存数据库的Flask应用"""
+    app = Flask(__name__)
+    app.config.from_object(config['development'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    init_db(app)
+    app.register_blueprint(auth, url_prefix='/api/auth')
+    app.register_blueprint(book, url_prefix='/api/books')
+    return app
+
+def measure(func, iterations):
+    """返回每次调用的平均耗时（微秒）"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+def bench_auth():
+    """对比令牌缓存命中前后单次请求的认证开销"""
+    parser = argparse.ArgumentParser(description='认证开销基准测试')
+    parser.add_argument('-n', '--iterations', type=int, default=20000, help='verify_token 调用次数')
+    parser.add_argument('-r', '--requests', type=int, default=1000, help='HTTP请求次数')
+    args = parser.parse_args()
+    
+    app = create_app()
+    with app.app_context():
+        user = User(username='bench', email='bench@example.com')
+        user.password = 'bench123'
+        db.session.add(user)
+        db.session.commit()
+        token = generate_token(user.id, user.token_version)
+    
+    def uncached_verify():
+        clear_tokens()
+        verify_token(token)
+    
+    # verify_token 需要查询用户快照，在应用上下文中调用
+    with app.app_context():
+        clear_tokens()
+        verify_token(token)
+        cold = measure(uncached_verify, args.iterations)
+        warm = measure(lambda: verify_token(token), args.iterations)
+    print(f"verify_token 未命中缓存: {cold:8.2f} us/次")
+    print(f"verify_token 命中缓存:   {warm:8.2f} us/次")
+    
+    # 完整请求：令牌校验 + 用户快照，per_page=1 使图书查询的开销尽量小
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    def uncached_request():
+        clear_tokens()
+        clear_principals()
+        client.get('/api/books?per_page=1', headers=headers)
+    
+    client.get('/api/books?per_page=1', headers=headers)
+    cold = measure(uncached_request, args.requests)
+    warm = measure(lambda: client.get('/api/books?per_page=1', headers=headers), args.requests)
+    print(f"GET /api/books 认证未缓存: {cold:8.2f} us/次")
+    print(f"GET /api/books 认证已缓存: {warm:8.2f} us/次")
+
+if __name__ == '__main__':
+    bench_auth()
\ No newline at end of file
@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# 校准时使用的初始迭代次数
+BASE_ITERATIONS = 20000
+
+def measure(method, rounds):
+    """返回一次密码验证的耗时（毫秒），取多次测量的中位数"""
+    pwhash = generate_password_hash('calibrate-password', method)
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        check_password_hash(pwhash, 'calibrate-password')
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def calibrate():
+    """按单次验证的耗时预算计算 PBKDF2 迭代次数"""
+    parser = argparse.ArgumentParser(description='校准密码哈希参数')
+    parser.add_argument('--target-ms', type=float, default=100, help='单次密码验证的目标耗时（毫秒）')
+    # users.password 列长度为128，sha512 生成的哈希约167个字符会超长
+    parser.add_argument('--digest', default='sha256', choices=['sha256'], help='PBKDF2 使用的摘要算法')
+    parser.add_argument('--rounds', type=int, default=5, help='每次测量的重复次数')
+    args = parser.parse_args()
+    
+    # 耗时与迭代次数近似线性，先按初始迭代次数估算，再测量一次修正
+    elapsed = measure(f'pbkdf2:{args.digest}:{BASE_ITERATIONS}', args.rounds)
+    iterations = int(BASE_ITERATIONS * args.target_ms / elapsed)
+    elapsed = measure(f'pbkdf2:{args.digest}:{iterations}', args.rounds)
+    iterations = max(10000, int(round(iterations * args.target_ms / elapsed, -4)))
+    
+    method = f'pbkdf2:{args.digest}:{iterations}'
+    elapsed = measure(method, args.rounds)
+    print(f"单次验证耗时 {elapsed:.1f} 毫秒（目标 {args.target_ms:g} 毫秒）")
+    print("在 .env 中配置：")
+    print(f"PASSWORD_HASH_METHOD={method}")
+
+if __name__ == '__main__':
+    calibrate()
\ No newline at end of file
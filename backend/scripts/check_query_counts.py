@@ -0,0 +1,85 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import init_db, db
+from models.user_model import User
+from models.category_model import Category
+from models.book_model import Book
+from models.borrow_model import Borrow
+from config import config
+from services.book_service import BookService
+from services.borrow_service import BorrowService
+from utils.query_util import assert_max_queries
+
+# 每页数量足够大时，N+1 问题会表现为上百条语句
+PAGE_SIZE = 100
+
+def create_app():
+    """创建使用内存数据库的Flask应用"""
+    app = Flask(__name__)
+    app.config.from_object(config['development'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    init_db(app)
+    return app
+
+def seed_data():
+    """写入测试数据"""
+    categories = [Category(name=f'分类{i}', code=f'C{i}') for i in range(5)]
+    db.session.add_all(categories)
+    
+    users = []
+    for i in range(10):
+        user = User(username=f'reader{i}', email=f'reader{i}@example.com')
+        user.password = 'reader123'
+        users.append(user)
+    db.session.add_all(users)
+    db.session.flush()
+    
+    books = [
+        Book(title=f'图书{i}', author=f'作者{i}', category_id=categories[i % 5].id)
+        for i in range(PAGE_SIZE)
+    ]
+    db.session.add_all(books)
+    db.session.flush()
+    
+    now = datetime.now()
+    db.session.add_all([
+        Borrow(
+            book_id=book.id,
+            user_id=users[i % 10].id,
+            borrow_date=now,
+            due_date=now + timedelta(days=14)
+        )
+        for i, book in enumerate(books)
+    ])
+    db.session.commit()
+
+def check_query_counts():
+    """检查列表接口的SQL语句数量不随行数增长"""
+    app = create_app()
+    
+    with app.app_context():
+        seed_data()
+        db.session.expire_all()
+        
+        # 计数 + 列表 + 分类
+        with assert_max_queries(3) as counter:
+            books, _, _ = BookService.get_books(per_page=PAGE_SIZE)
+            [book.to_dict() for book in books]
+        print(f"图书列表 {len(books)} 行，执行 {counter.count} 条SQL语句")
+        
+        db.session.expire_all()
+        
+        # 计数 + 列表 + 图书 + 用户
+        with assert_max_queries(4) as counter:
+            borrows, _, _ = BorrowService.get_borrows(per_page=PAGE_SIZE)
+            [borrow.to_dict() for borrow in borrows]
+        print(f"借阅列表 {len(borrows)} 行，执行 {counter.count} 条SQL语句")
+
+if __name__ == '__main__':
+    check_query_counts()
\ No newline at end of file
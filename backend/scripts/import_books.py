@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from services.import_service import BookImportService
+
+def import_books(path, file_format=None, batch_size=1000):
+    """
+    从文件批量导入图书
+    
+    Args:
+        path (str): 导入文件路径
+        file_format (str): 文件格式，默认根据扩展名判断
+        batch_size (int): 每批写入的行数
+    """
+    if not file_format:
+        file_format = 'ndjson' if path.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+    
+    app = create_app()
+    
+    with app.app_context(), open(path, 'rb') as stream:
+        records = BookImportService.parse(stream, file_format)
+        report = BookImportService.import_books(
+            records,
+            batch_size=batch_size,
+            progress=lambda total, imported: print(f"已处理 {total} 行，已导入 {imported} 本")
+        )
+    
+    print(f"导入完成：共 {report['total']} 行，导入 {report['imported']} 本，"
+          f"重复 {report['duplicates']} 本，失败 {report['failed']} 行")
+    for error in report['errors']:
+        print(f"第 {error['row']} 行 (ISBN: {error['isbn']}): {error['error']}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='批量导入图书')
+    parser.add_argument('path', help='CSV或NDJSON文件路径')
+    parser.add_argument('--format', choices=BookImportService.FORMATS, help='文件格式，默认根据扩展名判断')
+    parser.add_argument('--batch-size', type=int, default=1000, help='每批写入的行数')
+    args = parser.parse_args()
+    
+    import_books(args.path, args.format, args.batch_size)
\ No newline at end of file
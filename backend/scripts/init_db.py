@@ -10,13 +10,19 @@ from models import init_db, db
 from models.user_model import User
 from models.category_model import Category
 from models.book_model import Book
+from models.book_item_model import BookItem
 from models.borrow_model import Borrow
 from config import config
+from services.book_service import BookService
+from services.search_service import SearchService
+from services.stats_service import StatsService
+from services.popularity_service import PopularityService
+from services.category_service import CategoryService
 
 def create_app():
     """创建Flask应用"""
     app = Flask(__name__)
-    app.config.from_object(config)
+    app.config.from_object(config[os.environ.get('FLASK_ENV', 'default')])
     init_db(app)
     return app
 
@@ -27,6 +33,7 @@ def init_test_data():
     with app.app_context():
         # 清空现有数据
         Borrow.query.delete()
+        BookItem.query.delete()
         Book.query.delete()
         Category.query.delete()
         User.query.delete()
@@ -225,6 +232,13 @@ def init_test_data():
         # 提交所有更改
         db.session.commit()
         
+        # 为示例图书各创建一个副本并关联借阅记录，建立全文索引，重建分类闭包表，并校准统计计数器
+        BookService.migrate_items()
+        SearchService.rebuild_index()
+        CategoryService.rebuild_closure()
+        StatsService.reconcile()
+        PopularityService.rebuild()
+        
         print("测试数据初始化完成！")
         print("\n可用账号：")
         print("1. 管理员 - admin/admin123")
@@ -0,0 +1,21 @@
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from services.book_service import BookService
+
+def migrate_book_items():
+    """为还没有副本的图书创建副本"""
+    app = create_app()
+    
+    with app.app_context():
+        total = BookService.migrate_items(
+            progress=lambda count: print(f"已处理 {count} 本图书")
+        )
+        print(f"副本迁移完成，共为 {total} 本图书创建副本")
+
+if __name__ == '__main__':
+    migrate_book_items()
\ No newline at end of file
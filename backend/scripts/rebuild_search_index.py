@@ -0,0 +1,21 @@
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from services.search_service import SearchService
+
+def rebuild_search_index():
+    """重建图书全文索引"""
+    app = create_app()
+    
+    with app.app_context():
+        total = SearchService.rebuild_index(
+            progress=lambda count: print(f"已索引 {count} 本图书")
+        )
+        print(f"全文索引重建完成，共 {total} 本图书")
+
+if __name__ == '__main__':
+    rebuild_search_index()
\ No newline at end of file
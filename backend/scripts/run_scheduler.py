@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from services.job_service import scheduler
+
+def run_scheduler():
+    """以独立进程运行定时任务调度器，或立即执行一次指定任务"""
+    parser = argparse.ArgumentParser(description='运行定时任务')
+    parser.add_argument('--run', metavar='JOB', help='立即执行一次指定任务后退出')
+    parser.add_argument('--list', action='store_true', help='列出已注册的任务')
+    args = parser.parse_args()
+    
+    app = create_app()
+    
+    if args.list:
+        for job in scheduler.jobs.values():
+            print(f"{job.name}\t{job.schedule.expr}")
+        return
+    
+    if args.run:
+        if args.run not in scheduler.jobs:
+            parser.error(f"任务不存在：{args.run}")
+        with app.app_context():
+            run = scheduler.run(args.run)
+            if run is None:
+                print("任务正在其他进程中执行")
+            else:
+                print(f"{run.status}，耗时 {run.duration_ms} 毫秒：{run.result or run.error}")
+        return
+    
+    scheduler.start()
+    print(f"调度器已启动，共 {len(scheduler.jobs)} 个任务，按 Ctrl+C 退出")
+    try:
+        while scheduler.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+if __name__ == '__main__':
+    run_scheduler()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import func
+from werkzeug.exceptions import HTTPException
+from models import init_db, db
+from models.book_model import Book
+from models.book_item_model import BookItem
+from models.borrow_model import Borrow
+from models.user_model import User
+from config import config
+from services.book_service import BookService
+from services.borrow_service import BorrowService
+
+def create_app(database_uri):
+    """创建连接测试数据库的Flask应用"""
+    app = Flask(__name__)
+    app.config.from_object(config['development'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.config['DATABASE_REPLICA_URIS'] = []
+    init_db(app)
+    return app
+
+def prepare(app, books, copies, users):
+    """创建本次压测使用的图书、副本和用户，名称带随机后缀，不影响已有数据"""
+    run = uuid.uuid4().hex[:8]
+    with app.app_context():
+        for i in range(books):
+            BookService.create_book({'isbn': f'S{run}{i:05d}', 'title': f'压测图书{i}', 'author': 'stress'}, copies)
+        for i in range(users):
+            user = User(username=f'stress_{run}_{i}', email=f'stress_{run}_{i}@example.com')
+            user.password = run
+            db.session.add(user)
+        db.session.commit()
+
+        book_ids = [book_id for book_id, in db.session.query(Book.id).filter(Book.isbn.like(f'S{run}%'))]
+        user_ids = [user_id for user_id, in db.session.query(User.id).filter(User.username.like(f'stress_{run}_%'))]
+    return book_ids, user_ids
+
+def stress_checkout():
+    """多线程同时借阅同一批图书，验证每个副本最多只被借出一次"""
+    parser = argparse.ArgumentParser(description='借阅并发压测')
+    parser.add_argument('-t', '--threads', type=int, default=32, help='并发线程数')
+    parser.add_argument('-b', '--books', type=int, default=50, help='争抢的图书数量')
+    parser.add_argument('-c', '--copies', type=int, default=1, help='每本图书的副本数量')
+    parser.add_argument('-u', '--users', type=int, default=32, help='借阅用户数量')
+    parser.add_argument('--database-uri', help='数据库地址，默认使用临时SQLite文件')
+    args = parser.parse_args()
+
+    database_uri = args.database_uri
+    if not database_uri:
+        database_uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'stress.db')
+
+    app = create_app(database_uri)
+    book_ids, user_ids = prepare(app, args.books, args.copies, args.users)
+
+    results = {'borrowed': 0, 'conflicts': 0, 'errors': 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def worker(index):
+        # 每个线程以不同顺序尝试借阅所有图书，最大化冲突
+        order = book_ids[:]
+        random.shuffle(order)
+        user_id = user_ids[index % len(user_ids)]
+        counts = {'borrowed': 0, 'conflicts': 0, 'errors': 0}
+
+        with app.app_context():
+            barrier.wait()
+            for book_id in order:
+                try:
+                    BorrowService.borrow_book(user_id, book_id)
+                    counts['borrowed'] += 1
+                except HTTPException:
+                    db.session.rollback()
+                    counts['conflicts'] += 1
+                except Exception as e:
+                    db.session.rollback()
+                    counts['errors'] += 1
+                    print(f"线程{index} 借阅图书{book_id}失败: {e}")
+            db.session.remove()
+
+        with lock:
+            for key, value in counts.items():
+                results[key] += value
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    attempts = args.threads * len(book_ids)
+    print(f"借阅请求: {attempts}，成功: {results['borrowed']}，冲突: {results['conflicts']}，"
+          f"错误: {results['errors']}，耗时: {elapsed:.2f}s（{attempts / elapsed:.0f} 次/秒）")
+
+    # 校验：每个副本最多一条未归还的借阅记录，已借出的副本数与借阅记录数一致，图书的可借副本数与副本状态一致
+    with app.app_context():
+        double_lent = db.session.query(Borrow.item_id).filter(
+            Borrow.book_id.in_(book_ids), Borrow.return_date.is_(None)
+        ).group_by(Borrow.item_id).having(func.count(Borrow.id) > 1).count()
+        active = Borrow.query.filter(Borrow.book_id.in_(book_ids), Borrow.return_date.is_(None)).count()
+        borrowed_items = BookItem.query.filter(BookItem.book_id.in_(book_ids), BookItem.status == 'borrowed').count()
+        available_items = dict(db.session.query(BookItem.book_id, func.count(BookItem.id)).filter(
+            BookItem.book_id.in_(book_ids), BookItem.status == 'available'
+        ).group_by(BookItem.book_id))
+        miscounted = sum(
+            1 for book_id, available in db.session.query(Book.id, Book.available_copies).filter(Book.id.in_(book_ids))
+            if available != available_items.get(book_id, 0)
+        )
+
+    print(f"重复借出的副本: {double_lent}，未归还借阅记录: {active}，已借出副本: {borrowed_items}，"
+          f"可借副本数不一致的图书: {miscounted}")
+    ok = (double_lent == 0 and miscounted == 0
+          and active == borrowed_items == results['borrowed'] <= len(book_ids) * args.copies)
+    print("校验通过" if ok else "校验失败")
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    stress_checkout()
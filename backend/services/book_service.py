@@ -1,9 +1,25 @@
 from datetime import datetime
-from sqlalchemy import or_
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.orm import aliased
 from flask import abort
 
 from models import db
 from models.book_model import Book
+from models.book_item_model import BookItem
+from models.borrow_model import Borrow
+from models.category_model import Category
+from services.search_service import SearchService
+from services.stats_service import StatsService
+from services.popularity_service import PopularityService
+from services.category_service import CategoryService
+from utils.pagination import keyset_paginate, count_total
+from utils.query_util import eager_load
+from utils.http_cache import make_etag, timestamp_part
+from utils.db_routing import read_only
+from utils.serializer_util import RowSerializer, format_datetimes, format_dates, format_decimals
+from utils.version_util import bump_version
+
+_category = aliased(Category)
 
 class BookService:
     """
@@ -11,50 +27,142 @@ class BookService:
     处理图书相关的业务逻辑
     """
     
+    # 列表接口的批量序列化器，字段与 Book.to_dict 保持一致
+    ROW_SERIALIZER = RowSerializer([
+        ('id', Book.id, None),
+        ('isbn', Book.isbn, None),
+        ('title', Book.title, None),
+        ('author', Book.author, None),
+        ('publisher', Book.publisher, None),
+        ('publish_date', Book.publish_date, format_dates),
+        ('price', Book.price, format_decimals),
+        ('description', Book.description, None),
+        ('cover_url', Book.cover_url, None),
+        ('status', Book.status, None),
+        ('category_id', Book.category_id, None),
+        ('category_name', _category.name, None),
+        ('location', Book.location, None),
+        ('total_copies', Book.total_copies, None),
+        ('available_copies', Book.available_copies, None),
+        ('created_at', Book.created_at, format_datetimes),
+        ('updated_at', Book.updated_at, format_datetimes)
+    ], joins=[(_category, Book.category_id == _category.id)])
+    
+    # 由副本汇总的字段
+    DERIVED_FIELDS = ('status', 'total_copies', 'available_copies')
+    
     @staticmethod
-    def get_books(page=1, per_page=10, search=None, category_id=None, status=None):
+    def build_query(search=None, category_id=None, status=None, include_children=True):
         """
-        获取图书列表，支持分页、搜索和筛选
+        构建带筛选条件的图书查询
         
         Args:
-            page (int): 页码
-            per_page (int): 每页数量
             search (str): 搜索关键词
             category_id (int): 分类ID
             status (str): 图书状态
+            include_children (bool): 分类筛选是否包含所有子分类下的图书
             
         Returns:
-            tuple: (图书列表, 总数)
+            tuple: (查询对象, 默认排序条件列表)
         """
         query = Book.query
+        order_by = [Book.created_at.desc()]
         
-        # 搜索条件
+        # 搜索条件：优先使用倒排索引，按相关度排序
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Book.title.like(search_term),
-                    Book.author.like(search_term),
-                    Book.isbn.like(search_term),
-                    Book.publisher.like(search_term)
+            matched = SearchService.match_subquery(search)
+            if matched is not None:
+                query = query.join(matched, matched.c.book_id == Book.id)
+                order_by = [matched.c.score.desc(), Book.created_at.desc()]
+            else:
+                # 关键词无法切分出词项（如单个英文字母）时退回模糊匹配
+                search_term = f"%{search}%"
+                query = query.filter(
+                    or_(
+                        Book.title.like(search_term),
+                        Book.author.like(search_term),
+                        Book.isbn.like(search_term),
+                        Book.publisher.like(search_term)
+                    )
                 )
-            )
         
-        # 分类筛选
+        # 分类筛选，默认包含子分类
         if category_id:
-            query = query.filter(Book.category_id == category_id)
+            if include_children:
+                query = query.filter(CategoryService.in_subtree(Book.category_id, category_id))
+            else:
+                query = query.filter(Book.category_id == category_id)
         
         # 状态筛选
         if status:
             query = query.filter(Book.status == status)
         
+        return query, order_by
+    
+    @staticmethod
+    @read_only
+    def get_books(page=1, per_page=10, search=None, category_id=None, status=None, cursor=None, count_mode='exact',
+                  serializer=None, include_children=True):
+        """
+        获取图书列表，支持分页、搜索和筛选
+        
+        Args:
+            page (int): 页码
+            per_page (int): 每页数量
+            search (str): 搜索关键词
+            category_id (int): 分类ID
+            status (str): 图书状态
+            cursor (str): 分页游标，不为None时使用游标分页并忽略page，按创建时间倒序返回
+            count_mode (str): 总数统计方式，见 utils.pagination.count_total
+            serializer (RowSerializer): 指定时只查询序列化所需的列，列表元素为元组行
+            include_children (bool): 分类筛选是否包含所有子分类下的图书
+            
+        Returns:
+            tuple: (图书列表, 总数, 下一页游标)
+        """
+        query, order_by = BookService.build_query(search, category_id, status, include_children)
+        
         # 获取总数
-        total = query.count()
+        total = count_total(query, count_mode)
         
-        # 分页
-        books = query.order_by(Book.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        if serializer is not None:
+            # 只查询需要的列
+            query = serializer.apply(query)
+        else:
+            # 预加载分类，序列化时不再逐行查询
+            query = eager_load(query, Book)
         
-        return books.items, total
+        # 游标分页
+        if cursor is not None:
+            books, next_cursor = keyset_paginate(query, Book, cursor, per_page)
+            return books, total, next_cursor
+        
+        # 分页，总数已单独统计，不再使用 paginate 重复计数
+        page = max(page, 1)
+        books = query.order_by(*order_by).limit(per_page).offset((page - 1) * per_page).all()
+        
+        return books, total, None
+    
+    @staticmethod
+    def export_books(serializer, search=None, category_id=None, status=None, batch_size=1000, include_children=True):
+        """
+        流式导出图书，筛选条件与 get_books 相同
+        
+        Args:
+            serializer (RowSerializer): 行序列化器，决定导出的列
+            search (str): 搜索关键词
+            category_id (int): 分类ID
+            status (str): 图书状态
+            batch_size (int): 每次从数据库游标读取的行数
+            include_children (bool): 分类筛选是否包含所有子分类下的图书
+            
+        Returns:
+            Query: 按ID顺序流式读取的元组行查询
+        """
+        query, _ = BookService.build_query(search, category_id, status, include_children)
+        return serializer.apply(query).order_by(Book.id).execution_options(
+            stream_results=True
+        ).yield_per(batch_size)
     
     @staticmethod
     def get_book_by_id(book_id):
@@ -76,18 +184,53 @@ class BookService:
         return book
     
     @staticmethod
-    def create_book(book_data):
+    def get_book_etag(book_id):
         """
-        创建新图书
+        计算图书详情的ETag，只查询更新时间，不加载图书数据
+        
+        图书详情包含分类名称，分类的更新时间也计入ETag。
+        
+        Args:
+            book_id (int): 图书ID
+            
+        Returns:
+            str: ETag值，图书不存在时返回None
+        """
+        row = db.session.query(Book.updated_at, Category.updated_at).outerjoin(
+            Category, Book.category_id == Category.id
+        ).filter(Book.id == book_id).first()
+        if row is None:
+            return None
+        return make_etag('book', book_id, *(timestamp_part(value) for value in row))
+    
+    @staticmethod
+    def create_book(book_data, copies=1):
+        """
+        创建新图书，同时创建指定数量的可借副本
         
         Args:
             book_data (dict): 图书数据
+            copies (int): 副本数量
             
         Returns:
             Book: 创建的图书对象
         """
-        book = Book(**book_data)
+        book = Book(**{key: value for key, value in book_data.items() if key not in BookService.DERIVED_FIELDS})
+        book.total_copies = copies
+        book.available_copies = copies
+        # 暂无副本的新书不是丢失，副本入库前保持可借阅状态
+        book.status = Book.summarize_status(copies, copies) if copies else 'available'
         db.session.add(book)
+        db.session.flush()
+        
+        db.session.add_all(
+            BookItem(book_id=book.id, barcode=BookItem.make_barcode(book.id, number), location=book.location)
+            for number in range(1, copies + 1)
+        )
+        
+        # 同一事务内写入全文索引并更新统计
+        SearchService.index_book(book)
+        StatsService.incr(StatsService.TOTAL_BOOKS)
         db.session.commit()
         return book
     
@@ -108,12 +251,17 @@ class BookService:
         """
         book = BookService.get_book_by_id(book_id)
         
-        # 更新字段
+        # 更新字段，状态和副本数由副本汇总，不能直接修改
         for key, value in book_data.items():
-            if hasattr(book, key):
+            if hasattr(book, key) and key not in BookService.DERIVED_FIELDS:
                 setattr(book, key, value)
         
         book.updated_at = datetime.now()
+        
+        # 检索字段发生变化时重建该书的索引
+        if any(field in book_data for field in SearchService.FIELD_WEIGHTS):
+            SearchService.index_book(book)
+        
         db.session.commit()
         return book
     
@@ -132,6 +280,16 @@ class BookService:
             404: 如果图书不存在
         """
         book = BookService.get_book_by_id(book_id)
+        
+        # 图书的借阅记录会被级联删除，同步扣减借阅统计
+        borrow_count = book.borrows.count()
+        active_count = book.borrows.filter(Borrow.return_date.is_(None)).count()
+        
+        SearchService.remove_book(book.id)
+        PopularityService.remove_book(book.id)
+        StatsService.incr(StatsService.TOTAL_BOOKS, -1)
+        StatsService.incr(StatsService.TOTAL_BORROWS, -borrow_count)
+        StatsService.incr(StatsService.ACTIVE_BORROWS, -active_count)
         db.session.delete(book)
         db.session.commit()
         return True
@@ -158,31 +316,260 @@ class BookService:
             book_id (int): 图书ID
             
         Returns:
-            bool: 图书是否可借
+            bool: 图书是否有可借的副本
             
         Raises:
             404: 如果图书不存在
         """
         book = BookService.get_book_by_id(book_id)
-        return book.status == 'available'
+        return book.available_copies > 0
     
     @staticmethod
-    def update_book_status(book_id, status):
+    def get_book_items(book_id):
         """
-        更新图书状态
+        获取图书的全部副本
         
         Args:
             book_id (int): 图书ID
-            status (str): 新状态
             
         Returns:
-            Book: 更新后的图书对象
+            list: 副本对象列表
             
         Raises:
             404: 如果图书不存在
         """
         book = BookService.get_book_by_id(book_id)
-        book.status = status
-        book.updated_at = datetime.now()
+        return book.items.order_by(BookItem.id).all()
+    
+    @staticmethod
+    def add_book_items(book_id, copies, location=None):
+        """
+        为图书新增可借副本
+        
+        Args:
+            book_id (int): 图书ID
+            copies (int): 新增的副本数量
+            location (str): 馆藏位置，默认与图书相同
+            
+        Returns:
+            list: 新增的副本对象列表
+            
+        Raises:
+            404: 如果图书不存在
+        """
+        # 锁定图书行，并发新增副本时依次分配序号
+        book = Book.query.filter(Book.id == book_id).with_for_update().first()
+        if not book:
+            abort(404, description=f"图书ID {book_id} 不存在")
+        
+        # 条码按副本序号递增，取已有默认条码的最大序号，已丢失的副本也占用序号
+        barcodes = db.session.query(BookItem.barcode).filter(
+            BookItem.book_id == book_id,
+            BookItem.barcode.startswith(BookItem.barcode_prefix(book_id))
+        )
+        numbers = [BookItem.parse_copy_number(barcode, book_id) for barcode, in barcodes]
+        start = max([number for number in numbers if number is not None], default=0) + 1
+        items = [
+            BookItem(book_id=book_id, barcode=BookItem.make_barcode(book_id, number), location=location or book.location)
+            for number in range(start, start + copies)
+        ]
+        db.session.add_all(items)
+        BookService.adjust_copies({book_id: (copies, copies)})
         db.session.commit()
-        return book 
\ No newline at end of file
+        return items
+    
+    @staticmethod
+    def update_book_item(item_id, item_data):
+        """
+        更新副本的状态或馆藏位置，借出和归还只能通过借阅操作完成
+        
+        Args:
+            item_id (int): 副本ID
+            item_data (dict): 更新的副本数据，状态只能是可借阅、已预约或丢失
+            
+        Returns:
+            BookItem: 更新后的副本对象
+            
+        Raises:
+            404: 如果副本不存在
+            400: 如果副本已借出
+        """
+        item = BookItem.query.get(item_id)
+        if not item:
+            abort(404, description=f"副本ID {item_id} 不存在")
+        
+        status = item_data.get('status')
+        if status and status != item.status:
+            if item.status == 'borrowed':
+                abort(400, description="副本已借出，请通过归还操作处理")
+            item.status = status
+        if 'location' in item_data:
+            item.location = item_data['location']
+        
+        # 副本状态变化后按副本重新统计图书的计数
+        db.session.flush()
+        BookService.refresh_copies([item.book_id])
+        db.session.commit()
+        return item
+    
+    @staticmethod
+    def _status_expression(available, total):
+        """
+        生成根据副本数计算图书状态的SQL表达式，与 Book.summarize_status 的结果一致
+        
+        Args:
+            available (ColumnElement): 可借副本数
+            total (ColumnElement): 未丢失的副本数
+            
+        Returns:
+            ColumnElement: 图书状态表达式
+        """
+        return case((available > 0, 'available'), (total > 0, 'borrowed'), else_='lost')
+    
+    @staticmethod
+    def adjust_copies(deltas, now=None):
+        """
+        按增量更新图书的可借副本数和副本总数并同步图书状态，在调用方的事务中执行
+        
+        计数在数据库中原子地增减，并发借还同一本书的不同副本不会丢失更新；增量相同的图书合并为一条 UPDATE。
+        
+        Args:
+            deltas (dict): 图书ID到 (可借副本数增量, 副本总数增量) 的映射
+            now (datetime): 更新时间
+        """
+        groups = {}
+        for book_id, delta in deltas.items():
+            groups.setdefault(delta, []).append(book_id)
+        
+        books = Book.__table__
+        now = now or datetime.now()
+        for (available_delta, total_delta), book_ids in groups.items():
+            available = books.c.available_copies + available_delta
+            total = books.c.total_copies + total_delta
+            
+            # MySQL 按顺序执行赋值，状态需要在计数更新之前根据旧的计数计算
+            db.session.execute(
+                update(books).where(books.c.id.in_(book_ids)).ordered_values(
+                    (books.c.status, BookService._status_expression(available, total)),
+                    (books.c.available_copies, available),
+                    (books.c.total_copies, total),
+                    (books.c.updated_at, now)
+                )
+            )
+        
+        # 批量语句绕过了ORM，需要显式更新版本号
+        if groups:
+            bump_version('books')
+    
+    @staticmethod
+    def refresh_copies(book_ids, now=None):
+        """
+        按副本表重新统计图书的副本数并同步图书状态，在调用方的事务中执行
+        
+        用于管理副本等低频操作和数据修复，借还图书使用 adjust_copies 按增量更新。
+        
+        Args:
+            book_ids (list): 图书ID列表
+            now (datetime): 更新时间
+        """
+        books = Book.__table__
+        items = BookItem.__table__
+        available = select(func.count()).where(
+            items.c.book_id == books.c.id, items.c.status == 'available'
+        ).scalar_subquery()
+        total = select(func.count()).where(
+            items.c.book_id == books.c.id, items.c.status != 'lost'
+        ).scalar_subquery()
+        
+        db.session.execute(
+            update(books).where(books.c.id.in_(book_ids)).values(
+                status=BookService._status_expression(available, total),
+                available_copies=available,
+                total_copies=total,
+                updated_at=now or datetime.now()
+            )
+        )
+        
+        # 批量语句绕过了ORM，需要显式更新版本号
+        bump_version('books')
+    
+    @staticmethod
+    def migrate_items(batch_size=1000, progress=None):
+        """
+        为还没有副本的图书各创建一个副本，馆藏位置沿用图书原来的值，并将这些图书的借阅记录关联到该副本。
+        有未归还借阅记录的图书副本标记为借出，其余沿用图书原来的状态，没有借阅记录的借出状态改为可借，
+        避免出现无法归还的借出副本。可以重复执行，已有副本的图书不受影响。
+        
+        Args:
+            batch_size (int): 每批处理的图书数量
+            progress (callable): 进度回调，参数为已处理的图书数量
+            
+        Returns:
+            int: 创建了副本的图书数量
+        """
+        has_items = db.session.query(BookItem.id).filter(BookItem.book_id == Book.id).exists()
+        last_id = 0
+        total = 0
+        while True:
+            batch = db.session.query(Book.id, Book.status, Book.location).filter(
+                Book.id > last_id, ~has_items
+            ).order_by(Book.id).limit(batch_size).all()
+            if not batch:
+                break
+            
+            book_ids = [book.id for book in batch]
+            borrowed = {
+                book_id for book_id, in db.session.query(Borrow.book_id).filter(
+                    Borrow.book_id.in_(book_ids), Borrow.return_date.is_(None)
+                ).distinct()
+            }
+            db.session.execute(BookItem.__table__.insert(), [{
+                'book_id': book.id,
+                'barcode': BookItem.make_barcode(book.id, 1),
+                'status': BookService._migrated_status(book.status, book.id in borrowed),
+                'location': book.location
+            } for book in batch])
+            BookService.refresh_copies(book_ids)
+            
+            # 每本图书只有一个副本，借阅记录都关联到它
+            item_id = select(BookItem.id).where(BookItem.book_id == Borrow.book_id).scalar_subquery()
+            db.session.execute(
+                update(Borrow.__table__).where(
+                    Borrow.book_id.in_(book_ids), Borrow.item_id.is_(None)
+                ).values(item_id=item_id)
+            )
+            db.session.commit()
+            
+            last_id = batch[-1].id
+            total += len(batch)
+            if progress:
+                progress(total)
+        
+        return total
+    
+    @staticmethod
+    def _migrated_status(status, has_open_borrow):
+        """
+        计算迁移时副本的状态，只有存在未归还的借阅记录时副本才是借出状态，归还时才能释放
+        
+        Args:
+            status (str): 图书原来的状态
+            has_open_borrow (bool): 图书是否有未归还的借阅记录
+            
+        Returns:
+            str: 副本状态
+        """
+        if has_open_borrow:
+            return 'borrowed'
+        if status in ('reserved', 'lost'):
+            return status
+        return 'available'
+    
+    @staticmethod
+    def ensure_items():
+        """
+        副本表为空而图书表有数据时（例如升级后首次启动）为已有图书创建副本
+        """
+        if db.session.query(BookItem.id).first() is None and \
+                db.session.query(Book.id).first() is not None:
+            BookService.migrate_items()
\ No newline at end of file
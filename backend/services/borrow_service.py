@@ -1,10 +1,26 @@
 from datetime import datetime
 from flask import abort
+from sqlalchemy import and_, case, cast, func, literal, or_, text, update
+from sqlalchemy.orm import aliased
 
 from models import db
+from models.book_model import Book
+from models.book_item_model import BookItem
 from models.borrow_model import Borrow
+from models.user_model import User
 from services.book_service import BookService
 from services.user_service import UserService
+from services.stats_service import StatsService
+from services.popularity_service import PopularityService
+from utils.pagination import keyset_paginate, count_total
+from utils.query_util import eager_load
+from utils.http_cache import make_etag, timestamp_part
+from utils.db_routing import read_only
+from utils.serializer_util import RowSerializer, format_datetimes, format_amounts
+from utils.version_util import bump_version
+
+_book = aliased(Book)
+_user = aliased(User)
 
 class BorrowService:
     """
@@ -12,14 +28,41 @@ class BorrowService:
     处理图书借阅相关的业务逻辑
     """
     
+    # 列表接口的批量序列化器，字段与 Borrow.to_dict 保持一致
+    ROW_SERIALIZER = RowSerializer([
+        ('id', Borrow.id, None),
+        ('book_id', Borrow.book_id, None),
+        ('book_title', _book.title, None),
+        ('item_id', Borrow.item_id, None),
+        ('user_id', Borrow.user_id, None),
+        ('username', _user.username, None),
+        ('borrow_date', Borrow.borrow_date, format_datetimes),
+        ('due_date', Borrow.due_date, format_datetimes),
+        ('return_date', Borrow.return_date, format_datetimes),
+        ('status', Borrow.status, None),
+        ('fine_amount', Borrow.fine_amount, format_amounts),
+        ('fine_paid', Borrow.fine_paid, None),
+        ('remarks', Borrow.remarks, None),
+        ('created_at', Borrow.created_at, format_datetimes),
+        ('updated_at', Borrow.updated_at, format_datetimes)
+    ], joins=[
+        (_book, Borrow.book_id == _book.id),
+        (_user, Borrow.user_id == _user.id)
+    ])
+    
+    # 逾期检查每块覆盖的借阅记录ID范围
+    OVERDUE_CHUNK_SIZE = 5000
+    
+    # 批量借阅和归还每次最多处理的数量，以及状态冲突时的重试次数
+    BATCH_MAX_ITEMS = 50
+    BATCH_RETRIES = 3
+    
     @staticmethod
-    def get_borrows(page=1, per_page=10, user_id=None, book_id=None, status=None, book_title=None, user_name=None):
+    def build_query(user_id=None, book_id=None, status=None, book_title=None, user_name=None):
         """
-        获取借阅记录列表，支持分页和筛选
+        构建带筛选条件的借阅记录查询
         
         Args:
-            page (int): 页码
-            per_page (int): 每页数量
             user_id (int): 用户ID
             book_id (int): 图书ID
             status (str): 借阅状态
@@ -27,12 +70,9 @@ class BorrowService:
             user_name (str): 用户名或姓名
             
         Returns:
-            tuple: (借阅记录列表, 总数)
+            Query: 查询对象
         """
-        from models.book_model import Book
-        from models.user_model import User
-        
-        query = Borrow.query.join(Book, Borrow.book_id == Book.id).join(User, Borrow.user_id == User.id)
+        query = Borrow.query
         
         # 用户ID筛选                
         if user_id:
@@ -46,21 +86,85 @@ class BorrowService:
         if status:
             query = query.filter(Borrow.status == status)
         
-        # 图书名称筛选
+        # 图书名称筛选，仅在需要时关联图书表
         if book_title:
+            query = query.join(Book, Borrow.book_id == Book.id)
             query = query.filter(Book.title.like(f"%{book_title}%"))
         
-        # 用户名或姓名筛选
+        # 用户名或姓名筛选，仅在需要时关联用户表
         if user_name:
+            query = query.join(User, Borrow.user_id == User.id)
             query = query.filter((User.username.like(f"%{user_name}%")) | (User.name.like(f"%{user_name}%")))
         
+        return query
+    
+    @staticmethod
+    @read_only
+    def get_borrows(page=1, per_page=10, user_id=None, book_id=None, status=None, book_title=None, user_name=None,
+                    cursor=None, count_mode='exact', serializer=None):
+        """
+        获取借阅记录列表，支持分页和筛选
+        
+        Args:
+            page (int): 页码
+            per_page (int): 每页数量
+            user_id (int): 用户ID
+            book_id (int): 图书ID
+            status (str): 借阅状态
+            book_title (str): 图书名称
+            user_name (str): 用户名或姓名
+            cursor (str): 分页游标，不为None时使用游标分页并忽略page
+            count_mode (str): 总数统计方式，见 utils.pagination.count_total
+            serializer (RowSerializer): 指定时只查询序列化所需的列，列表元素为元组行
+            
+        Returns:
+            tuple: (借阅记录列表, 总数, 下一页游标)
+        """
+        query = BorrowService.build_query(user_id, book_id, status, book_title, user_name)
+        
         # 获取总数
-        total = query.count()
+        total = count_total(query, count_mode)
+        
+        if serializer is not None:
+            # 只查询需要的列
+            query = serializer.apply(query)
+        else:
+            # 预加载图书和用户，序列化时不再逐行查询
+            query = eager_load(query, Borrow)
+        
+        # 游标分页
+        if cursor is not None:
+            borrows, next_cursor = keyset_paginate(query, Borrow, cursor, per_page)
+            return borrows, total, next_cursor
         
-        # 分页
-        borrows = query.order_by(Borrow.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        # 分页，总数已单独统计，不再使用 paginate 重复计数
+        page = max(page, 1)
+        borrows = query.order_by(Borrow.created_at.desc()).limit(per_page).offset((page - 1) * per_page).all()
         
-        return borrows.items, total
+        return borrows, total, None
+    
+    @staticmethod
+    def export_borrows(serializer, user_id=None, book_id=None, status=None, book_title=None, user_name=None,
+                       batch_size=1000):
+        """
+        流式导出借阅记录，筛选条件与 get_borrows 相同
+        
+        Args:
+            serializer (RowSerializer): 行序列化器，决定导出的列
+            user_id (int): 用户ID
+            book_id (int): 图书ID
+            status (str): 借阅状态
+            book_title (str): 图书名称
+            user_name (str): 用户名或姓名
+            batch_size (int): 每次从数据库游标读取的行数
+            
+        Returns:
+            Query: 按ID顺序流式读取的元组行查询
+        """
+        query = BorrowService.build_query(user_id, book_id, status, book_title, user_name)
+        return serializer.apply(query).order_by(Borrow.id).execution_options(
+            stream_results=True
+        ).yield_per(batch_size)
     
     @staticmethod
     def get_borrow_by_id(borrow_id):
@@ -76,45 +180,87 @@ class BorrowService:
         Raises:
             404: 如果借阅记录不存在
         """
-        borrow = Borrow.query.get(borrow_id)
+        borrow = eager_load(Borrow.query, Borrow).get(borrow_id)
         if not borrow:
             abort(404, description=f"借阅记录ID {borrow_id} 不存在")
         return borrow
     
     @staticmethod
-    def borrow_book(user_id, book_id, borrow_days=14, remarks=None):
+    def get_borrow_etag(borrow_id):
+        """
+        计算借阅记录详情的ETag，只查询更新时间，不加载借阅数据
+        
+        借阅详情包含书名和用户名，图书和用户的更新时间也计入ETag。
+        
+        Args:
+            borrow_id (int): 借阅记录ID
+            
+        Returns:
+            str: ETag值，借阅记录不存在时返回None
+        """
+        row = db.session.query(Borrow.updated_at, Book.updated_at, User.updated_at).outerjoin(
+            Book, Borrow.book_id == Book.id
+        ).outerjoin(
+            User, Borrow.user_id == User.id
+        ).filter(Borrow.id == borrow_id).first()
+        if row is None:
+            return None
+        return make_etag('borrow', borrow_id, *(timestamp_part(value) for value in row))
+    
+    @staticmethod
+    def borrow_book(user_id, book_id, borrow_days=14, remarks=None, item_id=None):
         """
         借阅图书
         
+        通过一条条件 UPDATE 抢占副本：只有副本仍为可借状态时才会更新成功，
+        并发借阅同一副本时数据库保证只有一个请求成功，不需要加锁。
+        未指定副本时自动选择一本可借的副本，被其他请求抢先时重新选择。
+        
         Args:
             user_id (int): 用户ID
             book_id (int): 图书ID
             borrow_days (int): 借阅天数
             remarks (str): 备注
+            item_id (int): 副本ID，默认自动选择
             
         Returns:
             Borrow: 创建的借阅记录对象
             
         Raises:
-            404: 如果用户或图书不存在
-            400: 如果图书不可借
+            404: 如果用户、图书或副本不存在
+            400: 如果图书没有可借的副本
+            409: 如果多次重试后仍被其他请求抢先
         """
         # 检查用户是否存在
         user = UserService.get_user_by_id(user_id)
         
-        # 检查图书是否存在
-        book = BookService.get_book_by_id(book_id)
-        
-        # 检查图书是否可借
-        if book.status != 'available':
-            abort(400, description="图书当前不可借阅")
+        borrow_date = datetime.now()
+        for _ in range(BorrowService.BATCH_RETRIES):
+            # 抢占副本，更新行数为0表示副本不存在或已被借出
+            if item_id is not None:
+                items = {book_id: item_id}
+            else:
+                items = BorrowService._pick_items([book_id])
+            if items and BorrowService.claim_items(items, borrow_date):
+                break
+            db.session.rollback()
+            
+            # 指定的副本不可借，或图书已没有可借的副本时不再重试
+            if item_id is not None or not items:
+                BookService.get_book_by_id(book_id)
+                if item_id is not None:
+                    BorrowService._get_item(book_id, item_id)
+                    abort(400, description="副本当前不可借阅")
+                abort(400, description="图书当前不可借阅")
+        else:
+            abort(409, description="图书状态变化频繁，请稍后重试")
         
         # 创建借阅记录
-        borrow_date = datetime.now()
         due_date = Borrow.calculate_due_date(borrow_date, borrow_days)
         
         borrow = Borrow(
             book_id=book_id,
+            item_id=items[book_id],
             user_id=user_id,
             borrow_date=borrow_date,
             due_date=due_date,
@@ -122,14 +268,276 @@ class BorrowService:
             remarks=remarks
         )
         
-        # 更新图书状态
-        book.status = 'borrowed'
-        
         db.session.add(borrow)
+        StatsService.incr(StatsService.TOTAL_BORROWS)
+        StatsService.incr(StatsService.ACTIVE_BORROWS)
+        PopularityService.record_borrow(book_id, day=borrow_date.date())
         db.session.commit()
         
         return borrow
     
+    @staticmethod
+    def _get_item(book_id, item_id):
+        """
+        获取属于指定图书的副本
+        
+        Args:
+            book_id (int): 图书ID
+            item_id (int): 副本ID
+            
+        Returns:
+            BookItem: 副本对象
+            
+        Raises:
+            404: 如果副本不存在或不属于该图书
+        """
+        item = BookItem.query.get(item_id)
+        if not item or item.book_id != book_id:
+            abort(404, description=f"图书ID {book_id} 没有副本ID {item_id}")
+        return item
+    
+    @staticmethod
+    def _pick_items(book_ids):
+        """
+        为每本图书选择一本可借的副本，只扫描 (book_id, status) 索引
+        
+        Args:
+            book_ids (list): 图书ID列表
+            
+        Returns:
+            dict: 图书ID到副本ID的映射，没有可借副本的图书不在其中
+        """
+        return dict(
+            db.session.query(BookItem.book_id, func.min(BookItem.id)).filter(
+                BookItem.book_id.in_(book_ids), BookItem.status == 'available'
+            ).group_by(BookItem.book_id)
+        )
+    
+    @staticmethod
+    def claim_items(items, now=None):
+        """
+        将一批可借的副本标记为已借出并扣减图书的可借副本数，在调用方的事务中执行
+        
+        只有全部副本都抢占成功时才返回True，否则调用方需要回滚事务，撤销已抢占的部分。
+        
+        Args:
+            items (dict): 图书ID到副本ID的映射
+            now (datetime): 更新时间
+            
+        Returns:
+            bool: 是否全部抢占成功
+        """
+        now = now or datetime.now()
+        result = db.session.execute(
+            update(BookItem.__table__).where(
+                or_(*(and_(BookItem.id == item_id, BookItem.book_id == book_id) for book_id, item_id in items.items())),
+                BookItem.status == 'available'
+            ).values(status='borrowed', updated_at=now)
+        )
+        if result.rowcount != len(items):
+            return False
+        
+        BookService.adjust_copies({book_id: (-1, 0) for book_id in items}, now)
+        return True
+    
+    @staticmethod
+    def batch_borrow(user_id, book_ids, borrow_days=14, remarks=None):
+        """
+        批量借阅图书
+        
+        一次查询为每本图书选择一本可借的副本，一条条件 UPDATE 抢占全部选中的副本，借阅记录批量插入，
+        整批在同一个事务中提交。查询和抢占之间有副本被其他请求借出时回滚并重新选择。
+        
+        Args:
+            user_id (int): 用户ID
+            book_ids (list): 图书ID列表
+            borrow_days (int): 借阅天数
+            remarks (str): 备注
+            
+        Returns:
+            list: 每本图书的借阅结果，包含 book_id、success，成功时包含 borrow，失败时包含 error
+            
+        Raises:
+            404: 如果用户不存在
+            400: 如果图书数量超过限制
+            409: 如果多次重试后仍有图书状态冲突
+        """
+        book_ids = list(dict.fromkeys(book_ids))
+        if len(book_ids) > BorrowService.BATCH_MAX_ITEMS:
+            abort(400, description=f"每次最多处理 {BorrowService.BATCH_MAX_ITEMS} 本图书")
+        
+        # 检查用户是否存在
+        UserService.get_user_by_id(user_id)
+        
+        borrow_date = datetime.now()
+        for _ in range(BorrowService.BATCH_RETRIES):
+            items = BorrowService._pick_items(book_ids)
+            if not items or BorrowService.claim_items(items, borrow_date):
+                break
+            db.session.rollback()
+        else:
+            abort(409, description="图书状态变化频繁，请稍后重试")
+        
+        claimable = [book_id for book_id in book_ids if book_id in items]
+        if claimable:
+            due_date = Borrow.calculate_due_date(borrow_date, borrow_days)
+            db.session.execute(Borrow.__table__.insert(), [{
+                'book_id': book_id,
+                'item_id': items[book_id],
+                'user_id': user_id,
+                'borrow_date': borrow_date,
+                'due_date': due_date,
+                'status': 'borrowing',
+                'remarks': remarks
+            } for book_id in claimable])
+            
+            # 批量语句绕过了ORM，需要显式更新版本号
+            bump_version('borrows')
+            StatsService.incr(StatsService.TOTAL_BORROWS, len(claimable))
+            StatsService.incr(StatsService.ACTIVE_BORROWS, len(claimable))
+            PopularityService.record_borrows(claimable, day=borrow_date.date())
+        db.session.commit()
+        
+        # 按本次抢占的副本查询新建的记录，用户之前借过同一本书的未归还记录不会混入
+        borrows = {
+            borrow.book_id: borrow for borrow in eager_load(Borrow.query, Borrow).filter(
+                Borrow.item_id.in_([items[book_id] for book_id in claimable]), Borrow.return_date.is_(None)
+            )
+        } if claimable else {}
+        
+        # 没有抢占到副本的图书区分不存在和不可借
+        missing = [book_id for book_id in book_ids if book_id not in borrows]
+        existing = {
+            book_id for book_id, in db.session.query(Book.id).filter(Book.id.in_(missing))
+        } if missing else set()
+        
+        results = []
+        for book_id in book_ids:
+            if book_id in borrows:
+                results.append({'book_id': book_id, 'success': True, 'borrow': borrows[book_id].to_dict()})
+            elif book_id not in existing:
+                results.append({'book_id': book_id, 'success': False, 'error': f"图书ID {book_id} 不存在"})
+            else:
+                results.append({'book_id': book_id, 'success': False, 'error': "图书当前不可借阅"})
+        return results
+    
+    @staticmethod
+    def batch_return(borrow_ids):
+        """
+        批量归还图书
+        
+        一次查询校验所有借阅记录，一条条件 UPDATE 关闭全部未归还的记录并按逾期天数计算罚款，
+        再用一条 UPDATE 将副本改回可借并按图书增加可借副本数，整批在同一个事务中提交。
+        
+        Args:
+            borrow_ids (list): 借阅记录ID列表
+            
+        Returns:
+            list: 每条借阅记录的归还结果，包含 borrow_id、success，成功时包含 borrow，失败时包含 error
+            
+        Raises:
+            400: 如果借阅记录数量超过限制
+            409: 如果多次重试后仍有借阅记录状态冲突
+        """
+        borrow_ids = list(dict.fromkeys(borrow_ids))
+        if len(borrow_ids) > BorrowService.BATCH_MAX_ITEMS:
+            abort(400, description=f"每次最多处理 {BorrowService.BATCH_MAX_ITEMS} 条借阅记录")
+        
+        return_date = datetime.now()
+        for _ in range(BorrowService.BATCH_RETRIES):
+            found = {
+                borrow_id: (book_id, item_id, returned_at)
+                for borrow_id, book_id, item_id, returned_at in db.session.query(
+                    Borrow.id, Borrow.book_id, Borrow.item_id, Borrow.return_date
+                ).filter(Borrow.id.in_(borrow_ids))
+            }
+            returnable = [borrow_id for borrow_id in borrow_ids if borrow_id in found and found[borrow_id][2] is None]
+            if not returnable or BorrowService._close_borrows(returnable, return_date):
+                break
+            db.session.rollback()
+        else:
+            abort(409, description="借阅记录状态变化频繁，请稍后重试")
+        
+        if returnable:
+            BorrowService._release_items([found[borrow_id][:2] for borrow_id in returnable], 'available', return_date)
+            
+            # 批量语句绕过了ORM，需要显式更新版本号
+            bump_version('borrows')
+            StatsService.incr(StatsService.ACTIVE_BORROWS, -len(returnable))
+        db.session.commit()
+        
+        borrows = {
+            borrow.id: borrow for borrow in eager_load(Borrow.query, Borrow).filter(Borrow.id.in_(returnable))
+        } if returnable else {}
+        
+        results = []
+        for borrow_id in borrow_ids:
+            if borrow_id in borrows:
+                results.append({'borrow_id': borrow_id, 'success': True, 'borrow': borrows[borrow_id].to_dict()})
+            elif borrow_id not in found:
+                results.append({'borrow_id': borrow_id, 'success': False, 'error': f"借阅记录ID {borrow_id} 不存在"})
+            else:
+                results.append({'borrow_id': borrow_id, 'success': False, 'error': "图书已归还或已标记为丢失"})
+        return results
+    
+    @staticmethod
+    def _close_borrows(borrow_ids, return_date):
+        """
+        将一批未归还的借阅记录标记为已归还，逾期归还的记录计算罚款，与 return_book 的规则一致
+        
+        Args:
+            borrow_ids (list): 借阅记录ID列表，不能重复
+            return_date (datetime): 归还时间
+            
+        Returns:
+            bool: 是否全部更新成功，否则调用方需要回滚事务
+        """
+        fine = BorrowService._fine_expression(return_date)
+        late = Borrow.due_date < return_date
+        
+        result = db.session.execute(
+            update(Borrow.__table__).where(
+                Borrow.id.in_(borrow_ids), Borrow.return_date.is_(None)
+            ).values(
+                return_date=return_date,
+                fine_amount=case((late, fine), else_=Borrow.fine_amount),
+                status=case((and_(late, fine > 0), 'overdue'), else_='returned'),
+                updated_at=return_date
+            )
+        )
+        return result.rowcount == len(borrow_ids)
+    
+    @staticmethod
+    def _release_items(borrowed, status, now):
+        """
+        将借出的副本改为可借或丢失并更新图书的副本数，在调用方的事务中执行
+        
+        Args:
+            borrowed (list): (图书ID, 副本ID) 列表，副本ID为空的旧借阅记录只更新图书计数
+            status (str): 副本的新状态，available 或 lost
+            now (datetime): 更新时间
+            
+        Returns:
+            int: 状态被更新的副本数量
+        """
+        released = 0
+        item_ids = [item_id for _, item_id in borrowed if item_id is not None]
+        if item_ids:
+            released = db.session.execute(
+                update(BookItem.__table__).where(
+                    BookItem.id.in_(item_ids), BookItem.status == 'borrowed'
+                ).values(status=status, updated_at=now)
+            ).rowcount
+        
+        # 归还的副本增加可借数，丢失的副本减少副本总数
+        counts = {}
+        for book_id, _ in borrowed:
+            counts[book_id] = counts.get(book_id, 0) + 1
+        BookService.adjust_copies({
+            book_id: (count, 0) if status == 'available' else (0, -count) for book_id, count in counts.items()
+        }, now)
+        return released
+    
     @staticmethod
     def return_book(borrow_id, is_lost=False):
         """
@@ -149,30 +557,32 @@ class BorrowService:
         # 获取借阅记录
         borrow = BorrowService.get_borrow_by_id(borrow_id)
         
-        # 检查是否已归还
-        if borrow.status in ['returned', 'lost']:
+        # 检查是否已归还，逾期归还的记录状态仍为 overdue，以归还时间为准
+        if borrow.return_date is not None:
             abort(400, description="图书已归还或已标记为丢失")
         
-        # 获取图书
-        book = BookService.get_book_by_id(borrow.book_id)
-        
-        # 更新借阅记录
+        # 条件 UPDATE 关闭借阅记录，并发归还同一条记录时只有一个请求成功
         return_date = datetime.now()
-        borrow.return_date = return_date
-        
         if is_lost:
-            borrow.status = 'lost'
-            book.status = 'lost'
+            closed = db.session.execute(
+                update(Borrow.__table__).where(
+                    Borrow.id == borrow_id, Borrow.return_date.is_(None)
+                ).values(return_date=return_date, status='lost', updated_at=return_date)
+            ).rowcount == 1
         else:
-            borrow.status = 'returned'
-            book.status = 'available'
-            
-            # 计算罚款
-            if return_date > borrow.due_date:
-                borrow.fine_amount = Borrow.calculate_fine(borrow.due_date, return_date)
-                if borrow.fine_amount > 0:
-                    borrow.status = 'overdue'
+            closed = BorrowService._close_borrows([borrow_id], return_date)
+        if not closed:
+            db.session.rollback()
+            abort(400, description="图书已归还或已标记为丢失")
+        
+        # 只释放本次借阅的副本
+        BorrowService._release_items(
+            [(borrow.book_id, borrow.item_id)], 'lost' if is_lost else 'available', return_date
+        )
         
+        # 批量语句绕过了ORM，需要显式更新版本号
+        bump_version('borrows')
+        StatsService.incr(StatsService.ACTIVE_BORROWS, -1)
         db.session.commit()
         
         return borrow
@@ -215,29 +625,94 @@ class BorrowService:
         return borrow
     
     @staticmethod
-    def check_overdue_borrows():
+    def check_overdue_borrows(chunk_size=OVERDUE_CHUNK_SIZE, now=None):
         """
         检查逾期的借阅记录
         
+        按ID范围分块执行集合式 UPDATE，在数据库中根据应还日期计算罚款，
+        每块单独提交，不把逾期记录加载到内存，也不会长时间持有大事务。
+        已标记为逾期但尚未归还的记录会刷新罚款金额。
+        
+        Args:
+            chunk_size (int): 每块覆盖的ID范围
+            now (datetime): 计算罚款的截止时间，默认为当前时间
+            
         Returns:
-            list: 逾期的借阅记录列表
+            dict: 检查结果汇总，包含新增逾期数、刷新罚款数、逾期总数和罚款总额
         """
-        now = datetime.now()
-        
-        # 查找所有借阅中且已逾期的记录
-        overdue_borrows = Borrow.query.filter(
-            Borrow.status == 'borrowing',
+        now = now or datetime.now()
+        overdue = and_(
+            Borrow.return_date.is_(None),
+            Borrow.status.in_(['borrowing', 'overdue']),
             Borrow.due_date < now
-        ).all()
+        )
         
-        # 更新状态为逾期
-        for borrow in overdue_borrows:
-            borrow.status = 'overdue'
-            borrow.fine_amount = Borrow.calculate_fine(borrow.due_date, now)
+        summary = {
+            'marked_overdue': 0,
+            'fines_updated': 0,
+            'chunks': 0
+        }
         
+        low, high = db.session.query(func.min(Borrow.id), func.max(Borrow.id)).filter(overdue).one()
         db.session.commit()
         
-        return overdue_borrows
+        if low is not None:
+            fine = BorrowService._fine_expression(now)
+            
+            for start in range(low, high + 1, chunk_size):
+                in_chunk = and_(overdue, Borrow.id.between(start, start + chunk_size - 1))
+                
+                # 借阅中的记录标记为逾期
+                result = db.session.execute(
+                    update(Borrow.__table__).where(in_chunk, Borrow.status == 'borrowing').values(
+                        status='overdue', fine_amount=fine, updated_at=now
+                    )
+                )
+                summary['marked_overdue'] += result.rowcount
+                changed = result.rowcount
+                
+                # 已逾期的记录只在罚款变化时更新
+                result = db.session.execute(
+                    update(Borrow.__table__).where(
+                        in_chunk, Borrow.status == 'overdue', func.coalesce(Borrow.fine_amount, 0) != fine
+                    ).values(fine_amount=fine, updated_at=now)
+                )
+                summary['fines_updated'] += result.rowcount
+                changed += result.rowcount
+                
+                # 批量语句绕过了ORM，需要显式更新版本号
+                if changed:
+                    bump_version('borrows')
+                db.session.commit()
+                summary['chunks'] += 1
+        
+        total, total_fine = db.session.query(
+            func.count(Borrow.id), func.coalesce(func.sum(Borrow.fine_amount), 0)
+        ).filter(Borrow.return_date.is_(None), Borrow.status == 'overdue').one()
+        
+        summary['total_overdue'] = total
+        summary['total_fine'] = float(total_fine)
+        return summary
+    
+    @staticmethod
+    def _fine_expression(now):
+        """
+        生成按逾期整天数计算罚款的SQL表达式，与 Borrow.calculate_fine 的结果一致
+        
+        Args:
+            now (datetime): 计算罚款的截止时间
+            
+        Returns:
+            ColumnElement: 罚款金额表达式
+        """
+        now = literal(now, type_=db.DateTime)
+        
+        if db.engine.dialect.name == 'sqlite':
+            days = cast(func.julianday(now) - func.julianday(Borrow.due_date), db.Integer)
+        else:
+            days = func.timestampdiff(text('DAY'), Borrow.due_date, now)
+        
+        return cast(days * Borrow.DAILY_FINE_RATE, db.Numeric(10, 2))
     
     @staticmethod
     def delete_borrow(borrow_id):
@@ -256,12 +731,15 @@ class BorrowService:
         # 获取借阅记录
         borrow = BorrowService.get_borrow_by_id(borrow_id)
         
-        # 如果借阅状态是借阅中，需要将图书状态恢复为可借阅
-        if borrow.status == 'borrowing':
-            book = BookService.get_book_by_id(borrow.book_id)
-            book.status = 'available'
+        # 如果图书尚未归还，需要将副本恢复为可借阅
+        if borrow.return_date is None:
+            BorrowService._release_items([(borrow.book_id, borrow.item_id)], 'available', datetime.now())
         
         # 删除借阅记录
+        StatsService.incr(StatsService.TOTAL_BORROWS, -1)
+        if borrow.return_date is None:
+            StatsService.incr(StatsService.ACTIVE_BORROWS, -1)
+        PopularityService.remove_borrows([borrow])
         db.session.delete(borrow)
         db.session.commit()
         
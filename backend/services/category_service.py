@@ -1,8 +1,13 @@
 from datetime import datetime
 from flask import abort
+from sqlalchemy import literal, select
+from sqlalchemy.orm import aliased
 
 from models import db
-from models.category_model import Category
+from models.category_model import Category, CategoryClosure
+from utils.compression import EncodedCache
+from utils.serializer_util import dumps
+from utils.version_util import bump_version, get_version
 
 class CategoryService:
     """
@@ -10,6 +15,12 @@ class CategoryService:
     处理图书分类相关的业务逻辑
     """
     
+    # 分类数据的版本号名称，分类的任何变更都会使版本号加一（ORM 变更由 flush 监听器自动处理）
+    VERSION_NAME = 'categories'
+    
+    # 编码和压缩后的分类列表响应，按版本号缓存，键为 'tree' 或 'list'
+    _response_cache = EncodedCache()
+    
     @staticmethod
     def get_categories(include_tree=False):
         """
@@ -22,14 +33,49 @@ class CategoryService:
             list: 分类列表
         """
         if include_tree:
-            # 只获取顶级分类，子分类通过关系获取
-            root_categories = Category.query.filter(Category.parent_id.is_(None)).order_by(Category.sort_order).all()
-            return [category.to_tree_dict() for category in root_categories]
+            # 一次查询出所有分类，在内存中组装为树
+            return Category.build_tree(Category.query.all())
         else:
             # 获取所有分类
             categories = Category.query.order_by(Category.level, Category.sort_order).all()
             return [category.to_dict() for category in categories]
     
+    @staticmethod
+    def get_version():
+        """
+        获取分类数据的当前版本号
+        
+        Returns:
+            int: 版本号
+        """
+        return get_version(CategoryService.VERSION_NAME)
+    
+    @staticmethod
+    def get_categories_json(include_tree=False, version=None):
+        """
+        获取编码为JSON的分类列表响应体
+        
+        每个版本只查询、编码和压缩一次，之后直接返回缓存的字节串
+        
+        Args:
+            include_tree (bool): 是否以树形结构返回
+            version (int): 当前版本号，默认重新读取
+            
+        Returns:
+            EncodedBody: 与 ResponseUtil.success 结构相同的JSON响应体
+        """
+        if version is None:
+            version = CategoryService.get_version()
+        
+        return CategoryService._response_cache.get(
+            'tree' if include_tree else 'list', version,
+            lambda: dumps({
+                'code': 0,
+                'message': 'success',
+                'data': CategoryService.get_categories(include_tree)
+            })
+        )
+    
     @staticmethod
     def get_category_by_id(category_id):
         """
@@ -69,6 +115,8 @@ class CategoryService:
             
         category = Category(**category_data)
         db.session.add(category)
+        db.session.flush()
+        CategoryService._insert_closure(category.id, category.parent_id)
         db.session.commit()
         return category
     
@@ -88,14 +136,12 @@ class CategoryService:
             404: 如果分类不存在
         """
         category = CategoryService.get_category_by_id(category_id)
+        category_data.pop('level', None)
         
-        # 如果更新了父分类，需要更新level
-        if 'parent_id' in category_data and category_data['parent_id'] != category.parent_id:
-            if category_data['parent_id']:
-                parent = CategoryService.get_category_by_id(category_data['parent_id'])
-                category_data['level'] = parent.level + 1
-            else:
-                category_data['level'] = 1
+        # 如果更新了父分类，整棵子树随之移动
+        new_parent_id = category_data.pop('parent_id', category.parent_id)
+        if new_parent_id != category.parent_id:
+            CategoryService._move_subtree(category, new_parent_id)
         
         # 更新字段
         for key, value in category_data.items():
@@ -104,11 +150,6 @@ class CategoryService:
         
         category.updated_at = datetime.now()
         db.session.commit()
-        
-        # 如果level发生变化，需要更新所有子分类的level
-        if 'level' in category_data:
-            CategoryService._update_children_level(category)
-            
         return category
     
     @staticmethod
@@ -136,21 +177,176 @@ class CategoryService:
         if category.books.count() > 0:
             abort(400, description="无法删除有图书的分类")
         
+        # 叶子分类的闭包记录只有指向自身和祖先的行
+        db.session.execute(
+            CategoryClosure.__table__.delete().where(CategoryClosure.descendant_id == category.id)
+        )
         db.session.delete(category)
         db.session.commit()
         return True
     
     @staticmethod
-    def _update_children_level(category):
+    def get_subtree_ids(category_id):
         """
-        递归更新子分类的level
+        获取分类及其所有后代分类的ID
         
         Args:
-            category (Category): 父分类
+            category_id (int): 分类ID
+            
+        Returns:
+            list: 分类ID列表，包含自身
+        """
+        return [
+            descendant_id for descendant_id, in db.session.query(CategoryClosure.descendant_id).filter(
+                CategoryClosure.ancestor_id == category_id
+            )
+        ]
+    
+    @staticmethod
+    def in_subtree(column, category_id):
         """
-        for child in category.children:
-            child.level = category.level + 1
-            db.session.add(child)
-            CategoryService._update_children_level(child)
+        生成“属于该分类或其任意后代分类”的筛选条件
         
-        db.session.commit() 
\ No newline at end of file
+        条件为 column IN (SELECT descendant_id FROM category_closure WHERE ancestor_id = ?)，
+        由闭包表主键完成一次索引范围扫描，不在Python中展开分类树
+        
+        Args:
+            column: 分类ID列，如 Book.category_id
+            category_id (int): 分类ID
+            
+        Returns:
+            ColumnElement: 筛选条件
+        """
+        return column.in_(
+            select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+        )
+    
+    @staticmethod
+    def _insert_closure(category_id, parent_id):
+        """
+        为新分类写入闭包记录：自身一行，加上父分类的每个祖先各一行
+        
+        Args:
+            category_id (int): 新分类ID
+            parent_id (int): 父分类ID，顶级分类为None
+        """
+        table = CategoryClosure.__table__
+        db.session.execute(table.insert().values(ancestor_id=category_id, descendant_id=category_id, depth=0))
+        if parent_id:
+            db.session.execute(table.insert().from_select(
+                ['ancestor_id', 'descendant_id', 'depth'],
+                select(table.c.ancestor_id, literal(category_id), table.c.depth + 1).where(
+                    table.c.descendant_id == parent_id
+                )
+            ))
+    
+    @staticmethod
+    def _move_subtree(category, new_parent_id):
+        """
+        将分类及其子树移动到新的父分类下
+        
+        闭包关系和层级都用集合语句更新，语句数量与子树大小无关
+        
+        Args:
+            category (Category): 要移动的分类
+            new_parent_id (int): 新的父分类ID，None 表示移动为顶级分类
+            
+        Raises:
+            404: 如果新的父分类不存在
+            400: 如果新的父分类是该分类自身或其后代
+        """
+        table = CategoryClosure.__table__
+        subtree_ids = CategoryService.get_subtree_ids(category.id)
+        
+        if new_parent_id:
+            parent = CategoryService.get_category_by_id(new_parent_id)
+            if new_parent_id in subtree_ids:
+                abort(400, description="不能将分类移动到自身或其子分类下")
+            new_level = parent.level + 1
+        else:
+            new_level = 1
+        
+        # 断开子树与原祖先的关系，子树内部的关系保持不变
+        db.session.execute(table.delete().where(
+            table.c.descendant_id.in_(subtree_ids),
+            table.c.ancestor_id.notin_(subtree_ids)
+        ))
+        
+        # 新父分类的每个祖先与子树的每个节点建立关系
+        if new_parent_id:
+            ancestors = aliased(table)
+            descendants = aliased(table)
+            db.session.execute(table.insert().from_select(
+                ['ancestor_id', 'descendant_id', 'depth'],
+                select(
+                    ancestors.c.ancestor_id,
+                    descendants.c.descendant_id,
+                    ancestors.c.depth + descendants.c.depth + 1
+                ).where(
+                    ancestors.c.descendant_id == new_parent_id,
+                    descendants.c.ancestor_id == category.id
+                )
+            ))
+        
+        # 子树整体调整层级
+        delta = new_level - (category.level or 1)
+        if delta:
+            db.session.execute(
+                Category.__table__.update().where(Category.id.in_(subtree_ids)).values(
+                    level=Category.level + delta
+                )
+            )
+        
+        db.session.execute(
+            Category.__table__.update().where(Category.id == category.id).values(parent_id=new_parent_id)
+        )
+        # 同步已加载对象的状态，避免后续提交时覆盖集合更新的结果
+        db.session.expire(category, ['level', 'parent_id'])
+    
+    @staticmethod
+    def rebuild_closure():
+        """
+        根据 parent_id 全量重建闭包表，并修正所有分类的层级
+        
+        Returns:
+            int: 分类数量
+        """
+        parents = dict(db.session.query(Category.id, Category.parent_id).all())
+        
+        rows = []
+        levels = {}
+        for category_id in parents:
+            # 沿 parent_id 向上查找祖先，遇到环时停止
+            ancestor_id, depth, seen = category_id, 0, set()
+            while ancestor_id is not None and ancestor_id not in seen:
+                seen.add(ancestor_id)
+                rows.append({'ancestor_id': ancestor_id, 'descendant_id': category_id, 'depth': depth})
+                ancestor_id = parents.get(ancestor_id)
+                depth += 1
+            levels[category_id] = depth
+        
+        db.session.execute(CategoryClosure.__table__.delete())
+        if rows:
+            db.session.execute(CategoryClosure.__table__.insert(), rows)
+        
+        # 只更新层级不一致的分类
+        current = dict(db.session.query(Category.id, Category.level).all())
+        for category_id, level in levels.items():
+            if current.get(category_id) != level:
+                db.session.execute(
+                    Category.__table__.update().where(Category.id == category_id).values(level=level)
+                )
+        
+        # 批量语句绕过了ORM，需要显式更新版本号
+        bump_version(CategoryService.VERSION_NAME)
+        db.session.commit()
+        return len(parents)
+    
+    @staticmethod
+    def ensure_closure():
+        """
+        闭包表为空而分类有数据时（例如升级后首次启动）全量重建
+        """
+        if db.session.query(CategoryClosure.ancestor_id).first() is None and \
+                db.session.query(Category.id).first() is not None:
+            CategoryService.rebuild_closure()
\ No newline at end of file
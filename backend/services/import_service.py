@@ -0,0 +1,301 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy.exc import IntegrityError
+
+from models import db
+from models.book_model import Book
+from models.book_item_model import BookItem
+from models.category_model import Category
+from services.search_service import SearchService
+from services.stats_service import StatsService
+from utils.version_util import bump_version
+
+class BookImportService:
+    """
+    图书批量导入服务类
+    流式解析导入文件，按批去重并批量写入
+    """
+
+    # 支持的导入格式
+    FORMATS = ('csv', 'ndjson')
+
+    # 错误报告最多保留的条数，避免错误过多时占用大量内存
+    MAX_ERRORS = 1000
+
+    # 可直接写入的文本字段及最大长度
+    TEXT_FIELDS = {
+        'isbn': 20,
+        'title': 100,
+        'author': 50,
+        'publisher': 100,
+        'description': None,
+        'cover_url': 255,
+        'location': 50
+    }
+
+    # 可导入的副本状态，借出状态只能由借阅记录产生，否则副本无法归还
+    STATUSES = ('available', 'reserved', 'lost')
+
+    # 每本图书最多导入的副本数量
+    MAX_COPIES = 100
+
+    @staticmethod
+    def parse(stream, file_format):
+        """
+        流式解析导入文件
+
+        Args:
+            stream: 二进制文件流
+            file_format (str): 文件格式，csv 或 ndjson
+
+        Yields:
+            dict: 每行的原始数据
+        """
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        if file_format == 'csv':
+            yield from csv.DictReader(text)
+            return
+
+        for line in text:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # 交给 import_books 记录为该行的错误
+                yield None
+
+    @staticmethod
+    def import_books(records, batch_size=1000, progress=None):
+        """
+        批量导入图书
+
+        每批数据在一个事务中完成ISBN去重、批量插入和全文索引写入。
+
+        Args:
+            records (iterable): 图书数据字典，分类可以使用 category_code 或 category_id 指定
+            batch_size (int): 每批处理的行数
+            progress (callable): 进度回调，参数为 (已处理行数, 已导入行数)
+
+        Returns:
+            dict: 导入报告，包含总数、导入数、重复数、失败数和逐行错误
+        """
+        category_map = dict(db.session.query(Category.code, Category.id).filter(Category.code.isnot(None)))
+
+        report = {
+            'total': 0,
+            'imported': 0,
+            'duplicates': 0,
+            'failed': 0,
+            'errors': []
+        }
+        seen_isbns = set()
+        batch = []
+
+        for row_number, record in enumerate(records, start=1):
+            report['total'] += 1
+            try:
+                book_data = BookImportService._normalize(record, category_map)
+            except ValueError as e:
+                BookImportService._add_error(report, row_number, record, str(e))
+                continue
+
+            # 文件内重复的ISBN
+            if book_data['isbn'] in seen_isbns:
+                report['duplicates'] += 1
+                continue
+            seen_isbns.add(book_data['isbn'])
+
+            batch.append((row_number, book_data))
+            if len(batch) >= batch_size:
+                BookImportService._flush_batch(batch, report)
+                batch = []
+                if progress:
+                    progress(report['total'], report['imported'])
+
+        if batch:
+            BookImportService._flush_batch(batch, report)
+        if progress:
+            progress(report['total'], report['imported'])
+
+        return report
+
+    @staticmethod
+    def _flush_batch(batch, report):
+        """
+        写入一批图书，跳过数据库中已存在的ISBN
+
+        Args:
+            batch (list): (行号, 图书数据) 列表
+            report (dict): 导入报告
+        """
+        isbns = [book_data['isbn'] for _, book_data in batch]
+        existing = {
+            isbn for isbn, in db.session.query(Book.isbn).filter(Book.isbn.in_(isbns))
+        }
+
+        rows = [(row_number, book_data) for row_number, book_data in batch if book_data['isbn'] not in existing]
+        report['duplicates'] += len(batch) - len(rows)
+        if not rows:
+            return
+
+        try:
+            BookImportService._insert_books([book_data for _, book_data in rows])
+            StatsService.incr(StatsService.TOTAL_BOOKS, len(rows))
+            bump_version('books')
+            db.session.commit()
+            report['imported'] += len(rows)
+        except IntegrityError:
+            # 与其他写入并发冲突时逐行重试，定位出错的行
+            db.session.rollback()
+            BookImportService._insert_one_by_one(rows, report)
+
+    @staticmethod
+    def _insert_one_by_one(rows, report):
+        """
+        逐行写入图书，记录每行的错误
+
+        Args:
+            rows (list): (行号, 图书数据) 列表
+            report (dict): 导入报告
+        """
+        for row_number, book_data in rows:
+            try:
+                BookImportService._insert_books([book_data])
+                StatsService.incr(StatsService.TOTAL_BOOKS)
+                bump_version('books')
+                db.session.commit()
+                report['imported'] += 1
+            except IntegrityError:
+                db.session.rollback()
+                BookImportService._add_error(report, row_number, book_data, "与已有数据冲突（ISBN重复或分类不存在）")
+
+    @staticmethod
+    def _insert_books(books):
+        """
+        批量写入图书及其副本，并为图书建立全文索引
+
+        Args:
+            books (list): 图书数据，copies 为副本数量，status 为副本状态
+        """
+        rows = []
+        for book_data in books:
+            row = dict(book_data)
+            copies = row.pop('copies')
+            row['total_copies'] = copies if row['status'] != 'lost' else 0
+            row['available_copies'] = copies if row['status'] == 'available' else 0
+            row['status'] = Book.summarize_status(row['available_copies'], row['total_copies'])
+            rows.append(row)
+        db.session.execute(Book.__table__.insert(), rows)
+
+        books_by_isbn = {book_data['isbn']: book_data for book_data in books}
+        inserted = db.session.query(
+            Book.id, Book.title, Book.author, Book.isbn, Book.publisher
+        ).filter(Book.isbn.in_(books_by_isbn)).all()
+        SearchService.index_books(inserted)
+
+        items = [{
+            'book_id': book.id,
+            'barcode': BookItem.make_barcode(book.id, number),
+            'status': books_by_isbn[book.isbn]['status'],
+            'location': books_by_isbn[book.isbn]['location']
+        } for book in inserted for number in range(1, books_by_isbn[book.isbn]['copies'] + 1)]
+        if items:
+            db.session.execute(BookItem.__table__.insert(), items)
+
+    @staticmethod
+    def _normalize(record, category_map):
+        """
+        校验并转换一行导入数据
+
+        Args:
+            record (dict): 原始数据
+            category_map (dict): 分类编码到分类ID的映射
+
+        Returns:
+            dict: 图书数据，copies 为副本数量，status 为副本状态
+
+        Raises:
+            ValueError: 如果数据不合法
+        """
+        if not isinstance(record, dict):
+            raise ValueError("无法解析该行数据")
+
+        book_data = {'publish_date': None, 'price': None, 'category_id': None}
+        for field, max_length in BookImportService.TEXT_FIELDS.items():
+            value = record.get(field)
+            value = str(value).strip() if value is not None else ''
+            if max_length and len(value) > max_length:
+                raise ValueError(f"{field} 长度不能超过 {max_length}")
+            book_data[field] = value or None
+
+        for field in ('isbn', 'title', 'author'):
+            if not book_data[field]:
+                raise ValueError(f"{field} 不能为空")
+
+        publish_date = record.get('publish_date')
+        if publish_date:
+            try:
+                book_data['publish_date'] = datetime.strptime(str(publish_date).strip(), '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError("publish_date 格式应为 YYYY-MM-DD")
+
+        price = record.get('price')
+        if price not in (None, ''):
+            try:
+                book_data['price'] = Decimal(str(price).strip()).quantize(Decimal('0.01'))
+            except InvalidOperation:
+                raise ValueError("price 不是有效的金额")
+
+        status = record.get('status') or 'available'
+        if status not in BookImportService.STATUSES:
+            raise ValueError(f"status 只能是 {', '.join(BookImportService.STATUSES)}，借出状态不能导入")
+        book_data['status'] = status
+
+        copies = record.get('copies')
+        if copies in (None, ''):
+            book_data['copies'] = 1
+        else:
+            try:
+                book_data['copies'] = int(str(copies).strip())
+            except ValueError:
+                raise ValueError("copies 必须是整数")
+            if not 0 <= book_data['copies'] <= BookImportService.MAX_COPIES:
+                raise ValueError(f"copies 必须在 0 到 {BookImportService.MAX_COPIES} 之间")
+
+        category_code = record.get('category_code')
+        if category_code:
+            category_id = category_map.get(str(category_code).strip())
+            if category_id is None:
+                raise ValueError(f"分类编码 {category_code} 不存在")
+            book_data['category_id'] = category_id
+        elif record.get('category_id'):
+            try:
+                book_data['category_id'] = int(record['category_id'])
+            except (TypeError, ValueError):
+                raise ValueError("category_id 必须是整数")
+
+        return book_data
+
+    @staticmethod
+    def _add_error(report, row_number, record, message):
+        """
+        记录一行导入错误
+
+        Args:
+            report (dict): 导入报告
+            row_number (int): 行号，从1开始，不含CSV表头
+            record (dict): 原始数据
+            message (str): 错误信息
+        """
+        report['failed'] += 1
+        if len(report['errors']) < BookImportService.MAX_ERRORS:
+            report['errors'].append({
+                'row': row_number,
+                'isbn': record.get('isbn') if isinstance(record, dict) else None,
+                'error': message
+            })
\ No newline at end of file
@@ -0,0 +1,349 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, func, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db
+from models.job_model import JobRun, JobLock
+from utils.cron import CronExpression
+
+logger = logging.getLogger(__name__)
+
+# 当前进程的唯一标识，用于记录锁的持有者和任务的执行进程：(进程ID, 标识)
+_worker_id = (None, None)
+
+
+def get_worker_id():
+    """
+    获取当前进程的唯一标识
+
+    gunicorn 预加载应用后 fork 出的工作进程会继承主进程的模块状态，进程ID变化时重新生成。
+
+    Returns:
+        str: 进程标识
+    """
+    global _worker_id
+    pid = os.getpid()
+    if _worker_id[0] != pid:
+        _worker_id = (pid, f'{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}')
+    return _worker_id[1]
+
+
+class Job:
+    """
+    定时任务定义
+    """
+    
+    def __init__(self, name, schedule, func, timeout=1800):
+        """
+        Args:
+            name (str): 任务名称，同时作为锁名称
+            schedule (str): cron表达式
+            func (callable): 任务函数，返回值会以JSON保存到执行记录
+            timeout (int): 锁的有效期（秒），进程异常退出后超过该时间其他进程才能再次执行
+        """
+        self.name = name
+        self.schedule = CronExpression(schedule)
+        self.func = func
+        self.timeout = timeout
+    
+    def __repr__(self):
+        return f'<Job {self.name} {self.schedule.expr}>'
+
+
+class JobService:
+    """
+    定时任务服务类
+    负责任务锁的抢占、执行记录和耗时统计
+    """
+    
+    # 执行记录保留的天数
+    RUN_RETENTION_DAYS = 30
+    
+    @staticmethod
+    def acquire_lock(name, scheduled_at, timeout, owner=None):
+        """
+        抢占任务锁
+        
+        通过一条条件 UPDATE 完成抢占：只有锁已过期且该计划时间尚未被执行时才会更新成功，
+        多个进程同时抢占时数据库保证只有一个成功。
+        
+        Args:
+            name (str): 任务名称
+            scheduled_at (datetime): 本次计划执行时间
+            timeout (int): 锁的有效期（秒）
+            owner (str): 抢占锁的进程标识，默认为当前进程
+            
+        Returns:
+            bool: 是否抢占成功
+        """
+        owner = owner or get_worker_id()
+        now = datetime.now()
+        values = {
+            'owner': owner,
+            'locked_until': now + timedelta(seconds=timeout),
+            'last_scheduled_at': scheduled_at,
+            'updated_at': now
+        }
+        
+        result = db.session.execute(
+            update(JobLock.__table__).where(
+                JobLock.name == name,
+                or_(JobLock.locked_until.is_(None), JobLock.locked_until < now),
+                or_(JobLock.last_scheduled_at.is_(None), JobLock.last_scheduled_at < scheduled_at)
+            ).values(values)
+        )
+        if result.rowcount:
+            db.session.commit()
+            return True
+        
+        # 锁记录不存在时插入，并发插入时只有一个进程成功
+        try:
+            with db.session.begin_nested():
+                db.session.execute(JobLock.__table__.insert().values(name=name, **values))
+        except IntegrityError:
+            return False
+        db.session.commit()
+        return True
+    
+    @staticmethod
+    def release_lock(name, owner=None):
+        """
+        释放任务锁，计划时间仍然保留，同一计划时间不会被其他进程重复执行
+        
+        Args:
+            name (str): 任务名称
+            owner (str): 持有锁的进程标识，默认为当前进程
+        """
+        owner = owner or get_worker_id()
+        db.session.execute(
+            update(JobLock.__table__).where(
+                JobLock.name == name, JobLock.owner == owner
+            ).values(locked_until=None, updated_at=datetime.now())
+        )
+        db.session.commit()
+    
+    @staticmethod
+    def run_job(job, scheduled_at=None):
+        """
+        抢占锁并执行任务，记录执行结果和耗时
+        
+        Args:
+            job (Job): 任务定义
+            scheduled_at (datetime): 计划执行时间，默认为当前时间（手动执行）
+            
+        Returns:
+            JobRun: 执行记录，未抢占到锁时返回None
+        """
+        scheduled_at = scheduled_at or datetime.now()
+        if not JobService.acquire_lock(job.name, scheduled_at, job.timeout):
+            return None
+        
+        run = JobRun(job_name=job.name, scheduled_at=scheduled_at, started_at=datetime.now(), worker=get_worker_id())
+        db.session.add(run)
+        db.session.commit()
+        
+        started = time.perf_counter()
+        try:
+            result = job.func()
+            run.status = 'success'
+            run.result = json.dumps(result, ensure_ascii=False, default=str) if result is not None else None
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("定时任务 %s 执行失败", job.name)
+            run.status = 'failed'
+            run.error = str(e)
+        finally:
+            run.duration_ms = int((time.perf_counter() - started) * 1000)
+            run.finished_at = datetime.now()
+            db.session.commit()
+            JobService.release_lock(job.name)
+        
+        return run
+    
+    @staticmethod
+    def get_metrics(days=7):
+        """
+        统计各任务最近的执行情况和耗时
+        
+        Args:
+            days (int): 统计最近多少天的执行记录
+            
+        Returns:
+            list: 每个任务的执行次数、失败次数、平均/最大耗时和最近一次执行记录
+        """
+        since = datetime.now() - timedelta(days=days)
+        rows = db.session.query(
+            JobRun.job_name,
+            func.count(JobRun.id),
+            func.sum(case((JobRun.status == 'failed', 1), else_=0)),
+            func.avg(JobRun.duration_ms),
+            func.max(JobRun.duration_ms),
+            func.max(JobRun.id)
+        ).filter(JobRun.started_at >= since).group_by(JobRun.job_name).all()
+        
+        last_runs = {
+            run.id: run for run in JobRun.query.filter(JobRun.id.in_([row[5] for row in rows]))
+        }
+        
+        return [{
+            'job_name': job_name,
+            'runs': runs,
+            'failures': int(failures or 0),
+            'avg_duration_ms': round(float(avg_duration), 1) if avg_duration is not None else None,
+            'max_duration_ms': max_duration,
+            'last_run': last_runs[last_id].to_dict() if last_id in last_runs else None
+        } for job_name, runs, failures, avg_duration, max_duration, last_id in rows]
+    
+    @staticmethod
+    def cleanup_runs(retention_days=None):
+        """
+        删除超过保留期的执行记录
+        
+        Args:
+            retention_days (int): 保留天数，默认为 RUN_RETENTION_DAYS
+            
+        Returns:
+            dict: 删除的记录数
+        """
+        cutoff = datetime.now() - timedelta(days=retention_days or JobService.RUN_RETENTION_DAYS)
+        result = db.session.execute(
+            JobRun.__table__.delete().where(and_(JobRun.started_at < cutoff, JobRun.status != 'running'))
+        )
+        db.session.commit()
+        return {'deleted': result.rowcount}
+
+
+class JobScheduler:
+    """
+    进程内定时任务调度器
+    后台线程按cron表达式触发任务，可在多个进程中同时运行，由任务锁保证每次只执行一次
+    """
+    
+    def __init__(self):
+        self.app = None
+        self.jobs = {}
+        self._thread = None
+        self._stop = threading.Event()
+    
+    def init_app(self, app):
+        """
+        绑定Flask应用并注册默认任务
+        
+        Args:
+            app: Flask应用实例
+        """
+        self.app = app
+        register_default_jobs(self)
+    
+    def register(self, name, schedule, func, timeout=1800):
+        """
+        注册定时任务，同名任务会被替换
+        
+        Args:
+            name (str): 任务名称
+            schedule (str): cron表达式
+            func (callable): 任务函数，在应用上下文中执行
+            timeout (int): 锁的有效期（秒）
+            
+        Returns:
+            Job: 任务定义
+        """
+        job = Job(name, schedule, func, timeout)
+        self.jobs[name] = job
+        return job
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """
+        启动后台调度线程，重复调用不会启动多个线程
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='job-scheduler', daemon=True)
+        self._thread.start()
+        logger.info("定时任务调度器已启动，进程 %s", get_worker_id())
+    
+    def stop(self, timeout=None):
+        """
+        停止后台调度线程，正在执行的任务会执行完成
+        
+        Args:
+            timeout (float): 等待线程结束的最长时间（秒）
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def run(self, name):
+        """
+        立即执行一次任务
+        
+        Args:
+            name (str): 任务名称
+            
+        Returns:
+            JobRun: 执行记录，其他进程正在执行该任务时返回None
+        """
+        return JobService.run_job(self.jobs[name])
+    
+    def _loop(self):
+        """
+        调度循环：睡眠到最近的计划时间，然后执行所有到期的任务
+        """
+        now = datetime.now()
+        next_runs = {name: job.schedule.next_after(now) for name, job in self.jobs.items()}
+        
+        while next_runs and not self._stop.is_set():
+            wait = (min(next_runs.values()) - datetime.now()).total_seconds()
+            if wait > 0 and self._stop.wait(wait):
+                break
+            
+            now = datetime.now()
+            for name, scheduled_at in list(next_runs.items()):
+                if scheduled_at > now:
+                    continue
+                with self.app.app_context():
+                    try:
+                        JobService.run_job(self.jobs[name], scheduled_at)
+                    except Exception:
+                        # 数据库不可用等情况下不退出调度线程，等待下一次计划时间
+                        logger.exception("定时任务 %s 调度失败", name)
+                    finally:
+                        db.session.remove()
+                next_runs[name] = self.jobs[name].schedule.next_after(datetime.now())
+
+
+def register_default_jobs(scheduler):
+    """
+    注册图书馆的日常维护任务
+    
+    Args:
+        scheduler (JobScheduler): 调度器
+    """
+    from services.borrow_service import BorrowService
+    from services.popularity_service import PopularityService
+    from services.stats_service import StatsService
+    
+    # 每小时标记逾期借阅并刷新罚款
+    scheduler.register('overdue_sweep', '5 * * * *', BorrowService.check_overdue_borrows)
+    # 每天凌晨校准统计计数器
+    scheduler.register('stats_reconcile', '30 3 * * *', StatsService.reconcile)
+    # 每天清理过期的借阅次数分桶和任务执行记录
+    scheduler.register('popularity_prune', '0 4 * * *', lambda: {'deleted': PopularityService.prune()})
+    scheduler.register('job_runs_cleanup', '30 4 * * *', JobService.cleanup_runs)
+
+
+# 全局调度器实例
+scheduler = JobScheduler()
\ No newline at end of file
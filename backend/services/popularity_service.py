@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime, date, timedelta
+from sqlalchemy import func
+
+from models import db
+from models.book_model import Book
+from models.borrow_model import Borrow
+from models.popularity_model import BookBorrowDaily, BookBorrowTotal
+from services.category_service import CategoryService
+from utils.db_util import increment, increment_many
+
+class PopularityService:
+    """
+    热门图书服务类
+    按天分桶增量维护借阅次数，热门榜单只扫描时间窗口内的分桶
+    """
+    
+    # 时间窗口对应的天数，None 表示全部时间
+    WINDOWS = {
+        'day': 1,
+        'week': 7,
+        'month': 30,
+        'all': None
+    }
+    
+    # 每日分桶保留的天数，超过的分桶由 prune 清理
+    RETENTION_DAYS = 400
+    
+    # 榜单缓存有效期（秒）
+    CACHE_TTL = 60
+    
+    _cache = {}
+    _cache_lock = threading.Lock()
+    
+    @staticmethod
+    def record_borrow(book_id, delta=1, day=None):
+        """
+        记录图书借阅次数的变化，在调用方的事务中执行，由调用方提交
+        
+        Args:
+            book_id (int): 图书ID
+            delta (int): 借阅次数的增量，删除借阅记录时为负数
+            day (date): 借阅日期，默认为今天
+        """
+        day = day or date.today()
+        increment(BookBorrowDaily.__table__, {'book_id': book_id, 'day': day}, 'count', delta)
+        increment(BookBorrowTotal.__table__, {'book_id': book_id}, 'count', delta)
+        PopularityService.clear_cache()
+    
+    @staticmethod
+    def record_borrows(book_ids, day=None):
+        """
+        批量记录一批图书各被借阅一次，在调用方的事务中执行，由调用方提交
+        
+        Args:
+            book_ids (list): 图书ID列表，不能重复
+            day (date): 借阅日期，默认为今天
+        """
+        day = day or date.today()
+        increment_many(BookBorrowDaily.__table__, 'book_id', book_ids, {'day': day}, 'count', 1)
+        increment_many(BookBorrowTotal.__table__, 'book_id', book_ids, {}, 'count', 1)
+        PopularityService.clear_cache()
+    
+    @staticmethod
+    def remove_borrows(borrows):
+        """
+        扣减一批将被删除的借阅记录对应的借阅次数
+        
+        Args:
+            borrows (list): 借阅记录对象列表
+        """
+        changes = Counter((borrow.book_id, borrow.borrow_date.date()) for borrow in borrows)
+        for (book_id, day), count in changes.items():
+            PopularityService.record_borrow(book_id, -count, day)
+    
+    @staticmethod
+    def remove_book(book_id):
+        """
+        删除图书的借阅次数记录，在调用方的事务中执行
+        
+        Args:
+            book_id (int): 图书ID
+        """
+        db.session.execute(BookBorrowDaily.__table__.delete().where(BookBorrowDaily.book_id == book_id))
+        db.session.execute(BookBorrowTotal.__table__.delete().where(BookBorrowTotal.book_id == book_id))
+        PopularityService.clear_cache()
+    
+    @staticmethod
+    def top_books(window='all', category_id=None, limit=10):
+        """
+        获取时间窗口内借阅次数最多的图书
+        
+        Args:
+            window (str): 时间窗口，day/week/month/all
+            category_id (int): 分类ID，只统计该分类及其子分类的图书
+            limit (int): 返回数量
+            
+        Returns:
+            list: (图书对象, 借阅次数) 列表，按借阅次数倒序
+        """
+        key = (window, category_id, limit, date.today())
+        now = time.monotonic()
+        
+        with PopularityService._cache_lock:
+            cached = PopularityService._cache.get(key)
+        if cached and cached[0] > now:
+            ranking = cached[1]
+        else:
+            ranking = PopularityService._rank(window, category_id, limit)
+            with PopularityService._cache_lock:
+                PopularityService._cache[key] = (now + PopularityService.CACHE_TTL, ranking)
+        
+        # 按ID批量加载图书
+        books = {book.id: book for book in Book.query.filter(Book.id.in_([book_id for book_id, _ in ranking]))}
+        return [(books[book_id], count) for book_id, count in ranking if book_id in books]
+    
+    @staticmethod
+    def _rank(window, category_id, limit):
+        """
+        查询时间窗口内的借阅次数排名
+        
+        Args:
+            window (str): 时间窗口
+            category_id (int): 分类ID
+            limit (int): 返回数量
+            
+        Returns:
+            list: (图书ID, 借阅次数) 列表
+        """
+        days = PopularityService.WINDOWS[window]
+        
+        if days is None:
+            # 全部时间直接按累计次数索引取前 limit 条
+            count = BookBorrowTotal.count
+            query = db.session.query(BookBorrowTotal.book_id, count)
+            book_id = BookBorrowTotal.book_id
+        else:
+            # 只聚合窗口内的分桶
+            count = func.sum(BookBorrowDaily.count)
+            query = db.session.query(BookBorrowDaily.book_id, count).filter(
+                BookBorrowDaily.day > date.today() - timedelta(days=days)
+            ).group_by(BookBorrowDaily.book_id)
+            book_id = BookBorrowDaily.book_id
+        
+        if category_id:
+            query = query.join(Book, Book.id == book_id).filter(CategoryService.in_subtree(Book.category_id, category_id))
+        
+        rows = query.having(count > 0) if days is not None else query.filter(count > 0)
+        return [(row[0], int(row[1])) for row in rows.order_by(count.desc()).limit(limit)]
+    
+    @staticmethod
+    def clear_cache():
+        """
+        清空当前进程的榜单缓存
+        """
+        with PopularityService._cache_lock:
+            PopularityService._cache.clear()
+    
+    @staticmethod
+    def rebuild():
+        """
+        根据借阅记录全量重建借阅次数，用于初始化和校准
+        
+        Returns:
+            int: 重建的每日分桶数量
+        """
+        day = func.date(Borrow.borrow_date)
+        rows = db.session.query(
+            Borrow.book_id, day, func.count(Borrow.id)
+        ).group_by(Borrow.book_id, day).all()
+        
+        daily = [
+            {'book_id': book_id, 'day': PopularityService._to_date(borrow_day), 'count': count}
+            for book_id, borrow_day, count in rows
+        ]
+        totals = Counter()
+        for row in daily:
+            totals[row['book_id']] += row['count']
+        
+        db.session.execute(BookBorrowDaily.__table__.delete())
+        db.session.execute(BookBorrowTotal.__table__.delete())
+        if daily:
+            db.session.execute(BookBorrowDaily.__table__.insert(), daily)
+            db.session.execute(
+                BookBorrowTotal.__table__.insert(),
+                [{'book_id': book_id, 'count': count} for book_id, count in totals.items()]
+            )
+        db.session.commit()
+        PopularityService.clear_cache()
+        return len(daily)
+    
+    @staticmethod
+    def ensure_counts():
+        """
+        借阅次数为空而借阅记录有数据时（例如升级后首次启动）全量重建
+        """
+        if db.session.query(BookBorrowTotal.book_id).first() is None and \
+                db.session.query(Borrow.id).first() is not None:
+            PopularityService.rebuild()
+    
+    @staticmethod
+    def prune(retention_days=None):
+        """
+        清理超过保留期的每日分桶，累计次数不受影响
+        
+        Args:
+            retention_days (int): 保留天数，默认为 RETENTION_DAYS
+            
+        Returns:
+            int: 删除的分桶数量
+        """
+        cutoff = date.today() - timedelta(days=retention_days or PopularityService.RETENTION_DAYS)
+        result = db.session.execute(BookBorrowDaily.__table__.delete().where(BookBorrowDaily.day < cutoff))
+        db.session.commit()
+        return result.rowcount
+    
+    @staticmethod
+    def _to_date(value):
+        """
+        将数据库 date() 函数的返回值转换为 date 对象，SQLite 返回字符串
+        
+        Args:
+            value: date 对象或 YYYY-MM-DD 字符串
+            
+        Returns:
+            date: 日期
+        """
+        if isinstance(value, date):
+            return value
+        return datetime.strptime(value, '%Y-%m-%d').date()
\ No newline at end of file
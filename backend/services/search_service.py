@@ -0,0 +1,151 @@
+from collections import defaultdict
+from sqlalchemy import func
+
+from models import db
+from models.book_model import Book
+from models.search_model import BookSearchTerm
+from utils.tokenizer import index_terms, query_terms, compact_isbn
+
+class SearchService:
+    """
+    全文检索服务类
+    维护图书的倒排索引，并提供带相关度排序的检索
+    """
+
+    # 各字段命中时的权重，书名命中排在最前
+    FIELD_WEIGHTS = {
+        'title': 3,
+        'author': 2,
+        'isbn': 2,
+        'publisher': 1
+    }
+
+    @staticmethod
+    def build_terms(book):
+        """
+        计算一本图书的词项及权重
+
+        Args:
+            book: 图书对象或包含 title/author/isbn/publisher 属性的行
+
+        Returns:
+            dict: 词项到权重的映射
+        """
+        terms = defaultdict(int)
+        for field, weight in SearchService.FIELD_WEIGHTS.items():
+            value = getattr(book, field, None)
+            if field == 'isbn':
+                value = compact_isbn(value)
+            for term in index_terms(value):
+                terms[term] += weight
+        return terms
+
+    @staticmethod
+    def index_books(books):
+        """
+        为一批图书写入倒排索引，调用方负责提交事务
+
+        Args:
+            books (list): 已分配ID的图书对象或行
+        """
+        rows = []
+        for book in books:
+            for term, weight in SearchService.build_terms(book).items():
+                rows.append({'term': term, 'book_id': book.id, 'weight': weight})
+        if rows:
+            db.session.execute(BookSearchTerm.__table__.insert(), rows)
+
+    @staticmethod
+    def index_book(book):
+        """
+        重建单本图书的索引，调用方负责提交事务
+
+        Args:
+            book (Book): 已分配ID的图书对象
+        """
+        SearchService.remove_book(book.id)
+        SearchService.index_books([book])
+
+    @staticmethod
+    def remove_book(book_id):
+        """
+        删除单本图书的索引，调用方负责提交事务
+
+        Args:
+            book_id (int): 图书ID
+        """
+        db.session.execute(
+            BookSearchTerm.__table__.delete().where(BookSearchTerm.book_id == book_id)
+        )
+
+    @staticmethod
+    def match_subquery(search):
+        """
+        构建检索子查询
+
+        所有查询词项都必须命中（AND语义），得分为命中词项的权重之和。
+
+        Args:
+            search (str): 搜索关键词
+
+        Returns:
+            Subquery: 包含 book_id 和 score 两列的子查询；关键词无法切分出词项时返回None
+        """
+        terms = query_terms(search)
+        if not terms:
+            return None
+
+        return db.session.query(
+            BookSearchTerm.book_id.label('book_id'),
+            func.sum(BookSearchTerm.weight).label('score')
+        ).filter(
+            BookSearchTerm.term.in_(terms)
+        ).group_by(
+            BookSearchTerm.book_id
+        ).having(
+            func.count(BookSearchTerm.term) == len(terms)
+        ).subquery()
+
+    @staticmethod
+    def rebuild_index(batch_size=1000, progress=None):
+        """
+        全量重建倒排索引
+
+        Args:
+            batch_size (int): 每批处理的图书数量
+            progress (callable): 进度回调，参数为已处理的图书数量
+
+        Returns:
+            int: 已索引的图书数量
+        """
+        db.session.execute(BookSearchTerm.__table__.delete())
+
+        columns = (Book.id, Book.title, Book.author, Book.isbn, Book.publisher)
+        last_id = 0
+        total = 0
+        while True:
+            batch = db.session.query(*columns).filter(
+                Book.id > last_id
+            ).order_by(Book.id).limit(batch_size).all()
+            if not batch:
+                break
+
+            SearchService.index_books(batch)
+            db.session.commit()
+
+            last_id = batch[-1].id
+            total += len(batch)
+            if progress:
+                progress(total)
+
+        db.session.commit()
+        return total
+
+    @staticmethod
+    def ensure_index():
+        """
+        索引为空而图书表有数据时（例如升级后首次启动）自动重建索引
+        """
+        if db.session.query(BookSearchTerm.book_id).first() is None and \
+                db.session.query(Book.id).first() is not None:
+            SearchService.rebuild_index()
\ No newline at end of file
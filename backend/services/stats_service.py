@@ -0,0 +1,105 @@
+from datetime import datetime
+
+from models import db
+from models.book_model import Book
+from models.user_model import User
+from models.borrow_model import Borrow
+from models.stats_model import StatCounter
+from utils.db_util import increment
+
+class StatsService:
+    """
+    统计服务类
+    增量维护仪表盘统计数据，避免每次请求都对全表计数
+    """
+    
+    TOTAL_BOOKS = 'total_books'
+    TOTAL_USERS = 'total_users'
+    TOTAL_BORROWS = 'total_borrows'
+    ACTIVE_BORROWS = 'active_borrows'
+    
+    # 每个计数器对应的全量计数查询，用于初始化和定期校准
+    COUNTERS = {
+        TOTAL_BOOKS: lambda: Book.query.count(),
+        TOTAL_USERS: lambda: User.query.count(),
+        TOTAL_BORROWS: lambda: Borrow.query.count(),
+        ACTIVE_BORROWS: lambda: Borrow.query.filter(Borrow.return_date.is_(None)).count()
+    }
+    
+    @staticmethod
+    def incr(name, delta=1):
+        """
+        增减计数器，在调用方的事务中执行，由调用方提交
+        
+        增量写入随机选择的分片行，并发事务很少锁住同一行。
+        
+        Args:
+            name (str): 计数器名称
+            delta (int): 增量，可以为负数
+        """
+        if not delta:
+            return
+        
+        increment(StatCounter.__table__, {'name': StatCounter.random_shard(name)}, 'value', delta, {'updated_at': datetime.now()})
+    
+    @staticmethod
+    def get_counters(names):
+        """
+        批量读取计数器，对每个计数器的分片行求和
+        
+        Args:
+            names (list): 计数器名称列表
+            
+        Returns:
+            dict: 计数器名称到计数值的映射，不存在的计数器为0
+        """
+        shard_names = [shard_name for name in names for shard_name in StatCounter.shard_names(name)]
+        rows = db.session.query(StatCounter.name, StatCounter.value).filter(StatCounter.name.in_(shard_names))
+        values = dict.fromkeys(names, 0)
+        for shard_name, value in rows:
+            values[StatCounter.counter_name(shard_name)] += value
+        return values
+    
+    @staticmethod
+    def get_statistics():
+        """
+        获取仪表盘统计数据
+        
+        Returns:
+            dict: 图书总数、用户总数、借阅总数和未归还借阅数
+        """
+        return StatsService.get_counters(list(StatsService.COUNTERS))
+    
+    @staticmethod
+    def reconcile():
+        """
+        使用全量计数校准所有计数器，计数值写入第0个分片行，其余分片行清零
+        
+        Returns:
+            dict: 校准后的计数值
+        """
+        table = StatCounter.__table__
+        values = {name: count() for name, count in StatsService.COUNTERS.items()}
+        
+        existing = {name for name, in db.session.query(StatCounter.name).filter(StatCounter.name.in_(values))}
+        now = datetime.now()
+        for name, value in values.items():
+            db.session.execute(
+                table.update().where(table.c.name.in_(StatCounter.shard_names(name)[1:])).values(value=0, updated_at=now)
+            )
+            if name in existing:
+                db.session.execute(table.update().where(table.c.name == name).values(value=value, updated_at=now))
+            else:
+                db.session.execute(table.insert().values(name=name, value=value, updated_at=now))
+        
+        db.session.commit()
+        return values
+    
+    @staticmethod
+    def ensure_counters():
+        """
+        计数器缺失时（例如升级后首次启动）进行一次全量校准
+        """
+        count = db.session.query(StatCounter.name).filter(StatCounter.name.in_(list(StatsService.COUNTERS))).count()
+        if count < len(StatsService.COUNTERS):
+            StatsService.reconcile()
\ No newline at end of file
@@ -5,6 +5,13 @@ from sqlalchemy import or_
 from models import db
 from models.user_model import User
 from models.borrow_model import Borrow
+from services.stats_service import StatsService
+from services.popularity_service import PopularityService
+from utils.principal_cache import invalidate_principal
+from utils.rate_limit import reset_login_failures
+from utils.pagination import keyset_paginate, count_total
+from utils.db_routing import read_only
+from utils.serializer_util import RowSerializer, format_datetimes
 
 class UserService:
     """
@@ -12,14 +19,27 @@ class UserService:
     处理用户相关的业务逻辑
     """
     
+    # 列表接口的批量序列化器，字段与 User.to_dict 保持一致
+    ROW_SERIALIZER = RowSerializer([
+        ('id', User.id, None),
+        ('username', User.username, None),
+        ('email', User.email, None),
+        ('name', User.name, None),
+        ('phone', User.phone, None),
+        ('role', User.role, None),
+        ('status', User.status, None),
+        ('avatar', User.avatar_url, None),
+        ('last_login', User.last_login, format_datetimes),
+        ('created_at', User.created_at, format_datetimes),
+        ('updated_at', User.updated_at, format_datetimes)
+    ])
+    
     @staticmethod
-    def get_users(page=1, per_page=10, search=None, username=None, name=None, role=None, status=None):
+    def build_query(search=None, username=None, name=None, role=None, status=None):
         """
-        获取用户列表，支持分页、搜索和筛选
+        构建带筛选条件的用户查询
         
         Args:
-            page (int): 页码
-            per_page (int): 每页数量
             search (str): 搜索关键词
             username (str): 用户名搜索
             name (str): 姓名搜索
@@ -27,7 +47,7 @@ class UserService:
             status (str): 用户状态
             
         Returns:
-            tuple: (用户列表, 总数)
+            Query: 查询对象
         """
         query = User.query
         
@@ -59,13 +79,71 @@ class UserService:
         if status:
             query = query.filter(User.status == status)
         
+        return query
+    
+    @staticmethod
+    @read_only
+    def get_users(page=1, per_page=10, search=None, username=None, name=None, role=None, status=None,
+                  cursor=None, count_mode='exact', serializer=None):
+        """
+        获取用户列表，支持分页、搜索和筛选
+        
+        Args:
+            page (int): 页码
+            per_page (int): 每页数量
+            search (str): 搜索关键词
+            username (str): 用户名搜索
+            name (str): 姓名搜索
+            role (str): 用户角色
+            status (str): 用户状态
+            cursor (str): 分页游标，不为None时使用游标分页并忽略page
+            count_mode (str): 总数统计方式，见 utils.pagination.count_total
+            serializer (RowSerializer): 指定时只查询序列化所需的列，列表元素为元组行
+            
+        Returns:
+            tuple: (用户列表, 总数, 下一页游标)
+        """
+        query = UserService.build_query(search, username, name, role, status)
+        
         # 获取总数
-        total = query.count()
+        total = count_total(query, count_mode)
+        
+        # 只查询需要的列
+        if serializer is not None:
+            query = serializer.apply(query)
+        
+        # 游标分页
+        if cursor is not None:
+            users, next_cursor = keyset_paginate(query, User, cursor, per_page)
+            return users, total, next_cursor
         
-        # 分页
-        users = query.order_by(User.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        # 分页，总数已单独统计，不再使用 paginate 重复计数
+        page = max(page, 1)
+        users = query.order_by(User.created_at.desc()).limit(per_page).offset((page - 1) * per_page).all()
         
-        return users.items, total
+        return users, total, None
+    
+    @staticmethod
+    def export_users(serializer, search=None, username=None, name=None, role=None, status=None, batch_size=1000):
+        """
+        流式导出用户，筛选条件与 get_users 相同
+        
+        Args:
+            serializer (RowSerializer): 行序列化器，决定导出的列
+            search (str): 搜索关键词
+            username (str): 用户名搜索
+            name (str): 姓名搜索
+            role (str): 用户角色
+            status (str): 用户状态
+            batch_size (int): 每次从数据库游标读取的行数
+            
+        Returns:
+            Query: 按ID顺序流式读取的元组行查询
+        """
+        query = UserService.build_query(search, username, name, role, status)
+        return serializer.apply(query).order_by(User.id).execution_options(
+            stream_results=True
+        ).yield_per(batch_size)
     
     @staticmethod
     def get_user_by_id(user_id):
@@ -147,6 +225,7 @@ class UserService:
                 setattr(user, key, value)
         
         db.session.add(user)
+        StatsService.incr(StatsService.TOTAL_USERS)
         db.session.commit()
         return user
     
@@ -180,9 +259,13 @@ class UserService:
             if existing_user and existing_user.id != user_id:
                 abort(400, description="邮箱已存在")
         
-        # 更新密码
+        # 更新密码并递增令牌版本，之前签发的token全部失效
         if 'password' in user_data:
             user.password = user_data.pop('password')
+            user.token_version = User.token_version + 1
+        
+        # 解锁账号时提交后清空登录失败次数
+        unlocked = user.status == 'locked' and user_data.get('status', 'locked') != 'locked'
         
         # 更新其他字段
         for key, value in user_data.items():
@@ -191,6 +274,9 @@ class UserService:
         
         user.updated_at = datetime.now()
         db.session.commit()
+        invalidate_principal(user.id)
+        if unlocked:
+            reset_login_failures(user.username)
         return user
     
     @staticmethod
@@ -226,9 +312,16 @@ class UserService:
         for borrow in borrows:
             db.session.delete(borrow)
         
+        StatsService.incr(StatsService.TOTAL_BORROWS, -len(borrows))
+        StatsService.incr(StatsService.ACTIVE_BORROWS, -sum(1 for borrow in borrows if borrow.return_date is None))
+        PopularityService.remove_borrows(borrows)
+        
         # 删除用户
+        StatsService.incr(StatsService.TOTAL_USERS, -1)
         db.session.delete(user)
         db.session.commit()
+        # 用户快照失效后该用户的token无法再通过验证
+        invalidate_principal(user_id)
         return True
     
     @staticmethod
@@ -245,7 +338,10 @@ class UserService:
         """
         user = UserService.get_user_by_username(username)
         
-        if user and user.verify_password(password):
+        if user and user.check_password(password):
+            # 哈希算法参数已调整时，使用明文密码透明升级哈希
+            if user.password_needs_rehash():
+                user.password = password
             # 更新最后登录时间
             user.last_login = datetime.now()
             db.session.commit()
@@ -269,9 +365,15 @@ class UserService:
             404: 如果用户不存在
         """
         user = UserService.get_user_by_id(user_id)
+        unlocked = user.status == 'locked' and status != 'locked'
         user.status = status
         user.updated_at = datetime.now()
         db.session.commit()
+        invalidate_principal(user.id)
+        
+        # 解锁账号时清空登录失败次数，否则下一次失败会立即再次锁定
+        if unlocked:
+            reset_login_failures(user.username)
         return user
     
     @staticmethod
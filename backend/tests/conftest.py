@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+# 测试使用独立的数据库，不读取 .env 中的数据库配置，也不启动定时任务
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['SCHEDULER_ENABLED'] = 'false'
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    
+    from app import create_app
+    app = create_app('development')
+    app.config['TESTING'] = True
+    yield app
+    
+    from models import db
+    from utils import rate_limit
+    from utils.principal_cache import clear_principals
+    from utils.token_cache import clear_tokens
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    clear_principals()
+    clear_tokens()
+    rate_limit._stores.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(app, client):
+    """创建指定角色的用户并登录，返回带认证令牌的请求头"""
+    from models import db
+    from models.user_model import User
+    
+    def _login(username, role='reader', password='123456'):
+        with app.app_context():
+            user = User(username=username, email=f'{username}@example.com', role=role)
+            user.password = password
+            db.session.add(user)
+            db.session.commit()
+        response = client.post('/api/auth/login', json={'username': username, 'password': password})
+        token = response.get_json()['data']['access_token']
+        return {'Authorization': f'Bearer {token}'}
+    
+    return _login
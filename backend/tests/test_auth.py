@@ -0,0 +1,40 @@
+import pytest
+
+
+def test_login_rejects_non_string_username(client):
+    response = client.post('/api/auth/login', json={'username': ['admin'], 'password': '123456'})
+    
+    assert response.status_code == 400
+
+
+def test_unlock_clears_login_failures(app, client, login):
+    from models.user_model import User
+    from services.user_service import UserService
+    
+    app.config['LOGIN_MAX_FAILURES'] = 3
+    app.config['LOGIN_RATE_LIMIT_USER'] = (100, 1)
+    login('reader1')
+    for _ in range(3):
+        client.post('/api/auth/login', json={'username': 'reader1', 'password': 'wrong'})
+    
+    with app.app_context():
+        user = User.query.filter_by(username='reader1').first()
+        assert user.status == 'locked'
+        UserService.update_user_status(user.id, 'active')
+    
+    # 解锁后重新计数，一次输错不会再次锁定
+    response = client.post('/api/auth/login', json={'username': 'reader1', 'password': 'wrong'})
+    assert response.status_code == 401
+    response = client.post('/api/auth/login', json={'username': 'reader1', 'password': '123456'})
+    assert response.status_code == 200
+
+
+def test_startup_rejects_hash_method_too_long_for_column(tmp_path, monkeypatch):
+    from config import Config
+    from app import create_app
+    
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(Config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha512:600000')
+    
+    with pytest.raises(ValueError):
+        create_app('development')
@@ -0,0 +1,47 @@
+import io
+
+
+def upload(client, headers, text, filename='books.csv'):
+    return client.post(
+        '/api/books/import',
+        data={'file': (io.BytesIO(text.encode('utf-8')), filename)},
+        content_type='multipart/form-data',
+        headers=headers
+    )
+
+
+def test_reader_cannot_import_books(client, login):
+    headers = login('reader1')
+    
+    response = upload(client, headers, 'isbn,title,author\n111,A,x\n')
+    
+    assert response.status_code == 403
+
+
+def test_librarian_can_import_books(client, login):
+    headers = login('librarian1', role='librarian')
+    
+    response = upload(client, headers, 'isbn,title,author\n111,A,x\n222,B,y\n')
+    
+    assert response.status_code == 200
+    assert response.get_json()['data']['imported'] == 2
+
+
+def test_import_rejects_too_many_rows(app, client, login):
+    app.config['IMPORT_MAX_ROWS'] = 2
+    headers = login('admin1', role='admin')
+    
+    response = upload(client, headers, 'isbn,title,author\n111,A,x\n222,B,y\n333,C,z\n')
+    
+    assert response.status_code == 413
+    response = client.get('/api/books/export', headers=headers)
+    assert '111' not in response.get_data(as_text=True)
+
+
+def test_import_rejects_large_upload(app, client, login):
+    app.config['IMPORT_MAX_UPLOAD_SIZE'] = 64
+    headers = login('admin1', role='admin')
+    
+    response = upload(client, headers, 'isbn,title,author\n' + '111,A,x\n' * 20)
+    
+    assert response.status_code == 413
@@ -0,0 +1,78 @@
+import io
+from datetime import datetime, timedelta
+
+
+def test_import_rejects_borrowed_status(client, login):
+    headers = login('admin1', role='admin')
+    text = 'isbn,title,author,status\n111,A,x,borrowed\n222,B,y,available\n'
+    
+    response = client.post(
+        '/api/books/import',
+        data={'file': (io.BytesIO(text.encode('utf-8')), 'books.csv')},
+        content_type='multipart/form-data',
+        headers=headers
+    )
+    
+    report = response.get_json()['data']
+    assert report['imported'] == 1
+    assert report['failed'] == 1
+    assert report['errors'][0]['isbn'] == '111'
+
+
+def test_migrate_items_marks_borrowed_only_with_open_borrow(app):
+    from models import db
+    from models.book_model import Book
+    from models.book_item_model import BookItem
+    from models.borrow_model import Borrow
+    from models.user_model import User
+    from services.book_service import BookService
+    
+    with app.app_context():
+        user = User(username='reader1', email='reader1@example.com')
+        user.password = '123456'
+        lent = Book(title='Lent', author='a', status='borrowed')
+        stale = Book(title='Stale', author='a', status='borrowed')
+        db.session.add_all([user, lent, stale])
+        db.session.flush()
+        now = datetime.now()
+        db.session.add(Borrow(book_id=lent.id, user_id=user.id, borrow_date=now,
+                              due_date=now + timedelta(days=14), status='borrowing'))
+        db.session.commit()
+        
+        BookService.migrate_items()
+        
+        statuses = dict(db.session.query(BookItem.book_id, BookItem.status))
+        assert statuses[lent.id] == 'borrowed'
+        assert statuses[stale.id] == 'available'
+        stale = db.session.get(Book, stale.id)
+        assert (stale.total_copies, stale.available_copies, stale.status) == (1, 1, 'available')
+
+
+def test_copy_numbers_follow_book_prefix(app):
+    from models import db
+    from models.book_model import Book
+    from models.book_item_model import BookItem
+    from services.book_service import BookService
+    
+    with app.app_context():
+        db.session.add(Book(id=123456789, title='Big', author='a'))
+        db.session.add(Book(id=12345678, title='Small', author='a'))
+        db.session.commit()
+        BookService.add_book_items(12345678, 1)
+        
+        items = BookService.add_book_items(123456789, 2)
+        items += BookService.add_book_items(123456789, 1)
+        
+        assert [item.barcode for item in items] == [
+            'B12345678900001', 'B12345678900002', 'B12345678900003'
+        ]
+        assert BookItem.parse_copy_number('B1234567800001', 123456789) is None
+
+
+def test_create_book_without_copies_is_not_lost(app):
+    from services.book_service import BookService
+    
+    with app.app_context():
+        book = BookService.create_book({'title': 'New', 'author': 'a'}, copies=0)
+        
+        assert (book.status, book.total_copies, book.available_copies) == ('available', 0, 0)
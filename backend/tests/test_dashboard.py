@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.mark.parametrize('path', ['/api/dashboard/jobs', '/api/dashboard/db-pool'])
+def test_ops_endpoints_are_admin_only(client, login, path):
+    assert client.get(path).status_code == 401
+    
+    response = client.get(path, headers=login('reader1'))
+    assert response.status_code == 403
+    
+    response = client.get(path, headers=login('admin1', role='admin'))
+    assert response.status_code == 200
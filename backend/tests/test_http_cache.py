@@ -0,0 +1,21 @@
+def test_compressed_category_list_uses_weak_etag(app, client, login):
+    from models import db
+    from models.category_model import Category
+    
+    with app.app_context():
+        db.session.add_all(Category(name=f'分类{i}', description='x' * 40) for i in range(40))
+        db.session.commit()
+    headers = login('reader1')
+    
+    response = client.get('/api/categories', headers={**headers, 'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    etag, weak = response.get_etag()
+    assert weak
+    
+    response = client.get('/api/categories', headers={**headers, 'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 304
+    
+    response = client.get('/api/categories', headers={**headers, 'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_etag() == (etag, False)
@@ -0,0 +1,20 @@
+def test_counters_sum_shards_and_reconcile(app):
+    from models import db
+    from models.stats_model import StatCounter
+    from services.stats_service import StatsService
+    
+    with app.app_context():
+        StatsService.reconcile()
+        for _ in range(50):
+            StatsService.incr(StatsService.TOTAL_BORROWS)
+        StatsService.incr(StatsService.TOTAL_BORROWS, -5)
+        db.session.commit()
+        
+        shards = db.session.query(StatCounter.name).filter(
+            StatCounter.name.in_(StatCounter.shard_names(StatsService.TOTAL_BORROWS))
+        ).count()
+        assert shards > 1
+        assert StatsService.get_statistics()[StatsService.TOTAL_BORROWS] == 45
+        
+        assert StatsService.reconcile()[StatsService.TOTAL_BORROWS] == 0
+        assert StatsService.get_statistics()[StatsService.TOTAL_BORROWS] == 0
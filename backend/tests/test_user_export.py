@@ -0,0 +1,20 @@
+def test_reader_cannot_export_users(client, login):
+    headers = login('reader1')
+    
+    response = client.get('/api/users/export', headers=headers)
+    
+    assert response.status_code == 403
+    assert response.get_json()['code'] == 403
+
+
+def test_admin_can_export_users(client, login):
+    headers = login('admin1', role='admin')
+    
+    response = client.get('/api/users/export?format=csv', headers=headers)
+    
+    assert response.status_code == 200
+    assert 'admin1' in response.get_data(as_text=True)
+
+
+def test_export_requires_login(client):
+    assert client.get('/api/users/export').status_code == 401
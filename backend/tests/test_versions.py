@@ -0,0 +1,14 @@
+def test_versions_sum_shards(app):
+    from models import db
+    from models.category_model import Category
+    from utils.version_util import bump_version, get_version, get_versions
+    
+    with app.app_context():
+        before = get_versions(['books', 'categories'])
+        for _ in range(20):
+            bump_version('books')
+        db.session.add(Category(name='Fiction'))
+        db.session.commit()
+        
+        assert get_version('books') == before['books'] + 20
+        assert get_version('categories') == before['categories'] + 1
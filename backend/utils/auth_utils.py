@@ -1,7 +1,7 @@
 from functools import wraps
 from flask import request, jsonify, g
-from models.user_model import User
 from routes.auth import verify_token
+from utils.principal_cache import get_principal
 
 def login_required(f):
     """
@@ -33,17 +33,22 @@ def login_required(f):
                     'message': '认证令牌无效或已过期'
                 }), 401
                 
-            # 这里简化处理，实际应用中应该从数据库验证令牌
-            # 假设我们有一个用户ID为1的管理员用户
-            current_user = User.query.get(1)
+            # 读取缓存的用户快照，命中时不查询数据库
+            current_user = get_principal(user_id)
             
             if not current_user:
                 return jsonify({
                     'code': 401,
                     'message': '用户不存在'
                 }), 401
+            
+            if current_user.status == 'locked':
+                return jsonify({
+                    'code': 401,
+                    'message': '账号已被锁定'
+                }), 401
                 
-            # 将用户信息存储在g对象中，以便视图函数使用
+            # 将用户快照存储在g对象中，以便视图函数使用
             g.current_user = current_user
             
         except Exception as e:
@@ -55,11 +60,35 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def roles_required(*roles):
+    """
+    角色验证装饰器，放在 login_required 之后使用
+    
+    Args:
+        *roles: 允许访问的角色，如 'admin', 'librarian'
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method == 'OPTIONS':
+                return jsonify({'code': 200, 'message': 'OK'})
+            
+            current_user = get_current_user()
+            if not current_user or current_user.role not in roles:
+                return jsonify({
+                    'code': 403,
+                    'message': '没有权限执行此操作'
+                }), 403
+                
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
 def get_current_user():
     """
     获取当前登录用户
     
     Returns:
-        User: 当前登录用户对象
+        Principal: 当前登录用户的快照（id、username、role、status）
     """
     return getattr(g, 'current_user', None) 
\ No newline at end of file
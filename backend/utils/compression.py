@@ -0,0 +1,254 @@
+import gzip
+import threading
+import zlib
+from flask import Response, current_app, request
+
+# brotli 为可选依赖，未安装时只支持 gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 压缩后收益明显的响应类型
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/csv',
+    'text/css',
+    'text/html',
+    'text/plain'
+}
+
+# 预先编码的响应只压缩一次，使用最高压缩级别
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 11
+
+
+def supported_encodings():
+    """
+    服务端支持的压缩格式，按优先级排列
+
+    Returns:
+        tuple: 压缩格式名称
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding():
+    """
+    根据请求的 Accept-Encoding 选择压缩格式
+
+    q值相同时优先使用 brotli。
+
+    Returns:
+        str: 压缩格式，客户端不接受压缩时返回None
+    """
+    best, best_quality = None, 0
+    for encoding in supported_encodings():
+        quality = request.accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, level=None):
+    """
+    压缩完整的响应体
+
+    Args:
+        data (bytes): 原始数据
+        encoding (str): 压缩格式，br 或 gzip
+        level (int): 压缩级别，默认使用配置值
+
+    Returns:
+        bytes: 压缩后的数据
+    """
+    if encoding == 'br':
+        quality = current_app.config['COMPRESSION_BROTLI_QUALITY'] if level is None else level
+        return brotli.compress(data, quality=quality)
+    level = current_app.config['COMPRESSION_GZIP_LEVEL'] if level is None else level
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding, level, charset='utf-8'):
+    """
+    流式压缩响应体，压缩器内部缓冲，攒够数据后才输出，不会逐行产生很小的压缩块
+
+    生成器在请求上下文结束后才被迭代，压缩级别需由调用方传入。
+
+    Args:
+        chunks (iterable): 原始响应体分块
+        encoding (str): 压缩格式，br 或 gzip
+        level (int): 压缩级别
+        charset (str): 文本分块的编码
+
+    Yields:
+        bytes: 压缩后的数据块
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        process, finish = compressor.process, compressor.finish
+    else:
+        # wbits=31 输出带 gzip 头的数据
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode(charset)
+            data = process(chunk)
+            if data:
+                yield data
+        yield finish()
+    finally:
+        # 客户端断开时关闭原始生成器，释放数据库游标
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+class EncodedBody:
+    """
+    预先编码的响应体
+
+    各压缩格式在第一次被请求时生成并缓存，之后的请求直接返回压缩结果。
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def get(self, encoding):
+        """
+        获取指定格式的响应体
+
+        Args:
+            encoding (str): 压缩格式，None 表示不压缩
+
+        Returns:
+            bytes: 响应体
+        """
+        if encoding is None:
+            return self.body
+        data = self._encoded.get(encoding)
+        if data is None:
+            level = PRECOMPRESS_BROTLI_QUALITY if encoding == 'br' else PRECOMPRESS_GZIP_LEVEL
+            data = compress(self.body, encoding, level)
+            with self._lock:
+                self._encoded[encoding] = data
+        return data
+
+
+class EncodedCache:
+    """
+    按版本缓存预先编码的响应体，版本变化时重新编码
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        """
+        获取缓存的响应体
+
+        Args:
+            key: 缓存键
+            version: 数据版本，与缓存中的版本不同时重新生成
+            build (callable): 生成原始响应体（bytes）的函数
+
+        Returns:
+            EncodedBody: 预先编码的响应体
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        body = EncodedBody(build())
+        with self._lock:
+            self._entries[key] = (version, body)
+        return body
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+
+def encoded_response(body, mimetype='application/json'):
+    """
+    使用预先编码的响应体生成响应，按客户端支持的格式直接返回压缩结果
+
+    Args:
+        body (EncodedBody): 预先编码的响应体
+        mimetype (str): 响应类型
+
+    Returns:
+        Response: 响应对象
+    """
+    encoding = choose_encoding() if len(body.body) >= current_app.config['COMPRESSION_MIN_SIZE'] else None
+    response = Response(body.get(encoding), mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def compress_response(response):
+    """
+    after_request 钩子：按 Accept-Encoding 压缩响应
+
+    流式响应无法预知大小，总是使用流式压缩；普通响应小于 COMPRESSION_MIN_SIZE 时不压缩。
+
+    Args:
+        response (Response): 响应对象
+
+    Returns:
+        Response: 处理后的响应对象
+    """
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or request.method == 'HEAD'
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        level_key = 'COMPRESSION_BROTLI_QUALITY' if encoding == 'br' else 'COMPRESSION_GZIP_LEVEL'
+        response.response = compress_stream(
+            response.response, encoding, current_app.config[level_key], response.charset
+        )
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config['COMPRESSION_MIN_SIZE']:
+            return response
+        response.set_data(compress(data, encoding))
+
+    response.headers['Content-Encoding'] = encoding
+
+    # 压缩后的字节与原始内容不同，强ETag改为弱ETag
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """
+    为应用注册响应压缩
+
+    Args:
+        app (Flask): Flask应用实例
+    """
+    if app.config.get('COMPRESSION_ENABLED', True):
+        app.after_request(compress_response)
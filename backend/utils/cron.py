@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+
+# 各字段的取值范围：分 时 日 月 周（0和7都表示周日）
+FIELD_RANGES = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    ('weekday', 0, 7)
+)
+
+# 向后查找下一次执行时间的最大年数，超过则认为表达式永远不会触发（如 2月30日）
+MAX_LOOKAHEAD_YEARS = 5
+
+
+def parse_field(expr, low, high):
+    """
+    解析cron表达式的一个字段
+
+    支持 *、数字、范围 a-b、步长 */n 和 a-b/n，以及逗号分隔的列表。
+
+    Args:
+        expr (str): 字段表达式
+        low (int): 最小值
+        high (int): 最大值
+
+    Returns:
+        set: 字段允许的取值
+
+    Raises:
+        ValueError: 如果表达式不合法
+    """
+    values = set()
+    for part in expr.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/', 1)
+            step = int(step)
+            if step < 1:
+                raise ValueError(f"步长必须大于0：{expr}")
+
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"取值超出范围 {low}-{high}：{expr}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """
+    五段式cron表达式：分 时 日 月 周
+    日和周都不是 * 时，任意一个匹配即可，与标准cron一致
+    """
+
+    def __init__(self, expr):
+        """
+        Args:
+            expr (str): cron表达式，如 '*/15 * * * *'
+
+        Raises:
+            ValueError: 如果表达式不合法
+        """
+        fields = expr.split()
+        if len(fields) != len(FIELD_RANGES):
+            raise ValueError(f"cron表达式应包含 {len(FIELD_RANGES)} 个字段：{expr}")
+
+        try:
+            parsed = [
+                parse_field(field, low, high)
+                for field, (_, low, high) in zip(fields, FIELD_RANGES)
+            ]
+        except ValueError as e:
+            raise ValueError(f"无效的cron表达式 {expr}：{e}")
+
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # 转换为 datetime.weekday() 的取值：周一为0，周日为6
+        self.weekdays = {(value - 1) % 7 for value in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def __repr__(self):
+        return f'<CronExpression {self.expr}>'
+
+    def match_day(self, moment):
+        """
+        判断日期是否满足日和周字段
+
+        Args:
+            moment (datetime): 时间
+
+        Returns:
+            bool: 是否匹配
+        """
+        day_match = moment.day in self.days
+        weekday_match = moment.weekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, moment):
+        """
+        计算给定时间之后的下一次触发时间
+
+        不匹配的月、日、小时整体跳过，而不是逐分钟尝试。
+
+        Args:
+            moment (datetime): 起始时间，不包含在结果内
+
+        Returns:
+            datetime: 下一次触发时间，精确到分钟
+
+        Raises:
+            ValueError: 如果表达式在可预见的时间内不会触发
+        """
+        current = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment.year + MAX_LOOKAHEAD_YEARS
+
+        while current.year <= limit:
+            if current.month not in self.months:
+                year, month = divmod(current.month, 12)
+                current = datetime(current.year + year, month + 1, 1)
+                continue
+            if not self.match_day(current):
+                current = datetime(current.year, current.month, current.day) + timedelta(days=1)
+                continue
+            if current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+                continue
+            if current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+                continue
+            return current
+
+        raise ValueError(f"cron表达式不会触发：{self.expr}")
@@ -0,0 +1,157 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    记录连接获取次数和等待时间的连接池
+
+    等待时间包括连接池已满时排队的时间和新建连接的时间，用于根据工作进程和线程数调整连接池大小。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+
+        waited = time.perf_counter() - start
+        with self._metrics_lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        return connection
+
+    def metrics(self):
+        """
+        获取连接池的统计数据
+
+        Returns:
+            dict: 连接获取次数、超时次数和等待时间（毫秒）
+        """
+        with self._metrics_lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0,
+                'wait_max_ms': round(self.wait_max * 1000, 3)
+            }
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(uri, config):
+    """
+    根据数据库类型生成引擎参数
+
+    MySQL 使用连接池并定期回收连接，避免被服务端 wait_timeout 断开；
+    SQLite 文件数据库同样使用连接池，内存数据库保持 SQLAlchemy 的默认设置。
+
+    Args:
+        uri (str): 数据库连接地址
+        config (dict): 应用配置
+
+    Returns:
+        dict: 传给 create_engine 的参数
+    """
+    url = make_url(uri)
+    backend = url.get_backend_name()
+
+    if backend == 'sqlite':
+        if _is_memory_sqlite(url):
+            return {}
+        return {
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+            'connect_args': {
+                # 连接会在线程间传递，由连接池保证同一时间只有一个线程使用
+                'check_same_thread': False,
+                'timeout': config['SQLITE_BUSY_TIMEOUT'] / 1000
+            }
+        }
+
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING']
+    }
+
+
+def configure_engine(engine, config):
+    """
+    为引擎注册连接事件，SQLite 的每个新连接都设置 PRAGMA
+
+    Args:
+        engine (Engine): 数据库引擎
+        config (dict): 应用配置
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    memory = _is_memory_sqlite(engine.url)
+    pragmas = [
+        ('synchronous', config['SQLITE_SYNCHRONOUS']),
+        ('busy_timeout', config['SQLITE_BUSY_TIMEOUT']),
+        ('mmap_size', config['SQLITE_MMAP_SIZE'])
+    ]
+    if not memory:
+        # WAL 模式下读写互不阻塞，journal_mode 会写入数据库文件，内存数据库不适用
+        pragmas.insert(0, ('journal_mode', config['SQLITE_JOURNAL_MODE']))
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def pool_metrics(engine):
+    """
+    获取引擎连接池的状态和统计数据，数据只反映当前进程
+
+    Args:
+        engine (Engine): 数据库引擎
+
+    Returns:
+        dict: 连接池状态
+    """
+    pool = engine.pool
+    metrics = {
+        'dialect': engine.dialect.name,
+        'pool': type(pool).__name__,
+        'status': pool.status()
+    }
+    if isinstance(pool, QueuePool):
+        metrics.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        metrics.update(pool.metrics())
+    return metrics
@@ -0,0 +1,204 @@
+import logging
+import random
+import threading
+import time
+from functools import wraps
+from flask import current_app, request
+from flask_sqlalchemy import SQLAlchemy, SignallingSession, get_state
+from sqlalchemy import orm, text
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+# 从库在 SQLALCHEMY_BINDS 中的名称前缀
+REPLICA_BIND_PREFIX = 'replica_'
+
+# 读写分离相关的 session.info 键
+USE_REPLICA = 'use_replica'  # 当前处于只读方法中
+PIN_PRIMARY = 'pin_primary'  # 本次请求需要读到自己刚写入的数据
+WROTE = 'wrote'  # 本次会话已经写过主库
+REPLICA_KEY = 'replica_key'  # 本次会话选中的从库，False 表示没有可用从库
+
+# 写入后一段时间内的请求都读主库，客户端通过该 cookie 携带截止时间
+PIN_COOKIE = 'db_pin_primary'
+
+
+def replica_keys(app):
+    """
+    获取应用配置的从库名称
+
+    Args:
+        app (Flask): Flask应用实例
+
+    Returns:
+        list: 从库在 SQLALCHEMY_BINDS 中的名称
+    """
+    binds = app.config.get('SQLALCHEMY_BINDS') or {}
+    return sorted(key for key in binds if key.startswith(REPLICA_BIND_PREFIX))
+
+
+class ReplicaMonitor:
+    """
+    从库延迟检查
+
+    每个从库的延迟检查结果在进程内缓存 REPLICA_LAG_CHECK_INTERVAL 秒，
+    延迟超过 REPLICA_MAX_LAG、复制已停止或无法连接的从库不参与读请求。
+    """
+
+    def __init__(self):
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, app, key):
+        """
+        判断从库是否可用
+
+        Args:
+            app (Flask): Flask应用实例
+            key (str): 从库名称
+
+        Returns:
+            bool: 从库延迟是否在允许范围内
+        """
+        now = time.monotonic()
+        with self._lock:
+            checked = self._checked.get(key)
+        if checked and now - checked[0] < app.config['REPLICA_LAG_CHECK_INTERVAL']:
+            return checked[1]
+
+        lag = self.get_lag(get_state(app).db.get_engine(app, key))
+        healthy = lag is not None and lag <= app.config['REPLICA_MAX_LAG']
+        if not healthy:
+            logger.warning("从库 %s 延迟 %s 秒，暂停读取", key, lag)
+        with self._lock:
+            self._checked[key] = (now, healthy)
+        return healthy
+
+    @staticmethod
+    def get_lag(engine):
+        """
+        查询从库的复制延迟
+
+        Args:
+            engine (Engine): 从库引擎
+
+        Returns:
+            float: 延迟秒数，复制已停止或无法连接时返回None
+        """
+        if engine.dialect.name != 'mysql':
+            # SQLite 等没有复制状态的数据库视为没有延迟
+            return 0
+
+        try:
+            with engine.connect() as connection:
+                # MySQL 8.0.22 起使用 SHOW REPLICA STATUS，旧版本使用 SHOW SLAVE STATUS
+                try:
+                    row = connection.execute(text('SHOW REPLICA STATUS')).mappings().first()
+                except Exception:
+                    row = connection.execute(text('SHOW SLAVE STATUS')).mappings().first()
+        except Exception:
+            logger.exception("检查从库延迟失败")
+            return None
+
+        if row is None:
+            # 不是从库（如直接指向主库的只读账号），没有延迟
+            return 0
+        lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+        return float(lag) if lag is not None else None
+
+    def clear(self):
+        """清空检查结果"""
+        with self._lock:
+            self._checked.clear()
+
+
+replica_monitor = ReplicaMonitor()
+
+
+class RoutingSession(SignallingSession):
+    """
+    读写分离会话
+
+    只读方法（见 read_only）中的查询发送到从库，其余查询、flush 和增删改语句都发送到主库。
+    会话一旦写过主库，之后的查询也读主库，保证读到自己的写入。
+    """
+
+    def get_bind(self, mapper=None, clause=None):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info[WROTE] = True
+        elif self.info.get(USE_REPLICA) and not self.info.get(WROTE) and not self.info.get(PIN_PRIMARY):
+            engine = self._get_replica()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper, clause)
+
+    def _get_replica(self):
+        """
+        获取本次会话使用的从库，同一会话内固定使用同一个从库
+
+        Returns:
+            Engine: 从库引擎，没有可用从库时返回None
+        """
+        key = self.info.get(REPLICA_KEY)
+        if key is None:
+            healthy = [key for key in replica_keys(self.app) if replica_monitor.is_healthy(self.app, key)]
+            key = random.choice(healthy) if healthy else False
+            self.info[REPLICA_KEY] = key
+        if not key:
+            return None
+        return get_state(self.app).db.get_engine(self.app, key)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """
+    使用读写分离会话的 SQLAlchemy
+    """
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+def read_only(f):
+    """
+    只读方法装饰器：方法内的查询在配置了从库时发送到从库
+
+    可以嵌套使用，方法返回后恢复之前的状态。流式查询在方法返回后才执行，
+    调用方需要在同一个只读方法内迭代结果。
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        session = get_state(current_app).db.session()
+        previous = session.info.get(USE_REPLICA)
+        session.info[USE_REPLICA] = True
+        try:
+            return f(*args, **kwargs)
+        finally:
+            session.info[USE_REPLICA] = previous
+    return decorated_function
+
+
+def init_routing(app, db):
+    """
+    为应用注册读写分离：为从库连接设置与主库相同的参数，并通过 cookie 实现跨请求的读己之写
+
+    写过主库的请求在响应中设置 cookie，READ_YOUR_WRITES_SECONDS 秒内同一客户端的请求都读主库。
+
+    Args:
+        app (Flask): Flask应用实例
+        db (SQLAlchemy): 数据库实例
+    """
+    if not replica_keys(app):
+        return
+
+    @app.before_request
+    def pin_primary():
+        until = request.cookies.get(PIN_COOKIE, type=float)
+        if until and until > time.time():
+            db.session.info[PIN_PRIMARY] = True
+
+    @app.after_request
+    def set_pin_cookie(response):
+        if db.session.info.get(WROTE):
+            seconds = app.config['READ_YOUR_WRITES_SECONDS']
+            response.set_cookie(PIN_COOKIE, str(time.time() + seconds), max_age=seconds, httponly=True)
+        return response
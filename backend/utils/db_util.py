@@ -0,0 +1,64 @@
+from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError
+
+from models import db
+
+
+def increment(table, keys, column, delta, values=None):
+    """
+    原子地增减计数列，记录不存在时插入
+
+    在调用方的事务中执行，由调用方提交。先执行 UPDATE col = col + delta，
+    没有命中记录时再插入；并发插入导致主键冲突时退回更新。
+
+    Args:
+        table (Table): 计数表
+        keys (dict): 主键列及其取值
+        column (str): 计数列名
+        delta (int): 增量，可以为负数
+        values (dict): 需要同时写入的其他列，如更新时间
+    """
+    values = values or {}
+    condition = and_(*(table.c[name] == value for name, value in keys.items()))
+    update = table.update().where(condition).values({column: table.c[column] + delta, **values})
+
+    if db.session.execute(update).rowcount:
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values({**keys, column: delta, **values}))
+    except IntegrityError:
+        db.session.execute(update)
+
+def increment_many(table, id_column, ids, keys, column, delta):
+    """
+    原子地为一批记录增减计数列，不存在的记录批量插入
+
+    与 increment 相同，在调用方的事务中执行。无论批量大小，只需要一次查询、一次更新和一次批量插入；
+    并发插入导致主键冲突时退回逐条 increment。
+
+    Args:
+        table (Table): 计数表
+        id_column (str): 批量记录的区分列，如 book_id
+        ids (list): 区分列的取值，不能重复
+        keys (dict): 其余主键列及其取值，所有记录相同
+        column (str): 计数列名
+        delta (int): 增量，可以为负数
+    """
+    condition = and_(table.c[id_column].in_(ids), *(table.c[name] == value for name, value in keys.items()))
+    existing = {value for value, in db.session.execute(select(table.c[id_column]).where(condition))}
+
+    if existing:
+        db.session.execute(table.update().where(condition).values({column: table.c[column] + delta}))
+
+    missing = [value for value in ids if value not in existing]
+    if not missing:
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert(), [{**keys, id_column: value, column: delta} for value in missing])
+    except IntegrityError:
+        for value in missing:
+            increment(table, {**keys, id_column: value}, column, delta)
@@ -0,0 +1,82 @@
+import csv
+import io
+from datetime import datetime
+from flask import Response, stream_with_context
+
+from .serializer_util import RowSerializer, dumps
+
+# 支持的导出格式及对应的MIME类型
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8'
+}
+
+
+def iter_ndjson(serializer, rows):
+    """
+    将结果行编码为NDJSON，每行一个JSON对象
+
+    Args:
+        serializer (RowSerializer): 行序列化器
+        rows (iterable): 流式查询返回的元组行
+
+    Yields:
+        bytes: NDJSON片段
+    """
+    for chunk in RowSerializer.iter_chunks(rows):
+        yield b''.join(dumps(item) + b'\n' for item in serializer.serialize(chunk))
+
+
+def iter_csv(serializer, rows):
+    """
+    将结果行编码为CSV，首行为字段名
+
+    Args:
+        serializer (RowSerializer): 行序列化器
+        rows (iterable): 流式查询返回的元组行
+
+    Yields:
+        bytes: CSV片段
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # 写入BOM，便于Excel正确识别中文
+    buffer.write('\ufeff')
+    writer.writerow(serializer.names)
+
+    for chunk in RowSerializer.iter_chunks(rows):
+        for item in serializer.serialize(chunk):
+            writer.writerow(item.values())
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining.encode('utf-8')
+
+
+def export_response(serializer, rows, export_format, name):
+    """
+    生成流式导出响应
+
+    生成器在请求上下文中逐批读取数据库游标，内存占用与导出行数无关。
+
+    Args:
+        serializer (RowSerializer): 行序列化器
+        rows (iterable): 流式查询返回的元组行
+        export_format (str): 导出格式，ndjson 或 csv
+        name (str): 导出文件名前缀
+
+    Returns:
+        Response: 流式响应
+    """
+    generate = iter_csv if export_format == 'csv' else iter_ndjson
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format}"
+
+    return Response(
+        stream_with_context(generate(serializer, rows)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
\ No newline at end of file
@@ -0,0 +1,136 @@
+import hashlib
+from functools import wraps
+from flask import Response, make_response, request
+
+from utils.compression import encoded_response
+from utils.version_util import get_versions
+
+# 接口数据需要登录才能访问，只允许浏览器私有缓存，每次使用前向服务端验证
+CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts):
+    """
+    由版本信息生成ETag值（不含引号）
+
+    Args:
+        *parts: 组成ETag的各部分，如资源名称和版本号
+
+    Returns:
+        str: ETag值
+    """
+    return '-'.join(str(part) for part in parts)
+
+
+def timestamp_part(value):
+    """
+    将更新时间转换为ETag的组成部分，精确到微秒
+
+    Args:
+        value (datetime): 更新时间，可以为None
+
+    Returns:
+        str: 时间戳字符串
+    """
+    return value.strftime('%Y%m%d%H%M%S%f') if value else '0'
+
+
+def is_not_modified(etag):
+    """
+    判断请求的 If-None-Match 是否与当前ETag一致
+
+    Args:
+        etag (str): 当前ETag值
+
+    Returns:
+        bool: 客户端缓存是否仍然有效
+    """
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified(etag):
+    """
+    生成304响应
+
+    Args:
+        etag (str): 当前ETag值
+
+    Returns:
+        Response: 不含响应体的304响应
+    """
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def json_bytes_response(body, etag):
+    """
+    使用预先编码的JSON生成带ETag的响应
+
+    Args:
+        body (EncodedBody): 预先编码（含压缩结果）的JSON响应体
+        etag (str): ETag值
+
+    Returns:
+        Response: JSON响应
+    """
+    response = encoded_response(body)
+    # 压缩后的字节与原始内容不同，与 compress_response 一致使用弱ETag
+    response.set_etag(etag, weak='Content-Encoding' in response.headers)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def args_digest():
+    """
+    计算请求查询参数的摘要，同一集合接口不同筛选条件的ETag互不相同
+
+    Returns:
+        str: 摘要
+    """
+    items = sorted(request.args.items(multi=True))
+    return hashlib.sha1(repr(items).encode('utf-8')).hexdigest()[:16]
+
+
+def versioned_collection(*names):
+    """
+    集合接口的条件请求装饰器
+
+    ETag 由相关表的版本号和查询参数组成，客户端数据仍是最新时直接返回304，不查询数据行。
+
+    Args:
+        *names: 响应内容依赖的表，如 'borrows', 'books', 'users'
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+
+            versions = get_versions(names)
+            etag = make_etag(request.path.strip('/').replace('/', '.'), *(versions[name] for name in names), args_digest())
+            if is_not_modified(etag):
+                return not_modified(etag)
+
+            return with_etag(f(*args, **kwargs), etag)
+        return decorated_function
+    return decorator
+
+
+def with_etag(response, etag):
+    """
+    为成功的响应设置ETag和缓存策略
+
+    Args:
+        response: 视图函数的返回值
+        etag (str): ETag值
+
+    Returns:
+        Response: 响应对象
+    """
+    response = make_response(response)
+    if response.status_code == 200:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
\ No newline at end of file
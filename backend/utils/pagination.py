@@ -0,0 +1,129 @@
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from flask import abort
+from sqlalchemy import and_, or_
+
+# 统计总数的方式：精确计数 / 缓存计数 / 不计数
+COUNT_MODES = ('exact', 'cached', 'none')
+
+# 缓存计数的有效期（秒）和最多缓存的查询条数
+COUNT_CACHE_TTL = 30
+COUNT_CACHE_SIZE = 256
+
+_count_cache = OrderedDict()
+_count_cache_lock = threading.Lock()
+
+
+def encode_cursor(created_at, record_id):
+    """
+    生成不透明的分页游标
+
+    Args:
+        created_at (datetime): 当前页最后一条记录的创建时间
+        record_id (int): 当前页最后一条记录的ID
+
+    Returns:
+        str: URL安全的游标字符串
+    """
+    raw = json.dumps([created_at.isoformat(), record_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    解析分页游标
+
+    Args:
+        cursor (str): encode_cursor 生成的游标
+
+    Returns:
+        tuple: (创建时间, 记录ID)
+
+    Raises:
+        400: 如果游标格式不正确
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(record_id)
+    except (ValueError, TypeError):
+        abort(400, description="无效的分页游标")
+
+
+def keyset_paginate(query, model, cursor=None, per_page=10):
+    """
+    按 (created_at, id) 倒序进行游标分页
+
+    与 OFFSET 分页不同，任意深度的页面都只需要一次索引范围扫描。
+
+    Args:
+        query (Query): 已添加筛选条件的查询
+        model: 包含 created_at 和 id 列的模型类
+        cursor (str): 上一页返回的游标，为空时返回第一页
+        per_page (int): 每页数量
+
+    Returns:
+        tuple: (记录列表, 下一页游标)，没有更多数据时游标为None
+    """
+    query = query.order_by(None).order_by(model.created_at.desc(), model.id.desc())
+
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < record_id)
+            )
+        )
+
+    # 多取一条用于判断是否还有下一页
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return items, next_cursor
+
+
+def count_total(query, mode='exact'):
+    """
+    统计查询结果总数
+
+    Args:
+        query (Query): 已添加筛选条件的查询
+        mode (str): exact 精确计数；cached 相同查询在有效期内复用上次的计数；none 不计数
+
+    Returns:
+        int: 总数，mode 为 none 时返回None
+    """
+    if mode == 'none':
+        return None
+    if mode != 'cached':
+        return query.count()
+
+    compiled = query.statement.compile()
+    key = (str(compiled), repr(sorted(compiled.params.items())))
+    now = time.monotonic()
+
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+        if cached and cached[1] > now:
+            _count_cache.move_to_end(key)
+            return cached[0]
+
+    total = query.count()
+
+    with _count_cache_lock:
+        _count_cache[key] = (total, now + COUNT_CACHE_TTL)
+        _count_cache.move_to_end(key)
+        while len(_count_cache) > COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+
+    return total
\ No newline at end of file
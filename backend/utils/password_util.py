@@ -0,0 +1,151 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordPoolBusy(ServiceUnavailable):
+    """
+    密码哈希进程池排队已满
+    """
+    description = '登录请求过多，请稍后重试'
+
+    def __init__(self, description=None, retry_after=1):
+        super().__init__(description, retry_after=retry_after)
+
+
+class PasswordPool:
+    """
+    密码哈希进程池
+    哈希计算在独立进程中执行，不占用请求线程的CPU和GIL；排队的任务数有上限，
+    超过上限时立即拒绝，避免登录高峰拖慢其他接口
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """
+        获取当前进程的进程池，进程池在首次使用时创建，fork 出的子进程会重新创建
+        """
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                workers = current_app.config['PASSWORD_POOL_WORKERS']
+                max_pending = current_app.config['PASSWORD_POOL_MAX_PENDING']
+                self._executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+                self._slots = threading.BoundedSemaphore(max_pending)
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, func, *args):
+        """
+        在进程池中执行函数并等待结果
+
+        Args:
+            func (callable): 可序列化的模块级函数
+            *args: 函数参数
+
+        Returns:
+            函数的返回值
+
+        Raises:
+            PasswordPoolBusy: 如果排队的任务数已达上限或等待超时
+        """
+        executor = self._get_executor()
+        if executor is None:
+            # 未启用进程池时在当前线程中执行
+            return func(*args)
+
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise PasswordPoolBusy()
+
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            slots.release()
+            raise
+        # 任务完成时才释放名额，等待超时的任务仍然占用名额直到执行结束
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            return future.result(timeout=current_app.config['PASSWORD_POOL_TIMEOUT'])
+        except FutureTimeoutError:
+            raise PasswordPoolBusy()
+
+    def shutdown(self):
+        """
+        关闭当前进程的进程池
+        """
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# 全局进程池实例
+password_pool = PasswordPool()
+
+
+def hash_password(password):
+    """
+    使用配置的算法计算密码哈希
+
+    Args:
+        password (str): 原始密码
+
+    Returns:
+        str: 密码哈希
+    """
+    method = current_app.config['PASSWORD_HASH_METHOD']
+    return password_pool.submit(generate_password_hash, password, method)
+
+
+def verify_password(pwhash, password):
+    """
+    验证密码
+
+    Args:
+        pwhash (str): 密码哈希
+        password (str): 待验证的密码
+
+    Returns:
+        bool: 密码是否正确
+    """
+    return password_pool.submit(check_password_hash, pwhash, password)
+
+
+def needs_rehash(pwhash):
+    """
+    判断密码哈希的算法参数是否与当前配置不一致
+
+    Args:
+        pwhash (str): 密码哈希，格式为 method$salt$hash
+
+    Returns:
+        bool: 是否需要用当前配置重新计算哈希
+    """
+    method = current_app.config['PASSWORD_HASH_METHOD']
+    return pwhash.split('$', 1)[0] != method
+
+
+def check_hash_method(method, max_length):
+    """
+    检查配置的哈希算法生成的密码哈希能否写入密码列
+
+    Args:
+        method (str): 哈希算法，见 PASSWORD_HASH_METHOD
+        max_length (int): 密码列的最大长度
+
+    Raises:
+        ValueError: 如果哈希长度超过密码列的长度
+    """
+    length = len(generate_password_hash('', method))
+    if length > max_length:
+        raise ValueError(
+            f"PASSWORD_HASH_METHOD={method} 生成的哈希长度为 {length}，超过密码列的 {max_length} 个字符"
+        )
\ No newline at end of file
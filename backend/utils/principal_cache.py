@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from models import db
+from models.user_model import User
+
+# 认证后保存在 g.current_user 中的用户快照，只包含鉴权需要的字段
+Principal = namedtuple('Principal', ['id', 'username', 'role', 'status', 'token_version'])
+
+# 用户快照的有效期（秒）和最多缓存的用户数
+# 用户信息变更时会主动失效当前进程的缓存，有效期限制了其他进程读到旧数据的时间
+PRINCIPAL_CACHE_TTL = 60
+PRINCIPAL_CACHE_SIZE = 10000
+
+_principal_cache = OrderedDict()
+_principal_cache_lock = threading.Lock()
+
+
+def get_principal(user_id):
+    """
+    获取用户快照，缓存未命中时查询数据库
+
+    Args:
+        user_id (int): 用户ID
+
+    Returns:
+        Principal: 用户快照，用户不存在时返回None
+    """
+    now = time.monotonic()
+
+    with _principal_cache_lock:
+        cached = _principal_cache.get(user_id)
+        if cached and cached[1] > now:
+            _principal_cache.move_to_end(user_id)
+            return cached[0]
+
+    row = db.session.query(
+        User.id, User.username, User.role, User.status, User.token_version
+    ).filter(User.id == user_id).first()
+    if row is None:
+        return None
+    principal = Principal(*row)
+
+    with _principal_cache_lock:
+        _principal_cache[user_id] = (principal, now + PRINCIPAL_CACHE_TTL)
+        _principal_cache.move_to_end(user_id)
+        while len(_principal_cache) > PRINCIPAL_CACHE_SIZE:
+            _principal_cache.popitem(last=False)
+
+    return principal
+
+
+def invalidate_principal(user_id):
+    """
+    使用户快照失效，用户信息、状态变更或删除后调用
+
+    Args:
+        user_id (int): 用户ID
+    """
+    with _principal_cache_lock:
+        _principal_cache.pop(user_id, None)
+
+
+def clear_principals():
+    """
+    清空当前进程的用户快照缓存
+    """
+    with _principal_cache_lock:
+        _principal_cache.clear()
\ No newline at end of file
@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+
+from models import db
+
+
+def eager_load(query, model, relations=None):
+    """
+    按模型声明的序列化关系批量预加载
+
+    每个关系额外执行一次 IN 查询，与结果行数无关，避免 to_dict 逐行触发懒加载。
+
+    Args:
+        query (Query): 模型查询
+        model: 模型类，通过 SERIALIZE_RELATIONS 声明 to_dict 需要的关系
+        relations (tuple): 需要预加载的关系名，默认使用模型声明
+
+    Returns:
+        Query: 添加了预加载选项的查询
+    """
+    if relations is None:
+        relations = getattr(model, 'SERIALIZE_RELATIONS', ())
+    if not relations:
+        return query
+    return query.options(*(selectinload(getattr(model, name)) for name in relations))
+
+
+class QueryCounter:
+    """
+    SQL语句计数器
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    统计代码块内执行的SQL语句数量
+
+    Args:
+        engine: 数据库引擎，默认使用 db.engine
+
+    Yields:
+        QueryCounter: 计数器，count 为已执行的语句数
+    """
+    engine = engine or db.engine
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter)
+
+
+@contextmanager
+def assert_max_queries(limit, engine=None):
+    """
+    断言代码块内执行的SQL语句不超过指定数量
+
+    Args:
+        limit (int): 允许的最大语句数
+        engine: 数据库引擎，默认使用 db.engine
+
+    Raises:
+        AssertionError: 如果执行的语句数超过限制
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        statements = '\n'.join(counter.statements)
+        raise AssertionError(f"执行了 {counter.count} 条SQL语句，超过上限 {limit}:\n{statements}")
\ No newline at end of file
@@ -0,0 +1,258 @@
+import threading
+import time
+from flask import current_app
+
+# redis 为可选依赖，只有配置了 redis:// 存储时才需要安装
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# 内存存储每写入多少次清理一次已回满或已过期的键
+MEMORY_PRUNE_INTERVAL = 10000
+
+
+class MemoryStore:
+    """
+    进程内的令牌桶存储，多进程部署时每个进程单独计数
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._counters = {}
+        self._flags = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        """
+        从令牌桶中取出令牌
+
+        Args:
+            key (str): 令牌桶名称
+            capacity (int): 桶容量，即允许的突发请求数
+            refill_rate (float): 每秒补充的令牌数
+            cost (int): 本次请求消耗的令牌数
+
+        Returns:
+            float: 令牌不足时需要等待的秒数，取出成功时为0
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            wait = 0
+            if tokens < cost:
+                wait = (cost - tokens) / refill_rate
+            else:
+                tokens -= cost
+            # 记录桶回满的时间，回满之后的桶与新建的桶等价，可以清理
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+            self._maybe_prune(now)
+            return wait
+
+    def incr(self, key, ttl):
+        """
+        计数加一，计数在首次增加后 ttl 秒过期
+
+        Args:
+            key (str): 计数名称
+            ttl (int): 有效期（秒）
+
+        Returns:
+            int: 增加后的计数
+        """
+        now = time.monotonic()
+        with self._lock:
+            count, expires = self._counters.get(key, (0, now + ttl))
+            if expires <= now:
+                count, expires = 0, now + ttl
+            self._counters[key] = (count + 1, expires)
+            return count + 1
+
+    def delete(self, key):
+        """
+        删除计数
+
+        Args:
+            key (str): 计数名称
+        """
+        with self._lock:
+            self._counters.pop(key, None)
+
+    def set_flag(self, key, ttl):
+        """
+        设置标记，ttl 秒后自动失效
+
+        Args:
+            key (str): 标记名称
+            ttl (int): 有效期（秒）
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._flags[key] = now + ttl
+            self._maybe_prune(now)
+
+    def has_flag(self, key):
+        """
+        检查标记是否存在
+
+        Args:
+            key (str): 标记名称
+
+        Returns:
+            bool: 标记是否存在且未过期
+        """
+        with self._lock:
+            expires = self._flags.get(key)
+            return expires is not None and expires > time.monotonic()
+
+    def _maybe_prune(self, now):
+        """
+        定期清理已经回满的令牌桶和过期的计数，避免大量不同IP占用内存
+        """
+        self._writes += 1
+        if self._writes < MEMORY_PRUNE_INTERVAL:
+            return
+        self._writes = 0
+        self._buckets = {
+            key: value for key, value in self._buckets.items() if value[2] > now
+        }
+        self._counters = {
+            key: value for key, value in self._counters.items() if value[1] > now
+        }
+        self._flags = {
+            key: expires for key, expires in self._flags.items() if expires > now
+        }
+
+
+class RedisStore:
+    """
+    Redis 令牌桶存储，多个进程和服务器共享计数
+    """
+
+    # 在 Redis 中原子地补充并取出令牌，返回需要等待的毫秒数
+    CONSUME_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local wait = 0
+if tokens < cost then
+    wait = math.ceil((cost - tokens) / rate * 1000)
+else
+    tokens = tokens - cost
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return wait
+"""
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("使用 Redis 存储需要安装 redis 包")
+        self._client = redis.Redis.from_url(url)
+        self._consume = self._client.register_script(self.CONSUME_SCRIPT)
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        return self._consume(keys=[key], args=[capacity, refill_rate, cost]) / 1000
+
+    def incr(self, key, ttl):
+        pipe = self._client.pipeline()
+        pipe.set(key, 0, ex=ttl, nx=True)
+        pipe.incr(key)
+        return pipe.execute()[1]
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def set_flag(self, key, ttl):
+        self._client.set(key, 1, ex=ttl)
+
+    def has_flag(self, key):
+        return bool(self._client.exists(key))
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """
+    获取配置的限流存储，RATE_LIMIT_STORAGE_URI 为 memory:// 或 redis://...
+
+    令牌吊销记录也保存在该存储中。
+
+    Returns:
+        MemoryStore|RedisStore: 限流存储
+    """
+    uri = current_app.config.get('RATE_LIMIT_STORAGE_URI', 'memory://')
+    with _stores_lock:
+        store = _stores.get(uri)
+        if store is None:
+            store = MemoryStore() if uri.startswith('memory://') else RedisStore(uri)
+            _stores[uri] = store
+        return store
+
+
+def _username_key(username):
+    """
+    生成按用户名计数的键，用户名不区分大小写
+
+    Args:
+        username: 登录请求中的用户名，可能不是字符串
+
+    Returns:
+        str: 规范化的用户名
+    """
+    return str(username or '').lower()
+
+
+def check_login_rate(ip, username):
+    """
+    检查登录请求是否超过频率限制，按IP和用户名分别限流
+
+    Args:
+        ip (str): 客户端IP
+        username (str): 登录用户名
+
+    Returns:
+        float: 需要等待的秒数，未超过限制时为0
+    """
+    config = current_app.config
+    store = get_store()
+
+    wait = store.consume(f'login:ip:{ip}', *config['LOGIN_RATE_LIMIT_IP'])
+    if wait:
+        return wait
+    return store.consume(f'login:user:{_username_key(username)}', *config['LOGIN_RATE_LIMIT_USER'])
+
+
+def record_login_failure(username):
+    """
+    记录一次登录失败
+
+    Args:
+        username (str): 登录用户名
+
+    Returns:
+        int: 失败计数窗口内的连续失败次数
+    """
+    return get_store().incr(
+        f'login:failures:{_username_key(username)}', current_app.config['LOGIN_FAILURE_WINDOW']
+    )
+
+
+def reset_login_failures(username):
+    """
+    登录成功或管理员解锁账号后清空失败次数
+
+    Args:
+        username (str): 登录用户名
+    """
+    get_store().delete(f'login:failures:{_username_key(username)}')
\ No newline at end of file
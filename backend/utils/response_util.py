@@ -1,4 +1,6 @@
-from flask import jsonify
+from flask import jsonify, Response
+
+from .serializer_util import dumps
 
 class ResponseUtil:
     """
@@ -106,4 +108,32 @@ class ResponseUtil:
         Returns:
             dict: 服务器内部错误的标准响应
         """
-        return ResponseUtil.error(500, message) 
\ No newline at end of file
+        return ResponseUtil.error(500, message) 
+    
+    @staticmethod
+    def success_rows(data, key, serializer, rows, message="success"):
+        """
+        流式输出包含批量行数据的成功响应
+        
+        响应结构与 success 相同，rows 通过 serializer 分块编码为 data[key]。
+        
+        Args:
+            data (dict): 除行数据以外的其他字段，如分页信息
+            key (str): 行数据在 data 中的字段名
+            serializer (RowSerializer): 行序列化器
+            rows (iterable): 查询返回的元组行
+            message (str): 响应消息
+            
+        Returns:
+            Response: 流式JSON响应
+        """
+        envelope = dumps({"code": 0, "message": message, "data": data})
+        # 去掉 data 对象末尾的 "}}"，在其后追加行数据字段
+        prefix = envelope[:-2] + (b',' if data else b'') + dumps(key) + b':'
+        
+        def generate():
+            yield prefix
+            yield from serializer.iter_json(rows)
+            yield b'}}'
+        
+        return Response(generate(), mimetype='application/json')
\ No newline at end of file
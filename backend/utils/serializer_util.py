@@ -0,0 +1,171 @@
+import json
+
+# orjson 为可选依赖，未安装时退回标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 流式输出时每次编码的行数
+JSON_CHUNK_SIZE = 500
+
+
+def dumps(obj):
+    """
+    将对象编码为JSON字节串
+
+    Args:
+        obj: 可JSON序列化的对象
+
+    Returns:
+        bytes: UTF-8编码的JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def format_datetimes(values):
+    """
+    批量格式化日期时间列，格式与 strftime('%Y-%m-%d %H:%M:%S') 一致
+
+    Args:
+        values (iterable): datetime 列
+
+    Returns:
+        list: 格式化后的字符串列表，空值保留为None
+    """
+    return [value.isoformat(' ', 'seconds') if value else None for value in values]
+
+
+def format_dates(values):
+    """
+    批量格式化日期列，格式与 strftime('%Y-%m-%d') 一致
+
+    Args:
+        values (iterable): date 列
+
+    Returns:
+        list: 格式化后的字符串列表，空值保留为None
+    """
+    return [value.isoformat() if value else None for value in values]
+
+
+def format_decimals(values):
+    """
+    批量将金额列转换为浮点数，空值和0转换为None
+
+    Args:
+        values (iterable): Decimal 列
+
+    Returns:
+        list: 浮点数列表
+    """
+    return [float(value) if value else None for value in values]
+
+
+def format_amounts(values):
+    """
+    批量将金额列转换为浮点数，空值转换为0
+
+    Args:
+        values (iterable): Decimal 列
+
+    Returns:
+        list: 浮点数列表
+    """
+    return [float(value) if value else 0 for value in values]
+
+
+class RowSerializer:
+    """
+    批量行序列化器
+    只查询需要的列，按列批量格式化后再组装为字典，替代逐行调用 to_dict
+    """
+
+    def __init__(self, fields, joins=()):
+        """
+        Args:
+            fields (list): (字段名, 列表达式, 列格式化函数或None) 列表
+            joins (tuple): (关联目标, 关联条件) 列表，查询时以外连接方式关联；
+                关联目标应使用 aliased() 创建，避免与查询中已有的关联冲突
+        """
+        self.joins = tuple(joins)
+        self.names = [name for name, _, _ in fields]
+        self.columns = [column.label(name) for name, column, _ in fields]
+        self.formatters = [formatter for _, _, formatter in fields]
+
+    def apply(self, query):
+        """
+        将查询改写为只返回序列化所需的列
+
+        Args:
+            query (Query): 模型查询
+
+        Returns:
+            Query: 返回元组行的查询
+        """
+        for target, onclause in self.joins:
+            query = query.outerjoin(target, onclause)
+        return query.with_entities(*self.columns)
+
+    def serialize(self, rows):
+        """
+        将查询结果行批量转换为字典列表
+
+        Args:
+            rows (list): apply 后查询返回的元组行
+
+        Returns:
+            list: 字典列表
+        """
+        if not rows:
+            return []
+        columns = [
+            formatter(column) if formatter else column
+            for column, formatter in zip(zip(*rows), self.formatters)
+        ]
+        names = self.names
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def iter_json(self, rows, chunk_size=JSON_CHUNK_SIZE):
+        """
+        分块将结果行编码为JSON数组
+
+        Args:
+            rows (iterable): apply 后查询返回的元组行，可以是流式结果
+            chunk_size (int): 每块的行数
+
+        Yields:
+            bytes: JSON数组片段
+        """
+        yield b'['
+        first = True
+        for chunk in self.iter_chunks(rows, chunk_size):
+            encoded = dumps(self.serialize(chunk))[1:-1]
+            if not encoded:
+                continue
+            yield encoded if first else b',' + encoded
+            first = False
+        yield b']'
+
+    @staticmethod
+    def iter_chunks(rows, chunk_size=JSON_CHUNK_SIZE):
+        """
+        将结果行按固定大小分块
+
+        Args:
+            rows (iterable): 结果行
+            chunk_size (int): 每块的行数
+
+        Yields:
+            list: 结果行列表
+        """
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
\ No newline at end of file
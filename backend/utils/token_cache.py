@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from utils.rate_limit import get_store
+
+# 最多缓存的已验证令牌数
+TOKEN_CACHE_SIZE = 10000
+
+# 令牌哈希 -> (用户ID, 过期时间戳, 令牌版本)
+# 缓存只省去签名校验，吊销状态和令牌版本每次请求都会检查
+_token_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def token_hash(token):
+    """
+    计算令牌的哈希值，缓存中不保存令牌原文
+
+    Args:
+        token (str): 令牌
+
+    Returns:
+        str: SHA-256 十六进制摘要
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def get_cached_token(key):
+    """
+    查询已验证令牌的缓存
+
+    Args:
+        key (str): 令牌哈希
+
+    Returns:
+        tuple: (用户ID, 令牌版本)，未命中或已过期时返回None
+    """
+    now = time.time()
+    with _lock:
+        entry = _token_cache.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del _token_cache[key]
+            return None
+        _token_cache.move_to_end(key)
+        return entry[0], entry[2]
+
+
+def cache_token(key, user_id, exp, version=0):
+    """
+    缓存签名校验通过的令牌
+
+    Args:
+        key (str): 令牌哈希
+        user_id (int): 用户ID
+        exp (int): 过期时间戳
+        version (int): 令牌版本，旧版本签发的令牌没有该字段，视为0
+    """
+    with _lock:
+        _token_cache[key] = (user_id, exp, version)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
+
+def revoke_token(key, exp):
+    """
+    吊销单个令牌，用于退出登录
+
+    吊销记录写入与登录限流相同的存储（RATE_LIMIT_STORAGE_URI），配置 Redis 时所有进程共享，
+    记录在令牌过期时自动删除。
+
+    Args:
+        key (str): 令牌哈希
+        exp (int): 令牌的过期时间戳
+    """
+    with _lock:
+        _token_cache.pop(key, None)
+    ttl = int(exp - time.time()) + 1
+    if ttl > 0:
+        get_store().set_flag(f'token:revoked:{key}', ttl)
+
+
+def is_token_revoked(key):
+    """
+    检查令牌是否已通过退出登录吊销
+
+    Args:
+        key (str): 令牌哈希
+
+    Returns:
+        bool: 是否已吊销
+    """
+    return get_store().has_flag(f'token:revoked:{key}')
+
+
+def clear_tokens():
+    """
+    清空当前进程的令牌缓存，吊销记录保留
+    """
+    with _lock:
+        _token_cache.clear()
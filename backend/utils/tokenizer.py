@@ -0,0 +1,99 @@
+import re
+import unicodedata
+
+# 中日韩统一表意文字及假名的字符范围
+CJK_PATTERN = r'\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+
+# 将文本切分为连续的中文片段或连续的字母数字片段
+TOKEN_RE = re.compile(rf'[{CJK_PATTERN}]+|[a-z0-9]+')
+CJK_RE = re.compile(rf'[{CJK_PATTERN}]')
+
+# 形如 978-7-02-008 的关键词按ISBN处理
+ISBN_QUERY_RE = re.compile(r'[0-9][0-9\- ]*[0-9x]')
+
+# 英文单词前缀索引的长度范围，支持边输入边搜索
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 20
+
+
+def normalize(text):
+    """
+    规范化文本：全角转半角并转为小写
+
+    Args:
+        text (str): 原始文本
+
+    Returns:
+        str: 规范化后的文本
+    """
+    if not text:
+        return ''
+    return unicodedata.normalize('NFKC', str(text)).lower()
+
+
+def index_terms(text):
+    """
+    生成用于建立倒排索引的词项
+
+    中文片段同时生成单字和二元组（bigram），英文和数字生成前缀词项，
+    以便查询时可以使用任意长度的中文片段或单词前缀命中。
+
+    Args:
+        text (str): 待索引的文本
+
+    Returns:
+        set: 词项集合
+    """
+    terms = set()
+    for run in TOKEN_RE.findall(normalize(text)):
+        if CJK_RE.match(run):
+            terms.update(run)
+            terms.update(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            limit = min(len(run), MAX_PREFIX_LENGTH)
+            if limit < MIN_PREFIX_LENGTH:
+                continue
+            terms.update(run[:i] for i in range(MIN_PREFIX_LENGTH, limit + 1))
+    return terms
+
+
+def query_terms(text):
+    """
+    将搜索关键词切分为查询词项
+
+    中文片段按二元组切分（单字片段保留单字），英文单词截取到最大前缀长度，
+    所有查询词项都能在 index_terms 生成的词项中找到。
+
+    Args:
+        text (str): 搜索关键词
+
+    Returns:
+        list: 去重后的查询词项列表，保持原有顺序
+    """
+    text = normalize(text).strip()
+    if ISBN_QUERY_RE.fullmatch(text):
+        text = compact_isbn(text)
+
+    terms = []
+    for run in TOKEN_RE.findall(text):
+        if CJK_RE.match(run):
+            if len(run) == 1:
+                terms.append(run)
+            else:
+                terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        elif len(run) >= MIN_PREFIX_LENGTH:
+            terms.append(run[:MAX_PREFIX_LENGTH])
+    return list(dict.fromkeys(terms))
+
+
+def compact_isbn(isbn):
+    """
+    去掉ISBN中的分隔符
+
+    Args:
+        isbn (str): ISBN编号
+
+    Returns:
+        str: 只包含数字和校验位X的ISBN
+    """
+    return re.sub(r'[^0-9x]', '', normalize(isbn))
\ No newline at end of file
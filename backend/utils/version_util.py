@@ -0,0 +1,128 @@
+from datetime import datetime
+from sqlalchemy import event, inspect, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import db
+from models.stats_model import StatCounter
+from utils.db_util import increment
+
+# 版本计数器与统计计数器共用 stat_counters 表，名称加前缀区分
+VERSION_PREFIX = 'version:'
+
+# 维护版本号的表，ORM 提交这些表的变更时自动加一
+VERSIONED_TABLES = ('books', 'borrows', 'categories', 'users')
+
+# 不出现在带版本号缓存的响应中的字段（ORM 属性名），只修改这些字段时不增加版本号，
+# 避免每次登录更新 last_login 都写 stat_counters 的同一行并使借阅列表缓存失效
+UNVERSIONED_ATTRIBUTES = {
+    'users': frozenset(('last_login', '_password', 'token_version', 'updated_at')),
+}
+
+
+def bump_version(name):
+    """
+    数据版本号加一，在调用方的事务中执行，与数据变更一起提交
+
+    ORM 变更由 flush 监听器自动处理，只有绕过 ORM 的批量语句需要显式调用。
+    版本号与统计计数器一样分片保存，每次随机加到一个分片行上，读取时求和。
+
+    Args:
+        name (str): 数据名称，如 categories
+    """
+    increment(StatCounter.__table__, {'name': StatCounter.random_shard(VERSION_PREFIX + name)}, 'value', 1,
+              {'updated_at': datetime.now()})
+
+
+def get_version(name):
+    """
+    读取数据版本号
+
+    Args:
+        name (str): 数据名称
+
+    Returns:
+        int: 版本号，从未变更过时为0
+    """
+    return get_versions([name])[name]
+
+
+def get_versions(names):
+    """
+    一次查询读取多个数据版本号
+
+    Args:
+        names (iterable): 数据名称
+
+    Returns:
+        dict: 数据名称到版本号的映射
+    """
+    names = list(names)
+    shard_names = [shard_name for name in names for shard_name in StatCounter.shard_names(VERSION_PREFIX + name)]
+    rows = db.session.query(StatCounter.name, StatCounter.value).filter(StatCounter.name.in_(shard_names))
+    values = dict.fromkeys(names, 0)
+    for shard_name, value in rows:
+        values[StatCounter.counter_name(shard_name)[len(VERSION_PREFIX):]] += value
+    return values
+
+
+def ensure_versions():
+    """
+    为所有版本化的表创建全部分片的版本号记录，之后 flush 监听器只需执行 UPDATE
+    """
+    shard_names = [
+        shard_name for name in VERSIONED_TABLES for shard_name in StatCounter.shard_names(VERSION_PREFIX + name)
+    ]
+    existing = {
+        name for name, in db.session.query(StatCounter.name).filter(StatCounter.name.in_(shard_names))
+    }
+    for shard_name in shard_names:
+        if shard_name in existing:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.execute(StatCounter.__table__.insert().values(
+                    name=shard_name, value=0, updated_at=datetime.now()
+                ))
+        except IntegrityError:
+            # 其他进程已经创建
+            pass
+    db.session.commit()
+
+
+def _changed_attributes(obj):
+    """
+    返回对象本次 flush 中修改过的列属性名
+    """
+    state = inspect(obj)
+    return {attr.key for attr in state.mapper.column_attrs if state.attrs[attr.key].history.has_changes()}
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_versions(session, flush_context):
+    """
+    flush 后为有新增、修改或删除记录的表增加版本号，与数据变更在同一事务中提交
+    """
+    names = set()
+    for obj in session.new:
+        names.add(getattr(obj, '__tablename__', None))
+    for obj in session.deleted:
+        names.add(getattr(obj, '__tablename__', None))
+    for obj in session.dirty:
+        name = getattr(obj, '__tablename__', None)
+        if name in names or not session.is_modified(obj, include_collections=False):
+            continue
+        ignored = UNVERSIONED_ATTRIBUTES.get(name)
+        if ignored and _changed_attributes(obj) <= ignored:
+            continue
+        names.add(name)
+
+    # 每个表随机更新一个分片行，并发写入同一张表的事务很少等待同一行锁
+    names = [StatCounter.random_shard(VERSION_PREFIX + name) for name in names if name in VERSIONED_TABLES]
+    if not names:
+        return
+
+    table = StatCounter.__table__
+    session.connection().execute(
+        update(table).where(table.c.name.in_(names)).values(value=table.c.value + 1, updated_at=datetime.now())
+    )
\ No newline at end of file
@@ -0,0 +1,12 @@
+"""
+生产环境WSGI入口
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+配置由 FLASK_ENV 环境变量选择，默认使用生产配置。
+"""
+import os
+
+from app import create_app
+
+app = create_app(os.environ.get('FLASK_ENV', 'production'))